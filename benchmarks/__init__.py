@@ -0,0 +1,13 @@
+# encoding: utf-8
+
+from .runner import Benchmarks
+from .loading import loading_stages
+from .analysis import analysis_stages
+
+
+benchmarks = Benchmarks(
+    [
+        loading_stages,
+        analysis_stages,
+    ]
+)
@@ -0,0 +1,109 @@
+# encoding: utf-8
+
+import sys
+import shutil
+import tempfile
+import StringIO
+import importlib
+import multiprocessing
+from .runner import Stages
+
+
+analysis_stages = Stages()
+
+F_THRESHOLD = 3.0
+
+
+def easy_analysis(module):
+    return importlib.import_module('jp_civil_law.build.easy_analysis.' + module)
+
+
+@analysis_stages.stage(u'casedata', requires=[u'to_networkx'])
+def casedata(context):
+    # term extraction over the source's own nodes, past the term set caches.
+    data = easy_analysis('casedata')
+    nodes, idfkeys = list(context[u'to_networkx'].nodes()), data.idf_keys()
+    find_terms = data.mixedterm_finder(nodes, idfkeys)
+    art_term_sets = data.mixed_term_sets(data.allart_raw_titles(), data.allart_raw_sents(), find_terms)
+    q_term_sets = data.mixed_term_sets(data.allq_raw_titles(), data.allq_raw_sents(), find_terms)
+    return {
+        u'term_sets': data.mapmerge(art_term_sets, q_term_sets),
+        u'q_term_sets': q_term_sets,
+        u'allterms': list(set(nodes + idfkeys).difference(set(data.stopwords()))),
+        u'answers': data.answermap(),
+    }
+
+def preexpand(context, jobs):
+    # a cold expansion cache per run.
+    diskcache, user_calc = easy_analysis('diskcache'), easy_analysis('user_calc')
+    directory = tempfile.mkdtemp(prefix='lkb-bench-')
+    context.setdefault(u'cleanup', []).append(lambda: shutil.rmtree(directory))
+    cache = diskcache.DiskCache('expansion', directory=directory)
+    user_calc.preexpand(
+        context[u'to_networkx'], context[u'casedata'][u'term_sets'],
+        jobs=jobs, cache=cache,
+    )
+    return cache
+
+@analysis_stages.stage(u'expansion', requires=[u'to_networkx', u'casedata'])
+def expansion(context):
+    return preexpand(context, jobs=1)
+
+@analysis_stages.stage(u'expansion_jobs', requires=[u'to_networkx', u'casedata'])
+def expansion_jobs(context):
+    return preexpand(context, jobs=multiprocessing.cpu_count())
+
+@analysis_stages.stage(u'pagerank', requires=[u'to_networkx', u'casedata'])
+def pagerank(context):
+    pr = easy_analysis('pagerank')
+    nx_graph = context[u'to_networkx']
+    distribution = pr.pr_distribution_fn(
+        nx_graph,
+        preproc=lambda n: n.to_undirected(),
+        amplify=10.0,
+    )
+    q_term_sets = context[u'casedata'][u'q_term_sets']
+    return [
+        distribution([term for term in q_term_sets[qkey] if term in nx_graph])
+        for qkey in sorted(q_term_sets)
+    ]
+
+@analysis_stages.stage(u'similarity', requires=[u'to_networkx', u'casedata', u'expansion'])
+def similarity(context):
+    sim, user_calc = easy_analysis('similarity'), easy_analysis('user_calc')
+    nx_graph, cases = context[u'to_networkx'], context[u'casedata']
+    data = easy_analysis('casedata')
+    stdout, default_cache = sys.stdout, user_calc.expansion_cache
+    sys.stdout = StringIO.StringIO()
+    user_calc.expansion_cache = context[u'expansion']
+    try:
+        mapper = user_calc.create_joint_mapper(
+            nx_graph=nx_graph, allterms=cases[u'allterms'],
+            raw_titles=data.all_raw_titles(), raw_sents=data.all_raw_sents(),
+            termsets=cases[u'term_sets'],
+            mode=u'network',
+        )
+        rows = sim.joint_dist_rows(
+            cases[u'allterms'], cases[u'term_sets'],
+            distribution_fn=mapper, rowkeys=sorted(cases[u'answers']),
+        )
+        orders = {}
+        for qkey, row in rows:
+            qsims = sorted(
+                ((score, (qkey, key2)) for key2, score in row if not key2.startswith(u'q')),
+                reverse=True,
+            )
+            orders[qkey] = [(keypair, score) for score, keypair in qsims]
+    finally:
+        sys.stdout = stdout
+        user_calc.expansion_cache = default_cache
+    return orders
+
+@analysis_stages.stage(u'metrics', requires=[u'casedata', u'similarity'])
+def metrics(context):
+    rankmetrics = easy_analysis('rankmetrics')
+    answers = context[u'casedata'][u'answers']
+    return {
+        qkey: rankmetrics.question_metrics(order, answers[qkey], qkey, F_THRESHOLD)
+        for qkey, order in context[u'similarity'].iteritems()
+    }
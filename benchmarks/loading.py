@@ -0,0 +1,100 @@
+# encoding: utf-8
+
+from lkbutils import (
+    rdflib_load_terms,
+    rdflib_load_relations,
+    rdflib_to_networkx,
+    yamllib,
+)
+from lkbutils.declarative import (
+    leaves_from_struct,
+    rdflib_load_relcfg,
+    RDFLibRelationLoader,
+)
+from lkbutils.nodeprovider import merge_nodeproviders, try_romanize
+from jp_civil_law import graph
+from .runner import Stages
+
+
+loading_stages = Stages()
+
+
+@loading_stages.stage(u'read_sources')
+def read_sources(context):
+    terms_dir, relations_dir = context[u'source'].prepare()
+    return {
+        u'terms': [yml for yml, _ in graph.yaml_texts_in(terms_dir)],
+        u'relations': [yml for yml, _ in graph.yaml_texts_in(relations_dir)],
+    }
+
+@loading_stages.stage(u'yaml_parse', requires=[u'read_sources'])
+def yaml_parse(context):
+    texts = context[u'read_sources']
+    return {
+        kind: [yamllib.parse_yaml(yml) for yml in texts[kind]]
+        for kind in (u'terms', u'relations')
+    }
+
+@loading_stages.stage(u'romanize', requires=[u'yaml_parse'])
+def romanize(context):
+    romanized = 0
+    for data in context[u'yaml_parse'][u'terms']:
+        if not data.get(u'options', {}).get(u'romanize'):
+            continue
+        for name in leaves_from_struct(data.get(u'terms', [])):
+            try_romanize(name)
+            romanized += 1
+    return romanized
+
+@loading_stages.stage(u'term_load', requires=[u'read_sources'])
+def term_load(context):
+    providers = [rdflib_load_terms(yml).nodeprovider for yml in context[u'read_sources'][u'terms']]
+    return merge_nodeproviders(*providers)
+
+@loading_stages.stage(u'relation_load', requires=[u'read_sources', u'term_load'])
+def relation_load(context):
+    nodeprovider = context[u'term_load']
+    loader_maps = [
+        rdflib_load_relations(yml, nodeprovider=nodeprovider)
+        for yml in context[u'read_sources'][u'relations']
+    ]
+    return sum([[rlmap[r] for r in sorted(rlmap)] for rlmap in loader_maps], [])
+
+def relation_load_with(option):
+    """Relation load stage with the connection rule option alone, whatever the files say."""
+    options = dict(dry=False, nointerlinks=False, acyclic=False)
+    if option is not None:
+        options[option] = True
+
+    def _load(context):
+        nodeprovider = context[u'term_load']
+        loaders = []
+        for yml in context[u'read_sources'][u'relations']:
+            configs = rdflib_load_relcfg(yml)
+            for relation in sorted(configs):
+                loader = RDFLibRelationLoader(nodeprovider=nodeprovider, relation=relation, **options)
+                loader.load(configs[relation][u'pairs'])
+                loaders.append(loader)
+        return loaders
+    return _load
+
+for option in (None, u'dry', u'nointerlinks', u'acyclic'):
+    loading_stages.stage(
+        u'relation_load[{}]'.format(option or u'norules'),
+        requires=[u'read_sources', u'term_load'],
+    )(relation_load_with(option))
+
+@loading_stages.stage(u'conflict_check', requires=[u'term_load', u'relation_load'])
+def conflict_check(context):
+    graph.check_relation_conflicts(context[u'relation_load'], context[u'term_load'])
+
+@loading_stages.stage(u'rdflib_merge', requires=[u'term_load', u'relation_load'])
+def rdflib_merge(context):
+    return sum(
+        [rl.graph for rl in context[u'relation_load']],
+        context[u'term_load'].graph,
+    )
+
+@loading_stages.stage(u'to_networkx', requires=[u'rdflib_merge'])
+def to_networkx(context):
+    return rdflib_to_networkx(context[u'rdflib_merge'])
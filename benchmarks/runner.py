@@ -0,0 +1,196 @@
+# encoding: utf-8
+
+import os
+import sys
+import json
+import time
+import platform
+import datetime
+import subprocess
+
+
+class Stage(object):
+    """
+    One timed step of the pipeline.
+
+    fn(context) returns the stage result, kept in context[name]
+    for the stages after it; callables it appends to
+    context['cleanup'] run once the source is done.
+    """
+
+    def __init__(self, name, fn, requires=tuple(), shared=False):
+        """
+        Options:
+            * requires: names of stages whose results fn reads.
+            * shared: time for the first source only; later sources
+                      reuse its result.
+        """
+        self.name = name
+        self.fn = fn
+        self.requires = tuple(requires)
+        self.shared = shared
+
+    def measure(self, context, shared, repeat=1):
+        """Run fn repeat times; a result record, or None if a shared result was reused."""
+        if self.shared and self.name in shared:
+            context[self.name] = shared[self.name]
+            return None
+        record = {u'stage': self.name, u'runs': [], u'cpu': [], u'error': None, u'skipped': None}
+        missing = [name for name in self.requires if name not in context]
+        if missing:
+            record[u'skipped'] = u'needs {}'.format(u', '.join(missing))
+            return record
+        for _ in range(repeat):
+            started, cpu_started = time.time(), time.clock()
+            try:
+                result = self.fn(context)
+            except Exception as err:
+                record[u'error'] = describe(err)
+                return record
+            record[u'runs'].append(time.time() - started)
+            record[u'cpu'].append(time.clock() - cpu_started)
+        context[self.name] = result
+        if self.shared:
+            shared[self.name] = result
+        return record
+
+
+class Stages(object):
+    """
+    Ordered collection of benchmark stages, registered by decorator.
+    """
+
+    def __init__(self):
+        self.stages = []
+
+    def stage(self, name, requires=tuple(), shared=False):
+        """Register fn(context) as a stage named name; see Stage."""
+        def register(fn):
+            self.stages.append(Stage(name, fn, requires=requires, shared=shared))
+            return fn
+        return register
+
+
+class Benchmarks(object):
+    """
+    Runs stage collections in order over benchmark sources.
+    """
+
+    def __init__(self, collections):
+        self.stages = sum([collection.stages for collection in collections], [])
+
+    def run(self, sources, repeat=1, select=None, out=sys.stdout):
+        """
+        Time every stage on every source; a list of result records.
+
+        Options:
+            * select: stage name prefixes to run (all if None); the
+                      stages they require run as well.
+        """
+        stages = self._selected(select)
+        results = []
+        shared = {}
+        for source in sources:
+            context = {u'source': source}
+            try:
+                for stage in stages:
+                    record = stage.measure(context, shared, repeat=repeat)
+                    if record is None:
+                        continue
+                    record.update(source=source.name, scale=source.scale)
+                    results.append(record)
+                    out.write(format_record(record).encode('utf-8') + '\n')
+                    out.flush()
+            finally:
+                for cleanup in context.get(u'cleanup', []):
+                    cleanup()
+                source.cleanup()
+        return results
+
+    def _selected(self, select):
+        if not select:
+            return self.stages
+        wanted = set(
+            stage.name for stage in self.stages
+            if any(stage.name.startswith(prefix) for prefix in select)
+        )
+        for stage in reversed(self.stages):
+            if stage.name in wanted:
+                wanted.update(stage.requires)
+        return [stage for stage in self.stages if stage.name in wanted]
+
+
+def describe(err):
+    try:
+        message = unicode(err)
+    except UnicodeError:
+        message = str(err).decode('utf-8', 'replace')
+    return u'{}: {}'.format(type(err).__name__, message)
+
+def format_record(record):
+    label = u'{} [x{}] {}'.format(record[u'source'], record[u'scale'], record[u'stage'])
+    if record[u'error'] is not None:
+        return u'{}: ERROR {}'.format(label, record[u'error'])
+    if record[u'skipped'] is not None:
+        return u'{}: skipped ({})'.format(label, record[u'skipped'])
+    return u'{}: {:.4f}s (cpu {:.4f}s)'.format(label, min(record[u'runs']), min(record[u'cpu']))
+
+
+def environment(directory=os.path.dirname(os.path.abspath(__file__))):
+    """Commit, interpreter and time the results were measured with."""
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=directory).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain'], cwd=directory).strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {
+        u'commit': commit,
+        u'dirty': dirty,
+        u'python': platform.python_version(),
+        u'platform': platform.platform(),
+        u'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+    }
+
+def write_results(path, results, repeat):
+    document = {u'environment': environment(), u'repeat': repeat, u'results': results}
+    with open(path, 'wb') as f:
+        f.write(json.dumps(document, indent=2, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        f.write('\n')
+
+def read_results(path):
+    with open(path, 'rb') as f:
+        return json.loads(f.read().decode('utf-8'))
+
+
+def best_times(document):
+    """{(source, scale, stage) => best wall seconds} of the stages that ran."""
+    return {
+        (record[u'source'], record[u'scale'], record[u'stage']): min(record[u'runs'])
+        for record in document[u'results']
+        if record[u'runs']
+    }
+
+def compare_results(old, new, threshold=0.1, out=sys.stdout):
+    """
+    Print best times of new against old; the number of stages slower
+    by more than threshold (a ratio).
+    """
+    old_times, new_times = best_times(old), best_times(new)
+    out.write('comparing with {}\n'.format(old[u'environment'][u'commit']))
+    regressions = 0
+    for key in sorted(set(old_times) & set(new_times)):
+        ratio = new_times[key] / old_times[key] if old_times[key] else float('inf')
+        mark = u''
+        if ratio > 1.0 + threshold:
+            mark = u'  <-- slower'
+            regressions += 1
+        elif ratio < 1.0 - threshold:
+            mark = u'  faster'
+        line = u'{} [x{}] {}: {:.4f}s -> {:.4f}s (x{:.2f}){}'.format(
+            key[0], key[1], key[2], old_times[key], new_times[key], ratio, mark,
+        )
+        out.write(line.encode('utf-8') + '\n')
+    for key in sorted(set(old_times) ^ set(new_times)):
+        side = u'new' if key in new_times else u'old'
+        out.write(u'{} [x{}] {}: only in {}\n'.format(key[0], key[1], key[2], side).encode('utf-8'))
+    return regressions
@@ -0,0 +1,111 @@
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+from lkbutils import yamllib
+from lkbutils.declarative import leaves_from_struct
+from lkbutils.nodeprovider import NameProvider, re_specified_reading
+from jp_civil_law import graph
+
+
+class RealSource(object):
+    """
+    The term & relation definitions as they are.
+    """
+    scale = 1
+
+    def __init__(self, terms_dir=graph.TERMS_DIR, relations_dir=graph.RELATIONS_DIR, name=u'real'):
+        self.name = name
+        self.terms_dir = terms_dir
+        self.relations_dir = relations_dir
+
+    def prepare(self):
+        """(terms_dir, relations_dir) to load from."""
+        return self.terms_dir, self.relations_dir
+
+    def cleanup(self):
+        pass
+
+
+class ScaledSource(object):
+    """
+    The real definitions cloned scale times into a temporary directory.
+
+    Copy 0 keeps the original files; copy i suffixes every identifier
+    with "_i", so that relations only link terms of the same copy.
+    Property terms are shared by all copies.
+    """
+
+    def __init__(self, scale, terms_dir=graph.TERMS_DIR, relations_dir=graph.RELATIONS_DIR):
+        self.name = u'real'
+        self.scale = scale
+        self.terms_dir = terms_dir
+        self.relations_dir = relations_dir
+        self._directory = None
+
+    def prepare(self):
+        """Write the copies; (terms_dir, relations_dir) to load from."""
+        self._directory = tempfile.mkdtemp(prefix='lkb-bench-')
+        terms_dir = os.path.join(self._directory, 'terms')
+        relations_dir = os.path.join(self._directory, 'relations')
+        os.mkdir(terms_dir)
+        os.mkdir(relations_dir)
+        for path, _ in graph.yaml_files_in(self.terms_dir):
+            self._clone(path, terms_dir, self._term_copies)
+        for path, _ in graph.yaml_files_in(self.relations_dir):
+            self._clone(path, relations_dir, self._relation_copies)
+        return terms_dir, relations_dir
+
+    def cleanup(self):
+        if self._directory is not None:
+            shutil.rmtree(self._directory)
+            self._directory = None
+
+    def _clone(self, path, directory, copies):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        shutil.copy(path, os.path.join(directory, os.path.basename(path)))
+        data = yamllib.parse_yaml(graph.read_unicode(path))
+        for i, copy in enumerate(copies(data), start=1):
+            with open(os.path.join(directory, u'{}_{}.yml'.format(stem, i)), 'wb') as f:
+                f.write(yamllib.fancydump(copy).encode('utf-8'))
+
+    def _term_copies(self, data):
+        if data.get(u'load_options', {}).get(u'as_property'):
+            return
+        romanize = data.get(u'options', {}).get(u'romanize', False)
+        # identifiers are romanized once, for the original names only.
+        identifiers = {}
+        nameprovider = NameProvider(romanize=romanize)
+        for name in leaves_from_struct(data.get(u'terms', [])):
+            identifiers[name] = nameprovider.add(name)
+        for i in range(1, self.scale):
+            def suffixed(name):
+                if not romanize:
+                    return u'{}_{}'.format(name, i)
+                match = re_specified_reading.match(name)
+                origin = match.group(u'name') if match else name
+                return u'{}_{}{{{}_{}}}'.format(origin, i, identifiers[name], i)
+            copy = dict(data)
+            copy[u'terms'] = map_leaves(data.get(u'terms', []), suffixed)
+            yield copy
+
+    def _relation_copies(self, data):
+        for i in range(1, self.scale):
+            def suffixed(pair):
+                return u' '.join(u'{}_{}'.format(identifier, i) for identifier in pair.split(u' '))
+            copy = dict(data)
+            copy[u'relations'] = {
+                relation: dict(config, pairs=map_leaves(config.get(u'pairs', []), suffixed))
+                for relation, config in data.get(u'relations', {}).items()
+            }
+            yield copy
+
+
+def map_leaves(data, fn):
+    """Copy of nested dicts/lists data with fn applied to every leaf."""
+    if isinstance(data, dict):
+        return {key: map_leaves(child, fn) for key, child in data.items()}
+    if isinstance(data, list):
+        return [map_leaves(child, fn) for child in data]
+    return fn(unicode(data))
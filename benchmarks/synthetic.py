@@ -0,0 +1,312 @@
+# encoding: utf-8
+
+import os
+import math
+import random
+import shutil
+import tempfile
+from lkbutils import yamllib
+
+
+# (character, reading) pool names are composed from.
+SYLLABLES = (
+    (u'債', u'sai'), (u'権', u'ken'), (u'務', u'mu'), (u'契', u'kei'), (u'約', u'yaku'),
+    (u'売', u'bai'), (u'買', u'kai'), (u'賃', u'chin'), (u'貸', u'tai'), (u'借', u'shaku'),
+    (u'物', u'butsu'), (u'占', u'sen'), (u'有', u'yuu'), (u'所', u'sho'), (u'抵', u'tei'),
+    (u'当', u'tou'), (u'保', u'ho'), (u'証', u'shou'), (u'相', u'sou'), (u'続', u'zoku'),
+    (u'遺', u'i'), (u'言', u'gon'), (u'贈', u'zou'), (u'与', u'yo'), (u'代', u'dai'),
+    (u'理', u'ri'), (u'人', u'nin'), (u'法', u'hou'), (u'律', u'ritsu'), (u'行', u'kou'),
+    (u'取', u'shu'), (u'消', u'sho'), (u'解', u'kai'), (u'除', u'jo'), (u'弁', u'ben'),
+    (u'済', u'sai'), (u'損', u'son'), (u'害', u'gai'), (u'賠', u'bai'), (u'償', u'shou'),
+    (u'請', u'sei'), (u'求', u'kyuu'), (u'登', u'tou'), (u'記', u'ki'), (u'地', u'chi'),
+    (u'上', u'jou'), (u'質', u'shichi'), (u'留', u'ryuu'), (u'置', u'chi'), (u'期', u'ki'),
+)
+
+# term kinds (the deepest categories of a term file) and their shares.
+KINDS = (
+    (u'classes', 0.4),
+    (u'actions', 0.3),
+    (u'person roles', 0.1),
+    (u'attrs', 0.2),
+)
+
+PROPERTIES = {
+    u'frame transition': [u'hyper{hyper}', u'hyperx{role_of}', u'antecedent_to{antecedent_to}'],
+    u'in frame': [
+        u'sbj{sbj}', u'obj{obj}', u'auth{auth}', u'auth_by{auth_by}',
+        u'attr_slot{attr_slot}', u'within{within}',
+    ],
+}
+
+
+class VocabularyGenerator(object):
+    """
+    Reproducible random term & relation definitions in the source YAML format.
+
+    Hierarchies only link a term to terms generated before it, so they
+    are acyclic unless cycles are injected; frames link actions to
+    person roles (sbj), classes (obj) and attrs (attr_slot).
+    """
+
+    def __init__(self, terms=2000, files=4, categories=5,
+                 hyper_degree=1.2, attr_degree=1.0, role_ratio=0.7,
+                 distribution='poisson', unannotated=0.0,
+                 conflicts=0, cycles=0, seed=0):
+        """
+        Options:
+            * terms, files, categories: number of terms, of term files
+                                        and of categories per file.
+            * hyper_degree, attr_degree: mean hypers per term and
+                                         attrs per action.
+            * role_ratio: share of actions with a sbj and an obj.
+            * distribution: 'poisson' degrees over uniformly chosen terms,
+                            or 'powerlaw' heavy-tailed degrees over
+                            terms chosen preferentially by in-degree.
+            * unannotated: share of names without a {reading}; loading
+                           them needs kakasi, and relations leave
+                           them out.
+            * conflicts: hyper pairs repeated as sbj pairs, failing
+                         the conflict check.
+            * cycles: hyper paths closed into cycles, failing the
+                      acyclic rule.
+        """
+        if distribution not in ('poisson', 'powerlaw'):
+            raise ValueError('no distribution named "{}"'.format(distribution))
+        self.size = terms
+        self.files = files
+        self.categories = categories
+        self.hyper_degree = hyper_degree
+        self.attr_degree = attr_degree
+        self.role_ratio = role_ratio
+        self.distribution = distribution
+        self.unannotated = unannotated
+        self.conflicts = conflicts
+        self.cycles = cycles
+        self.seed = seed
+
+    def write(self, directory):
+        """Write the YAML files under directory; (terms_dir, relations_dir)."""
+        self._random = random.Random(self.seed)
+        self._generate()
+        terms_dir = os.path.join(directory, 'terms')
+        relations_dir = os.path.join(directory, 'relations')
+        for subdirectory in (terms_dir, relations_dir):
+            if not os.path.isdir(subdirectory):
+                os.makedirs(subdirectory)
+        dump(os.path.join(terms_dir, 'properties.yml'), {
+            u'options': {u'romanize': True},
+            u'load_options': {u'as_property': True},
+            u'terms': PROPERTIES,
+        })
+        for n in range(self.files):
+            stem = u'synthetic{}'.format(n)
+            dump(os.path.join(terms_dir, stem + u'.yml'), {
+                u'options': {u'romanize': True},
+                u'terms': self._term_tree(n),
+            })
+            dump(os.path.join(relations_dir, stem + u'_hierarchies.yml'), {
+                u'options': {u'dry': True, u'acyclic': True},
+                u'relations': self._relation_tree(n, (u'hyper',)),
+            })
+            dump(os.path.join(relations_dir, stem + u'_frames.yml'), {
+                u'options': {u'dry': True},
+                u'relations': self._relation_tree(n, (u'sbj', u'obj', u'attr_slot')),
+            })
+        return terms_dir, relations_dir
+
+    def _generate(self):
+        self.names = []
+        self.identifiers = []
+        self.linkable = []
+        self.kinds = []
+        self.categories_of = []
+        self.pairs = {}
+        self._paired = set()
+        seen = set()
+        for i in range(self.size):
+            name, identifier, annotated = self._new_name(seen)
+            self.names.append(name)
+            self.identifiers.append(identifier)
+            self.linkable.append(annotated)
+            self.kinds.append(self._weighted(KINDS))
+            self.categories_of.append(self._random.randrange(self.categories))
+        self._link_hierarchies()
+        self._link_frames()
+        self._inject_conflicts()
+        self._inject_cycles()
+
+    def _new_name(self, seen):
+        while True:
+            syllables = [self._random.choice(SYLLABLES) for _ in range(self._random.randint(2, 4))]
+            name = u''.join(char for char, _ in syllables)
+            identifier = u''.join(reading for _, reading in syllables)
+            if identifier not in seen:
+                break
+        seen.add(identifier)
+        if self._random.random() < self.unannotated:
+            return name, identifier, False
+        return u'{}{{{}}}'.format(name, identifier), identifier, True
+
+    def _weighted(self, choices):
+        point = self._random.random() * sum(weight for _, weight in choices)
+        for choice, weight in choices:
+            point -= weight
+            if point < 0.0:
+                return choice
+        return choices[-1][0]
+
+    def _degree(self, mean):
+        if self.distribution == 'powerlaw':
+            # pareto(2) - 1 has mean 1 and a heavy tail.
+            return int(mean * (self._random.paretovariate(2.0) - 1.0) + 0.5)
+        # Knuth's poisson sampling.
+        limit, k, product = math.exp(-mean), 0, self._random.random()
+        while product > limit:
+            k += 1
+            product *= self._random.random()
+        return k
+
+    def _pick(self, candidates, count, endpoints=None):
+        # endpoints lists each candidate once plus once per in-link:
+        # drawing from it is preferential attachment.
+        count = min(count, len(candidates))
+        if endpoints is None:
+            return self._random.sample(candidates, count)
+        picked = set()
+        while len(picked) < count:
+            picked.add(self._random.choice(endpoints))
+        return sorted(picked)
+
+    def _add_pair(self, relation, src, dest):
+        if (src, dest) in self._paired:
+            return
+        self._paired.add((src, dest))
+        self.pairs.setdefault(relation, []).append((src, dest))
+
+    def _link_hierarchies(self):
+        # hypers are generated earlier terms of the same kind: no cycles.
+        earlier = {kind: [] for kind, _ in KINDS}
+        endpoints = {kind: [] for kind, _ in KINDS}
+        for i in range(self.size):
+            if not self.linkable[i]:
+                continue
+            kind = self.kinds[i]
+            if self.distribution == 'powerlaw':
+                hypers = self._pick(earlier[kind], self._degree(self.hyper_degree), endpoints[kind])
+            else:
+                hypers = self._pick(earlier[kind], self._degree(self.hyper_degree))
+            for hyper in hypers:
+                self._add_pair(u'hyper', i, hyper)
+            endpoints[kind].extend(hypers)
+            endpoints[kind].append(i)
+            earlier[kind].append(i)
+
+    def _link_frames(self):
+        by_kind = {kind: [] for kind, _ in KINDS}
+        for i, kind in enumerate(self.kinds):
+            if self.linkable[i]:
+                by_kind[kind].append(i)
+        for action in by_kind[u'actions']:
+            if self._random.random() < self.role_ratio:
+                for relation, kind in ((u'sbj', u'person roles'), (u'obj', u'classes')):
+                    if by_kind[kind]:
+                        self._add_pair(relation, action, self._random.choice(by_kind[kind]))
+            for attr in self._pick(by_kind[u'attrs'], self._degree(self.attr_degree)):
+                self._add_pair(u'attr_slot', action, attr)
+
+    def _inject_conflicts(self):
+        hypers = self.pairs.get(u'hyper', [])
+        for src, dest in self._random.sample(hypers, min(self.conflicts, len(hypers))):
+            # bypasses _add_pair, which keeps pairs unique across relations.
+            self.pairs.setdefault(u'sbj', []).append((src, dest))
+
+    def _inject_cycles(self):
+        # rules are checked per relation file: a cycle is only caught
+        # if all its pairs are filed with the same term file.
+        hypers = {}
+        for src, dest in self.pairs.get(u'hyper', []):
+            if self._in_file(src) == self._in_file(dest):
+                hypers.setdefault(src, []).append(dest)
+        starts = sorted(hypers)
+        for start in self._random.sample(starts, min(self.cycles, len(starts))):
+            # climb up to a few hypers, then link the top back to start.
+            top = start
+            for _ in range(self._random.randint(1, 4)):
+                if top not in hypers:
+                    break
+                top = self._random.choice(hypers[top])
+            self._add_pair(u'hyper', top, start)
+
+    def _in_file(self, i):
+        return i * self.files // self.size
+
+    def _term_tree(self, n):
+        tree = {}
+        for i in range(self.size):
+            if self._in_file(i) != n:
+                continue
+            category = self._category_name(n, self.categories_of[i])
+            tree.setdefault(category, {}).setdefault(self.kinds[i], []).append(self.names[i])
+        return tree
+
+    def _relation_tree(self, n, relations):
+        # pairs are filed with the term file and category of their source.
+        tree = {}
+        for relation in relations:
+            for src, dest in self.pairs.get(relation, []):
+                if self._in_file(src) != n:
+                    continue
+                category = self._category_name(n, self.categories_of[src])
+                pairs = tree.setdefault(relation, {u'pairs': {}})[u'pairs']
+                pairs.setdefault(category, []).append(
+                    u'{} {}'.format(self.identifiers[src], self.identifiers[dest])
+                )
+        return tree
+
+    def _category_name(self, n, category):
+        return u'{}{}-{}'.format(SYLLABLES[category % len(SYLLABLES)][0], n, category)
+
+
+def dump(path, data):
+    with open(path, 'wb') as f:
+        f.write(yamllib.fancydump(data).encode('utf-8'))
+
+
+class SyntheticSource(object):
+    """
+    Benchmark source of generated definitions, scaled by their number of terms.
+    """
+    name = u'synthetic'
+
+    def __init__(self, terms, **options):
+        """See VocabularyGenerator for options."""
+        self.scale = terms
+        self.generator = VocabularyGenerator(terms=terms, **options)
+        self._directory = None
+
+    def prepare(self):
+        """Write the definitions; (terms_dir, relations_dir) to load from."""
+        self._directory = tempfile.mkdtemp(prefix='lkb-bench-')
+        return self.generator.write(self._directory)
+
+    def cleanup(self):
+        if self._directory is not None:
+            shutil.rmtree(self._directory)
+            self._directory = None
+
+
+if __name__ == '__main__':
+    import argparse
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('directory')
+    argparser.add_argument('-t', '--terms', type=int, default=2000)
+    argparser.add_argument('-f', '--files', type=int, default=4)
+    argparser.add_argument('-d', '--distribution', default='poisson', choices=['poisson', 'powerlaw'])
+    argparser.add_argument('--conflicts', type=int, default=0)
+    argparser.add_argument('--cycles', type=int, default=0)
+    argparser.add_argument('--seed', type=int, default=0)
+    args = argparser.parse_args()
+    VocabularyGenerator(
+        terms=args.terms, files=args.files, distribution=args.distribution,
+        conflicts=args.conflicts, cycles=args.cycles, seed=args.seed,
+    ).write(args.directory)
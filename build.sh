@@ -8,6 +8,17 @@ python -m jp_civil_law.run "$@"
 echo "==> Finished."
 echo ""
 
+# Analysis-only runs write no dot file, GraphML & JSON are not rendered.
+case " $* " in
+    *" --only analysis "*|*" --only=analysis "*)
+        exit 0
+        ;;
+    *" --format graphml "*|*" --format=graphml "*|*" -f graphml "*|\
+    *" --format json "*|*" --format=json "*|*" -f json "*)
+        exit 0
+        ;;
+esac
+
 # Generate graph as PNG.
 echo "==> Generate ${BUILD_PATH}/graph.png..."
 dot -Tpdf "${BUILD_PATH}/graph.dot" > "${BUILD_PATH}/graph.pdf"
@@ -0,0 +1,201 @@
+# encoding: utf-8
+
+import math
+import collections
+from . import casedata as data
+from . import casemaker
+from . import graphindex
+from . import termexpand as tex
+from . import user_calc
+
+
+class ArticleIndex(object):
+    """
+    The article side of the create_joint_mapper pipelines, computed once,
+    with an inverted index from terms to the articles holding them.
+
+    A question is then scored against the articles sharing a weighted
+    term with it only; every other article scores 0 by the pipelines.
+    """
+
+    def __init__(self, nx_graph, mode, term_sets, articles, allterms, jobs=1):
+        """
+        Args:
+            * term_sets: {key => terms} of the mode, articles included.
+            * articles: keys of the articles to index.
+            * allterms: dimensions of the mode's vectors.
+        Options:
+            * jobs: processes to expand the article term sets with.
+        """
+        if mode not in (u'network', u'nonetwork', u'baseline'):
+            raise ValueError('no mode named "{}"'.format(mode))
+        self.nx_graph = nx_graph
+        self.mode = mode
+        self.articles = list(articles)
+        self.term_sets = {key: tuple(term_sets[key]) for key in self.articles}
+        # terms are TermTable ids inside; labels stay at the edges.
+        self.table = graphindex.termtable(nx_graph)
+        self._bases = [tuple(self.table.intern_all(self.term_sets[key])) for key in self.articles]
+        if mode == u'network':
+            expansions = self._expand_articles(jobs)
+        allids = self.table.intern_all(allterms)
+        # ids interned after this are of terms no article holds, unweighted.
+        self._size = len(self.table)
+        self.weights = self._weights(allids)
+        self._squares = [weight * weight for weight in self.weights]
+        # id => [(article position, weight in its normalized vector)]
+        self.postings = [[] for _ in xrange(self._size)]
+        if mode == u'network':
+            self._build_expansions(expansions)
+        else:
+            self._build_vectors()
+
+    def _weights(self, allids):
+        # the idf mappers of the modes: interpolated but for baseline,
+        # 0 for terms without an idf value, as for ids out of allterms.
+        if self.mode == u'baseline':
+            idfs = data.idfmap()
+        else:
+            idfs = casemaker.idfmap_with_interpolation(self.nx_graph)
+        weights = [0.0] * self._size
+        labels = self.table.labels
+        for i in allids:
+            weights[i] = idfs.get(labels[i], 0.0)
+        return weights
+
+    def _ids(self, terms):
+        # ids of terms known at build time; the others weigh nothing
+        # and are held by no article.
+        return [i for i in self.table.known(terms) if i < self._size]
+
+    def _build_vectors(self):
+        # term counts times idf (termmap x fn_idfweight), rows normalized.
+        for i, base in enumerate(self._bases):
+            vector = self._vector(base)
+            norm = math.sqrt(sum(value * value for value in vector.itervalues()))
+            for term, value in vector.iteritems():
+                self.postings[term].append((i, value / norm))
+
+    def _vector(self, ids):
+        vector = {}
+        weights = self.weights
+        for term in ids:
+            if weights[term] != 0.0:
+                vector[term] = vector.get(term, 0.0) + weights[term]
+        return vector
+
+    def _expand_articles(self, jobs):
+        user_calc.preexpand(self.nx_graph, self.term_sets, jobs=jobs, cache=user_calc.expansion_cache)
+        expansions = []
+        for key in self.articles:
+            expanded, _ = user_calc.expand_termset(self.nx_graph, self.term_sets[key], key=key)
+            # in expansion order: the hierarchy reduction depends on it.
+            expansions.append(tuple(self.table.intern_all(expanded)))
+        return expansions
+
+    def _build_expansions(self, expansions):
+        self.hierarchy = graphindex.reachability(self.nx_graph, labels=tex.hyper_props)
+        self.expansions = expansions
+        self._expansion_sets = [frozenset(expanded) for expanded in expansions]
+        self._frozen_bases = [frozenset(base) for base in self._bases]
+        self.lowers = []
+        for i, expanded in enumerate(self._expansion_sets):
+            self.lowers.append(self._lowers(expanded))
+            for term in expanded:
+                if self.weights[term] != 0.0:
+                    self.postings[term].append((i, self.weights[term]))
+
+    def _lowers(self, ids):
+        # {id => the other ids under it in the hyper hierarchy}
+        reach = self.hierarchy.reach_bits
+        node_count = self.table.node_count
+        ranked = [(term, reach(term)) for term in ids if term < node_count]
+        lowers = {}
+        for hyper, _ in ranked:
+            below = frozenset(
+                hypo for hypo, bits in ranked
+                if hypo != hyper and bits >> hyper & 1
+            )
+            if below:
+                lowers[hyper] = below
+        return lowers
+
+    def candidates(self, ids):
+        """Positions of the articles holding a weighted term of the ids."""
+        postings = self.postings
+        return set(i for term in ids for i, _ in postings[term])
+
+    def score(self, qkey, terms):
+        """
+        [(article key, score), ...] of the articles scored above 0 against
+        the question terms, as create_joint_mapper of the mode scores them.
+        """
+        if self.mode == u'network':
+            scores = self._score_network(qkey, terms)
+        else:
+            scores = self._score_vectors(self._ids(terms))
+        return [(self.articles[i], score) for i, score in scores.iteritems() if score > 0.0]
+
+    def _score_vectors(self, ids):
+        qvector = self._vector(ids)
+        qnorm = math.sqrt(sum(value * value for value in qvector.itervalues()))
+        dots = collections.defaultdict(float)
+        squares = collections.defaultdict(float)
+        for term, qvalue in qvector.iteritems():
+            for i, value in self.postings[term]:
+                dots[i] += qvalue * value
+                squares[i] += value * value
+        if self.mode == u'baseline':
+            return {i: dot / qnorm for i, dot in dots.iteritems()}
+        # nonetwork: articles are cut down to the question's terms first.
+        return {i: dot / (qnorm * math.sqrt(squares[i])) for i, dot in dots.iteritems()}
+
+    def _score_network(self, qkey, terms):
+        # fn_joint_expandonly (cut to the base terms & common expansions)
+        # -> fn_joint_hierarchyreduce -> x idf -> fn_joint_cutoff_art:
+        # the question vector is idf over its reduced terms, the article's
+        # the same over the reduced terms of both, so the cosine comes
+        # down to sums of squared idfs.
+        expanded, _ = user_calc.expand_termset(self.nx_graph, terms, key=qkey)
+        qids = frozenset(self._ids(terms))
+        qexpanded = tuple(self._ids(expanded))
+        qset = frozenset(qexpanded)
+        qlowers = self._lowers(qset)
+        squares = self._squares
+        scores = {}
+        for i in self.candidates(qset):
+            abase = self._frozen_bases[i]
+            common = qset & self._expansion_sets[i]
+            qseed, aseed = qids | common, abase | common
+            qterms = [term for term in qexpanded if term in qseed]
+            aterms = [term for term in self.expansions[i] if term in aseed]
+            qreduced = reduce_hierarchy(qterms, qlowers, qids | abase)
+            areduced = reduce_hierarchy(aterms, self.lowers[i], abase)
+            qsquares = sum(squares[term] for term in qreduced)
+            shared = sum(squares[term] for term in qreduced & areduced)
+            if qsquares > 0.0:
+                scores[i] = math.sqrt(shared / qsquares)
+        return scores
+
+
+def reduce_hierarchy(terms, lowers, excepts):
+    """
+    Terms left by fn_joint_hierarchyreduce from the ordered terms:
+    every (hyper, hypo) pair in permutation order, with hyper not in
+    excepts and above hypo, swaps a remaining hyper for another hypo.
+
+    Only which terms remain counts, so a multiset stands in for the
+    list the pipeline edits.
+    """
+    remaining = collections.Counter(terms)
+    for hyper in terms:
+        if hyper in excepts:
+            continue
+        below = lowers.get(hyper)
+        if not below:
+            continue
+        for hypo in terms:
+            if hypo in below and remaining[hyper]:
+                remaining[hyper] -= 1
+                remaining[hypo] += 1
+    return frozenset(term for term, count in remaining.iteritems() if count)
@@ -2,8 +2,10 @@
 
 import os
 import math
-import collections
+import time
+import itertools
 import networkx as nx
+from . import diskcache
 
 
 def idfmap(cache={}):
@@ -27,30 +29,75 @@ def idfmap_with_interpolation(nx_graph, cache={}):
         for term in nx_graph.nodes():
             if term not in idfs:
                 idfs[term] = 0.0
-        updated = 0
-        while True:
-            pre_comp = sum(idfs.values())
-            for term in idfs.keys():
-                if idfs[term] != 0.0:
-                    continue
-                elif term not in nx_graph:
-                    continue
-                else:
-                    nei_scores = [idfs[node] for node in nx.all_neighbors(nx_graph, term)]
-                    # nei_scores = [s for s in nei_scores if s != 0.0]
-                    if nei_scores:
-                        idfs[term] = float(sum(nei_scores)) / float(len(nei_scores))
-            updates = sum(idfs.values()) - pre_comp
-            updated += 1
-            if updates == 0.0:
-                break
-        print(u'(idfmap interpole) updated: {} times / inserted weights: {}'.format(
-            unicode(updated),
+        terms = sorted(idfs)
+        values = [idfs[term] for term in terms]
+        unknown = [
+            i for i, term in enumerate(terms)
+            if values[i] == 0.0 and term in nx_graph
+        ]
+        started = time.time()
+        values, updated = propagate_unknowns(
+            values, neighbour_operator(nx_graph, terms), unknown,
+        )
+        elapsed = time.time() - started
+        idfs = dict(itertools.izip(terms, values))
+        print(u'(idfmap interpole) updated: {} times in {}s / inserted weights: {}'.format(
+            unicode(updated), round(elapsed, 4),
             u','.join([u'{}/{}'.format(t, idfs[t]) for t in set(idfs.keys()).difference(set(orig_terms))])
         ))
         cache['cache'] = idfs
     return cache['cache'].copy()
 
+def neighbour_operator(nx_graph, terms):
+    """
+    Build the neighbour-averaging operator over `terms` in CSR form.
+
+    Row i lists the positions in `terms` of every neighbour (in & out)
+    of terms[i]; terms out of nx_graph get an empty row.
+    """
+    position = {term: i for i, term in enumerate(terms)}
+    indptr = [0]
+    indices = []
+    for term in terms:
+        if term in nx_graph:
+            indices.extend(
+                position[node] for node in nx.all_neighbors(nx_graph, term)
+                if node in position
+            )
+        indptr.append(len(indices))
+    return indptr, indices
+
+def propagate_unknowns(values, operator, unknown, tol=1.0e-8, max_iter=10000):
+    """
+    Fill unknown values by neighbour averages until convergence.
+
+    Jacobi updates: every sweep reads the values of the previous sweep,
+    so the result does not depend on any iteration order. An unknown
+    value is fixed as soon as its neighbour average becomes non-zero.
+    Returns the filled values and the number of sweeps.
+    """
+    indptr, indices = operator
+    values = list(values)
+    pending = sorted(i for i in unknown if indptr[i] != indptr[i + 1])
+    sweeps = 0
+    while True:
+        updates = []
+        for i in pending:
+            row = indices[indptr[i]:indptr[i + 1]]
+            average = sum(values[j] for j in row) / float(len(row))
+            if average != 0.0:
+                updates.append((i, average))
+        sweeps += 1
+        for i, average in updates:
+            values[i] = average
+        if sum(abs(average) for i, average in updates) <= tol:
+            break
+        if sweeps > max_iter:
+            raise nx.NetworkXError('idf interpolation failed to converge '
+                                   'in %d sweeps.' % (sweeps - 1))
+        pending = [i for i in pending if values[i] == 0.0]
+    return values, sweeps
+
 def stopwords():
     path = os.path.abspath(
         os.path.sep.join([os.path.dirname(__file__), 'mod_stopwords.txt'])
@@ -66,58 +113,102 @@ def stopwords():
     return stops
 
 def matchterms(sequence, terms, stopwords, prefer_from=tuple()):
-    termdict = collections.defaultdict(list)
-    for t in set(terms):
-        termdict[t[0]].append(t)
-    for index in termdict:
-        termdict[index].sort(reverse=True, key=lambda wd: len(wd))
-
-    if prefer_from:
-        for index in termdict:
-            for preference in reversed(prefer_from):
-                cp_order = termdict[index][:]
-                new_order = []
-                for term in termdict[index]:
-                    if term in preference:
-                        cp_order.remove(term)
-                        new_order.append(term)
-                new_order.extend(cp_order)
-                termdict[index] = new_order
-
-    cp_sequence = sequence[:]
-    sequence_que = list(reversed(sequence))
-    splits = []
-
-    while cp_sequence:
-        candidates = termdict[sequence_que[-1]]
-        if not candidates:
-            sequence_que.pop()
-            cp_sequence = cp_sequence[1:]
-            continue
-
-        for match in candidates:
-            if cp_sequence.startswith(match):
-                break
-        else:
-            sequence_que.pop()
-            cp_sequence = cp_sequence[1:]
-            continue
+    return compile_matcher(terms, prefer_from=prefer_from).split(sequence, stopwords)
 
-        if match not in stopwords:
-            splits.append(match)
-        cp_sequence = cp_sequence[len(match):]
-        sequence_que = sequence_que[:-len(match)]
+MATCHERS_IN_MEMORY = 256
 
-    return splits
+def compile_matcher(terms, prefer_from=tuple(), cache=diskcache.MemoryCache(MATCHERS_IN_MEMORY)):
+    key = (
+        frozenset(terms),
+        tuple(frozenset(preference) for preference in prefer_from),
+    )
+    matcher = cache.get(key)
+    if matcher is None:
+        matcher = cache.set(key, TermMatcher(terms, prefer_from=prefer_from))
+    return matcher
 
 def termfind_func(terms_to_match, stopwords, prefer_from=tuple()):
+    matcher = TermMatcher(terms_to_match, prefer_from=prefer_from)
+    stopwords = frozenset(stopwords)
     def _termfind(sentences):
         terms = []
         for sent in sentences:
-            terms.extend(matchterms(sent, terms_to_match, stopwords, prefer_from=prefer_from))
+            terms.extend(matcher.split(sent, stopwords))
         return terms
     return _termfind
 
+
+class TermMatcher(object):
+    """
+    Longest-match term segmentation over a precompiled trie.
+    """
+
+    def __init__(self, terms, prefer_from=tuple()):
+        """
+        Compile terms into a character trie.
+
+        Options:
+            * prefer_from: sequence of term collections; matches are
+                           ranked by membership in each collection in turn,
+                           then by length.
+        """
+        preferences = [frozenset(preference) for preference in prefer_from]
+        self._trie = {}
+        for term in set(terms):
+            if not term:
+                continue
+            node = self._trie
+            for char in term:
+                node = node.setdefault(char, {})
+            rank = tuple(term not in preference for preference in preferences)
+            node[None] = (rank, -len(term)), term
+
+    def split(self, sequence, stopwords=frozenset()):
+        """Segment sequence into matched terms, dropping stopwords."""
+        splits = []
+        position, end = 0, len(sequence)
+        while position < end:
+            match = self._match_at(sequence, position, end)
+            if match is None:
+                position += 1
+                continue
+            if match not in stopwords:
+                splits.append(match)
+            position += len(match)
+        return splits
+
+    def findall(self, sequence):
+        """Set of the terms occurring anywhere in sequence, overlapping or not."""
+        found = set()
+        end = len(sequence)
+        for start in xrange(end):
+            node = self._trie
+            position = start
+            while position < end:
+                node = node.get(sequence[position])
+                if node is None:
+                    break
+                terminal = node.get(None)
+                if terminal is not None:
+                    found.add(terminal[1])
+                position += 1
+        return found
+
+    def _match_at(self, sequence, position, end):
+        node = self._trie
+        best = None
+        while position < end:
+            node = node.get(sequence[position])
+            if node is None:
+                break
+            terminal = node.get(None)
+            if terminal is not None and (best is None or terminal < best):
+                best = terminal
+            position += 1
+        if best is None:
+            return None
+        return best[1]
+
 def uniq(term_sets):
     def _uniq(termset):
         seen = []
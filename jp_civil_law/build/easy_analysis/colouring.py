@@ -5,29 +5,39 @@ import colors.primary
 import colors.rainbow
 
 
-def set_graphcolor(agraph, rankcolor=False, rankmap=None, fullrange=False):
+# Colours are written as graphviz attributes on the networkx graph:
+# node data for nodes, nx_graph.graph['graph'] for the graph, which
+# networkx.to_agraph carries over to the AGraph.
+
+# brightness steps of the rank palettes; 8-bit channels have no more.
+PALETTE_LEVELS = 256
+RANK_HUE, RANK_SATURATION = 0.6, 0.8
+
+def graph_attrs(nx_graph):
+    return nx_graph.graph.setdefault('graph', {})
+
+def set_graphcolor(nx_graph, rankcolor=False, rankmap=None, fullrange=False):
     if rankcolor and rankmap is not None:
-        colormap = pwrvariation_with_ranks(agraph, rankmap, fullrange=fullrange)
+        colormap = pwrvariation_with_ranks(nx_graph, rankmap, fullrange=fullrange)
         blueback = True
     else:
-        colormap = default_colormap(agraph)
+        colormap = default_colormap(nx_graph)
         blueback = False
-    color_graph(agraph, colormap, blueback=blueback)
+    color_graph(nx_graph, colormap, blueback=blueback)
 
-def default_colormap(agraph):
-    return dict.fromkeys(agraph.nodes(), 'edf1f2')
+def default_colormap(nx_graph):
+    return dict.fromkeys(nx_graph.nodes(), 'edf1f2')
 
-def set_mixed_graphcolor(agraph, rankmap_1, rankmap_2, fullrange=False):
+def set_mixed_graphcolor(nx_graph, rankmap_1, rankmap_2, fullrange=False):
     diffmap = {}
     for node in rankmap_1:
         rank_1, rank_2 = rankmap_1[node], rankmap_2[node]
         diffmap[node] = rank_1 - rank_2
-    colormap = pwrvariation_with_ranks(agraph, diffmap, fullrange=fullrange)
+    colormap = pwrvariation_with_ranks(nx_graph, diffmap, fullrange=fullrange)
 
-    color_graph(agraph, colormap, blueback=True)
+    color_graph(nx_graph, colormap, blueback=True)
 
-def pwrvariation_with_ranks(agraph, rankmap, pivot=0.6, fullrange=False):
-    colormap = {}
+def pwrvariation_with_ranks(nx_graph, rankmap, pivot=0.6, fullrange=False):
     if fullrange:
         minval = min(rankmap.values())
         maxval = max(rankmap.values())
@@ -40,32 +50,59 @@ def pwrvariation_with_ranks(agraph, rankmap, pivot=0.6, fullrange=False):
     else:
         semi_range = False
         valrange = max(maxval, abs(minval))
+    palette = value_palette(RANK_HUE, RANK_SATURATION)
     if valrange == 0.0:
-        return dict.fromkeys(agraph.nodes(), str(colors.hsv(0.6, 0.8, pivot).hex))
-    for node in agraph.nodes():
-        if semi_range:
-            colordepth = (rankmap[node] - minval) / valrange
-        else:
-            colordepth = rankmap[node] / valrange
-        rankval = pivot + 0.4 * colordepth
-        colormap[node] = str(colors.hsv(0.6, 0.8, rankval).hex)
-    return colormap
-
-def color_graph(agraph, colormap, blueback=False):
-    for node in agraph.nodes():
-        node_obj = agraph.get_node(node)
-        color = colormap[node]
-        inverted = str(colors.hex(color).invert().hex)
-        node_obj.attr['style'] = 'filled'
-        node_obj.attr['fillcolor'] = '#' + color
-        node_obj.attr['fontcolor'] = '#' + inverted
+        return dict.fromkeys(nx_graph.nodes(), palette[palette_level(pivot)])
+    # rankval = pivot + 0.4 * colordepth, folded into one scale & offset.
+    offset = minval if semi_range else 0.0
+    scale = 0.4 * (PALETTE_LEVELS - 1) / valrange
+    base = pivot * (PALETTE_LEVELS - 1) + 0.5
+    top = PALETTE_LEVELS - 1
+    nodes = nx_graph.nodes()
+    levels = [int(base + (rankmap[node] - offset) * scale) for node in nodes]
+    return dict(zip(nodes, [palette[min(max(level, 0), top)] for level in levels]))
+
+def palette_level(value):
+    return min(max(int(value * (PALETTE_LEVELS - 1) + 0.5), 0), PALETTE_LEVELS - 1)
+
+def value_palette(hue, saturation, cache={}):
+    """Hex colours of hue & saturation, by brightness level (see PALETTE_LEVELS)."""
+    key = (hue, saturation)
+    if key not in cache:
+        cache[key] = [
+            str(colors.hsv(hue, saturation, level / float(PALETTE_LEVELS - 1)).hex)
+            for level in range(PALETTE_LEVELS)
+        ]
+    return cache[key]
+
+def inverted_hex(color, cache={}):
+    if color not in cache:
+        cache[color] = str(colors.hex(color).invert().hex)
+    return cache[color]
+
+def color_attrs(colormap, blueback=False):
+    """{node => graphviz attributes} of colormap; nodes of a colour share one dict."""
+    by_color = {}
+    for color in set(colormap.itervalues()):
+        attrs = {
+            'style': 'filled',
+            'fillcolor': '#' + color,
+            'fontcolor': '#' + inverted_hex(color),
+        }
+        if blueback:
+            attrs['penwidth'] = '0'
+        by_color[color] = attrs
+    return {node: by_color[color] for node, color in colormap.iteritems()}
+
+def color_graph(nx_graph, colormap, blueback=False):
+    node_attrs = color_attrs(colormap, blueback=blueback)
+    for node, attrs in nx_graph.nodes_iter(data=True):
+        attrs.update(node_attrs[node])
     if blueback:
-        agraph.graph_attr['bgcolor'] = '#' + str(colors.hsv(0.6, 0.8, 0.6).hex)
-        for node in agraph.nodes():
-            nodeobj = agraph.get_node(node)
-            nodeobj.attr['penwidth'] = '0'
+        palette = value_palette(RANK_HUE, RANK_SATURATION)
+        graph_attrs(nx_graph)['bgcolor'] = '#' + palette[palette_level(0.6)]
 
-def color_nodeborders(agraph, target_nodes,
+def color_nodeborders(nx_graph, target_nodes,
                       preset_with_fill=None, color=colors.primary.red):
     if preset_with_fill == 'a':
         color = colors.rainbow.green + colors.hsv(0.0, 0.0, 0.3)
@@ -73,9 +110,9 @@ def color_nodeborders(agraph, target_nodes,
         color = colors.rainbow.orange + colors.hsv(0.0, 0.0, 0.3)
     elif preset_with_fill == 'ab':
         color = colors.rainbow.violet + colors.hsv(0.0, 0.0, 0.3)
-    agraph.graph_attr['color'] = '#' + str(color.hex)
-    for node in agraph.nodes():
-        if node in target_nodes:
-            node_obj = agraph.get_node(node)
-            node_obj.attr['color'] = '#' + str(color.hex)
-            node_obj.attr['penwidth'] = '1'
+    border = {'color': '#' + str(color.hex), 'penwidth': '1'}
+    graph_attrs(nx_graph)['color'] = border['color']
+    node_data = nx_graph.node
+    for node in set(target_nodes):
+        if node in node_data:
+            node_data[node].update(border)
@@ -0,0 +1,88 @@
+# encoding: utf-8
+
+import os
+import json
+import mmap
+
+
+CASES = os.path.abspath(
+    os.path.sep.join([os.path.dirname(__file__), 'cases.jsonl'])
+)
+
+
+class CaseDataset(object):
+    """
+    Line-delimited JSON case records, indexed by case key.
+
+    One record per line:
+        {"key": ..., "kind": "article"|"question",
+         "title": ..., "sents": [...], "refs": [...],
+         "terms": [...], "terms_add": [...], "answers": [...]}
+    "refs", "terms_add" and "answers" are optional.
+    """
+
+    def __init__(self, path=CASES):
+        """
+        Options:
+            * path: .jsonl file to read records from.
+        """
+        self._path = path
+        self._index = None
+
+    @property
+    def path(self):
+        """Source .jsonl path."""
+        return self._path
+
+    @property
+    def index(self):
+        """{key => (kind, byte offset)}, built by one scan on first use."""
+        if self._index is None:
+            index = {}
+            self._order = []
+            for offset, record in self._scan():
+                index[record[u'key']] = record[u'kind'], offset
+                self._order.append(record[u'key'])
+            self._index = index
+        return self._index
+
+    def keys(self, kind=None):
+        """Case keys in file order, optionally only of one kind."""
+        index = self.index
+        return [
+            key for key in self._order
+            if kind is None or index[key][0] == kind
+        ]
+
+    def iterrecords(self, kind=None):
+        """Stream records in file order, optionally only of one kind."""
+        for offset, record in self._scan():
+            if kind is None or record[u'kind'] == kind:
+                yield record
+
+    def record(self, key):
+        """Random access to a single record by key."""
+        kind, offset = self.index[key]
+        with open(self._path, 'rb') as cases:
+            mapped = mmap.mmap(cases.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                end = mapped.find('\n', offset)
+                if end == -1:
+                    end = mapped.size()
+                return json.loads(mapped[offset:end].decode('utf-8'))
+            finally:
+                mapped.close()
+
+    def _scan(self):
+        with open(self._path, 'rb') as cases:
+            offset = 0
+            for line in cases:
+                if line.strip():
+                    yield offset, json.loads(line.decode('utf-8'))
+                offset += len(line)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
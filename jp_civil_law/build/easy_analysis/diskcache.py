@@ -0,0 +1,174 @@
+# encoding: utf-8
+
+import os
+import hashlib
+import threading
+import collections
+import cPickle as pickle
+from ... import profiling
+
+
+CACHE_DIR = os.path.abspath(
+    os.path.sep.join([os.path.dirname(__file__), os.path.pardir, 'cache'])
+)
+
+
+def digest(*parts):
+    """sha1 hex digest over unicode/str parts."""
+    sha = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, unicode):
+            part = part.encode('utf-8')
+        sha.update(part)
+        sha.update('\0')
+    return sha.hexdigest()
+
+def file_digest(*paths):
+    """sha1 hex digest over file contents."""
+    return digest(*[open(path, 'rb').read() for path in paths])
+
+def module_source(module):
+    """Path to the .py source of an imported module."""
+    return os.path.splitext(module.__file__)[0] + '.py'
+
+
+# an overfull store is cut down to this fraction of max_bytes, so that
+# the next directory scan is some writes away.
+EVICT_TO = 0.75
+
+
+class DiskCache(object):
+    """
+    Pickle-backed key/value store, one file per key.
+    """
+
+    def __init__(self, namespace, directory=CACHE_DIR, max_bytes=None):
+        """
+        Options:
+            * namespace: subdirectory of directory for this store.
+            * directory: cache root.
+            * max_bytes: evict least recently used entries beyond
+                         this total size, down to EVICT_TO of it;
+                         unbounded if None.
+        """
+        self._namespace = namespace
+        self._directory = os.path.join(directory, namespace)
+        self._max_bytes = max_bytes
+        # running size of the store, seeded by the first eviction scan;
+        # other processes' writes are only seen by the next scan.
+        self._total = None
+
+    def _path(self, key):
+        return os.path.join(self._directory, digest(key) + '.pickle')
+
+    def get(self, key, default=None):
+        """Stored value for key, or default if missing/unreadable."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as stored:
+                value = pickle.load(stored)
+        except (IOError, EOFError, pickle.UnpicklingError):
+            profiling.count(u'cache misses: {}'.format(self._namespace))
+            return default
+        profiling.count(u'cache hits: {}'.format(self._namespace))
+        if self._max_bytes is not None:
+            self._touch(path)
+        return value
+
+    def set(self, key, value):
+        """Store value for key, replacing atomically."""
+        if not os.path.isdir(self._directory):
+            try:
+                os.makedirs(self._directory)
+            except OSError:
+                if not os.path.isdir(self._directory):
+                    raise
+        path = self._path(key)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'wb') as stored:
+            pickle.dump(value, stored, pickle.HIGHEST_PROTOCOL)
+        if self._max_bytes is not None and self._total is not None:
+            self._total += os.path.getsize(tmp_path) - self._size(path)
+        os.rename(tmp_path, path)
+        if self._max_bytes is not None:
+            if self._total is None or self._total > self._max_bytes:
+                self._evict(keep=path)
+        return value
+
+    def _size(self, path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _touch(self, path):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _evict(self, keep):
+        entries = []
+        for name in os.listdir(self._directory):
+            if not name.endswith('.pickle'):
+                continue
+            path = os.path.join(self._directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for mtime, size, path in entries)
+        target = self._max_bytes * EVICT_TO if total > self._max_bytes else total
+        for mtime, size, path in sorted(entries):
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._total = total
+
+    def __contains__(self, key):
+        found = os.path.exists(self._path(key))
+        profiling.count(u'cache {}: {}'.format(u'hits' if found else u'misses', self._namespace))
+        return found
+
+
+class MemoryCache(object):
+    """
+    In-process key/value store keeping the max_entries last used.
+    """
+
+    def __init__(self, max_entries):
+        self._max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Stored value for key, now the last used, or default if missing."""
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                return default
+            self._entries[key] = value
+            return value
+
+    def set(self, key, value):
+        """Store value for key, dropping the least recently used beyond max_entries."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,202 @@
+# encoding: utf-8
+
+import weakref
+import networkx as nx
+from . import diskcache
+
+
+class LabelIndex(object):
+    """
+    Adjacency of a labelled graph, partitioned by edge 'label'.
+
+    Views are built per label set on first use, in graph edge order.
+    """
+
+    def __init__(self, nx_graph):
+        self._graph = weakref.ref(nx_graph)
+        self.nodes = nx_graph.nodes()
+        self._edges = [
+            (src, dest, attrs['label'])
+            for src, dest, attrs in nx_graph.edges_iter(data=True)
+        ]
+        self._views = {}
+
+    def _view(self, kind, labels, build):
+        if labels is not None:
+            labels = frozenset(labels)
+        if (kind, labels) not in self._views:
+            self._views[(kind, labels)] = build(labels)
+        return self._views[(kind, labels)]
+
+    def _edges_in(self, labels):
+        return (
+            (src, dest) for src, dest, label in self._edges
+            if labels is None or label in labels
+        )
+
+    def successors(self, labels=None):
+        """{node => [successor, ...]} over edges labelled from labels (all if None)."""
+        def build(labels):
+            adjacency = {node: [] for node in self.nodes}
+            for src, dest in self._edges_in(labels):
+                adjacency[src].append(dest)
+            return adjacency
+        return self._view('successors', labels, build)
+
+    def predecessors(self, labels=None):
+        """{node => [predecessor, ...]} over edges labelled from labels (all if None)."""
+        def build(labels):
+            adjacency = {node: [] for node in self.nodes}
+            for src, dest in self._edges_in(labels):
+                adjacency[dest].append(src)
+            return adjacency
+        return self._view('predecessors', labels, build)
+
+    def subgraph(self, labels=None):
+        """DiGraph of every node and the edges labelled from labels; read only."""
+        def build(labels):
+            # prune a copy rather than rebuild: path searches break ties in
+            # adjacency dict order, which a rebuilt graph would not keep.
+            subgraph = self._graph().copy()
+            subgraph.remove_edges_from([
+                (src, dest) for src, dest, label in self._edges
+                if labels is not None and label not in labels
+            ])
+            return subgraph
+        return self._view('subgraph', labels, build)
+
+
+def labelindex(nx_graph, cache=weakref.WeakKeyDictionary()):
+    """LabelIndex built once per graph; keep nx_graph unchanged."""
+    if nx_graph not in cache:
+        cache[nx_graph] = LabelIndex(nx_graph)
+    return cache[nx_graph]
+
+
+class TermTable(object):
+    """
+    Dense int ids of terms: the nodes of a graph first, then the terms
+    interned later. Ids never change.
+
+    ids maps term => id, labels id => term; ids below node_count
+    are the nodes'. Reachability and the article index run on these
+    ids; the joint mappers and similarity vectors stay on labels.
+    """
+
+    def __init__(self, nodes=()):
+        self.labels = []
+        self.ids = {}
+        for node in nodes:
+            self.intern(node)
+        self.node_count = len(self.labels)
+
+    def intern(self, term):
+        """Id of term, given a new one if it has none yet."""
+        i = self.ids.get(term)
+        if i is None:
+            i = self.ids[term] = len(self.labels)
+            self.labels.append(term)
+        return i
+
+    def intern_all(self, terms):
+        return [self.intern(term) for term in terms]
+
+    def known(self, terms):
+        """Ids of the terms having one, in order; the others are left out."""
+        ids = self.ids
+        return [ids[term] for term in terms if term in ids]
+
+    def is_node(self, i):
+        return i < self.node_count
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, term):
+        return term in self.ids
+
+
+def termtable(nx_graph, cache=weakref.WeakKeyDictionary()):
+    """TermTable of nx_graph's nodes in LabelIndex order, built once per graph; keep nx_graph unchanged."""
+    if nx_graph not in cache:
+        cache[nx_graph] = TermTable(labelindex(nx_graph).nodes)
+    return cache[nx_graph]
+
+
+class Reachability(object):
+    """
+    Transitive closure of a (labelled sub)graph, as integer bitsets
+    over the ids of the graph's TermTable.
+    """
+
+    def __init__(self, nx_graph, labels=None):
+        """
+        Options:
+            * labels: only follow edges whose 'label' is in labels;
+                      every edge is followed if None.
+        """
+        self.table = termtable(nx_graph)
+        self._position = self.table.ids
+        self._reach = self._closure(labelindex(nx_graph).subgraph(labels))
+
+    def _closure(self, subgraph):
+        # contract cycles first, then OR the bitsets up a reversed topological order.
+        components = list(nx.strongly_connected_components(subgraph))
+        component_of = {}
+        members = []
+        for i, component in enumerate(components):
+            bits = 0
+            for node in component:
+                component_of[node] = i
+                bits |= 1 << self._position[node]
+            members.append(bits)
+        condensed = nx.DiGraph()
+        condensed.add_nodes_from(range(len(components)))
+        condensed.add_edges_from(
+            (component_of[src], component_of[dest])
+            for src, dest in subgraph.edges_iter()
+            if component_of[src] != component_of[dest]
+        )
+        reach = list(members)
+        for component in reversed(list(nx.topological_sort(condensed))):
+            for successor in condensed.successors_iter(component):
+                reach[component] |= reach[successor]
+        by_id = [0] * self.table.node_count
+        for node in subgraph:
+            by_id[self._position[node]] = reach[component_of[node]]
+        return by_id
+
+    def reachable(self, src, dest):
+        """True if a path src -> ... -> dest exists (src reaches itself)."""
+        return bool(self._reach[self._position[src]] >> self._position[dest] & 1)
+
+    def reach_bits(self, i):
+        """Bitset of the node ids the node of id i reaches."""
+        return self._reach[i]
+
+    def __contains__(self, node):
+        i = self._position.get(node)
+        return i is not None and self.table.is_node(i)
+
+
+def reachability(nx_graph, labels=None, cache=weakref.WeakKeyDictionary()):
+    """Reachability index built once per (graph, labels); keep nx_graph unchanged."""
+    if labels is not None:
+        labels = frozenset(labels)
+    indices = cache.setdefault(nx_graph, {})
+    if labels not in indices:
+        indices[labels] = Reachability(nx_graph, labels=labels)
+    return indices[labels]
+
+
+def content_digest(nx_graph, cache=weakref.WeakKeyDictionary()):
+    """sha1 hex digest over nodes and labelled edges; keep nx_graph unchanged."""
+    if nx_graph not in cache:
+        edges = sorted(
+            (src, dest, attrs['label'])
+            for src, dest, attrs in nx_graph.edges_iter(data=True)
+        )
+        cache[nx_graph] = diskcache.digest(
+            *(sorted(nx_graph.nodes()) + [u'\t'.join(edge) for edge in edges])
+        )
+    return cache[nx_graph]
@@ -2,6 +2,7 @@
 
 import networkx as nx
 from networkx.exception import NetworkXError
+from ... import profiling
 
 
 def personalization_map(targets, whole, amplify=100.0):
@@ -138,6 +139,7 @@ class PageRank(object):
                                     'in %d iterations.'%(i-1))
             i += 1
 
+        profiling.count(u'pagerank iterations', i + 1)
         return I
 
     @classmethod
@@ -225,4 +227,5 @@ class PageRank(object):
                     break
             i += 1
 
+        profiling.count(u'pagerank iterations', i + 1)
         return I
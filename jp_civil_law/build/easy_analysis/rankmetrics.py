@@ -0,0 +1,74 @@
+# encoding: utf-8
+
+import math
+
+
+def tie_ranks(order, qkey):
+    """
+    {key => rank} for the keys paired with qkey in order, a list of
+    ((key_a, key_b), score) sorted by descending score; keys scoring
+    the same share the middle rank of their group.
+    """
+    ranks = {}
+    ranked = 0
+    group = set()
+    prev_score = None
+    for keypair, score in order:
+        if group and score != prev_score:
+            ranked = _rank_group(ranks, group, ranked)
+            group = set()
+        prev_score = score
+        group.update(keypair)
+        group.discard(qkey)
+    _rank_group(ranks, group, ranked)
+    return ranks
+
+def _rank_group(ranks, group, ranked):
+    rank = float(ranked) + (1.0 + float(len(group) - 1) / 2.0)
+    for key in group:
+        ranks[key] = rank
+    return ranked + len(group)
+
+def answer_ranks(order, answers, qkey, noorder=True):
+    """Tie-aware ranks of answers in order, ascending if noorder."""
+    ranks = tie_ranks(order, qkey)
+    rankstack = []
+    for artkey in answers:
+        if artkey not in ranks:
+            raise ValueError('?')
+        rankstack.append(ranks[artkey])
+    if noorder:
+        rankstack.sort()
+    return rankstack
+
+def mean_average_precision(rankstack):
+    ratiostack = [
+        float(correct_rank) / float(rank)
+        for correct_rank, rank in enumerate(rankstack, start=1)
+    ]
+    return sum(ratiostack) / float(len(ratiostack))
+
+def average_rank(rankstack):
+    """(average rank, average log rank) over rank / ideal rank ratios."""
+    ratiostack = [
+        float(rank) / float(correct_rank)
+        for correct_rank, rank in enumerate(rankstack, start=1)
+    ]
+    rank = sum(ratiostack) / float(len(ratiostack))
+    logrank = sum(2.0 * math.log(r) for r in ratiostack) / float(len(ratiostack))
+    return rank, logrank
+
+def f_measure(F_threshold, rankstack):
+    num_recall = len([rank_ for rank_ in rankstack if rank_ <= F_threshold])
+    return float(num_recall) / (0.5 * (F_threshold + float(len(rankstack))))
+
+def question_metrics(order, answers, qkey, F_threshold, noorder=True):
+    """{'map', 'rank', 'logrank', 'f'} of one question, from a single ranking pass."""
+    rankstack = answer_ranks(order, answers, qkey, noorder=noorder)
+    rank, logrank = average_rank(rankstack)
+    return {
+        'map': mean_average_precision(rankstack),
+        'rank': rank,
+        'logrank': logrank,
+        'f': f_measure(F_threshold, rankstack),
+    }
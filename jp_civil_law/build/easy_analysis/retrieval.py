@@ -0,0 +1,82 @@
+# encoding: utf-8
+
+import threading
+from . import casedata as data
+from . import casemaker
+from . import diskcache
+from . import articleindex
+from ... import profiling
+
+
+class QueryEngine(object):
+    """
+    Ranks the articles against raw question texts, with the graph, idf
+    weights, term matcher and article index prepared once.
+
+    Questions get the scores of the create_joint_mapper pipeline of
+    mode (see articleindex), one at a time as expanding a question
+    writes to shared caches; term extraction runs concurrently.
+    """
+
+    def __init__(self, nx_graph, mode='network', jobs=1):
+        """
+        Options:
+            * jobs: processes to expand the article term sets with.
+        """
+        if mode not in (u'network', u'nonetwork', u'baseline'):
+            raise ValueError('no mode named "{}"'.format(mode))
+        self.nx_graph = nx_graph
+        self.mode = mode
+        self.jobs = jobs
+        self.ready = False
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Prepare everything but the questions."""
+        with profiling.span(u'term_sets'):
+            if self.mode == u'network':
+                self.term_sets = data.all_mixedterm_sets()
+                self.allterms = data.mixed_allterms()
+                self._find_terms = data.find_mixedterms()
+            elif self.mode == u'nonetwork':
+                self.term_sets = data.uniq_all_idfterm_sets()
+                self.allterms = data.idf_allterms()
+                self._find_terms = data.find_idfterms()
+            else:
+                self.term_sets = data.all_idfterm_sets()
+                self.allterms = data.idf_allterms()
+                self._find_terms = data.find_idfterms()
+            self.articles = sorted(data.allart_term_sets())
+        with profiling.span(u'article_index'):
+            self.index = articleindex.ArticleIndex(
+                self.nx_graph, self.mode, self.term_sets, self.articles, self.allterms,
+                jobs=self.jobs,
+            )
+        self.ready = True
+        return self
+
+    def terms(self, text):
+        """Terms of the question text, in order of appearance, without repeats."""
+        sentences = [line for line in text.split(u'\n') if line.strip()]
+        return casemaker.uniq({None: self._find_terms(sentences)})[None]
+
+    def rank(self, text, limit=10):
+        """
+        {'terms': question terms, 'articles': [[article key, score], ...]}
+        of the limit best scored articles (all if None), best first;
+        articles scored 0 are left out.
+        """
+        terms = self.terms(text)
+        if not terms:
+            return {u'terms': [], u'articles': []}
+        # question keys start with "q"; same terms, same key.
+        qkey = u'q/query/{}'.format(diskcache.digest(*terms))
+        with self._lock:
+            scored = self.index.score(qkey, terms)
+        scored.sort(key=lambda (akey, score): (-score, akey))
+        if limit is not None:
+            scored = scored[:limit]
+        return {
+            u'terms': list(terms),
+            u'articles': [[akey, score] for akey, score in scored],
+        }
@@ -1,12 +1,14 @@
 # encoding: utf-8
 
+import sys
 import math
 import itertools
+import multiprocessing
+import StringIO
 from . import casedata as data
 
 
-answermap = data.answermap
-def selective_print(key1, map_1, key2, map_2):
+def selective_print(key1, map_1, key2, map_2, answermap):
     if key1 in answermap.get(key2, []):
         q, qmap, a, amap = key2, map_2, key1, map_1
     if key2 in answermap.get(key1, []):
@@ -46,25 +48,72 @@ def combination_sims(term_sets, dimensions, distribution=None):
         sims[(key1, key2)] = sim
     return sims
 
-def joint_combination_sims(term_sets, dimensions, jdistribution_fn=None):
-    sims = {}
-    def calculate_distribution(key_a, key_b, distcache={}):
-        assert set(term_sets[key_a]).issubset(set(dimensions)), \
-               (u'{}: '.format(key_a) + u','.join(set(term_sets[key_a]).difference(set(dimensions)))).encode('utf-8')
-        assert set(term_sets[key_b]).issubset(set(dimensions)), \
-               (u'{}: '.format(key_b) + u','.join(set(term_sets[key_b]).difference(set(dimensions)))).encode('utf-8')
-        if (key_a, key_b) not in distcache:
-            rankmap_a, mod_terms_a, rankmap_b, mod_terms_b = jdistribution_fn(key_a, term_sets[key_a], key_b, term_sets[key_b])
-            distcache[(key_a), (key_b)] = rankmap_a, mod_terms_a, rankmap_b, mod_terms_b
-        return distcache[(key_a, key_b)]
-
-    for key1, key2 in itertools.permutations(sorted(term_sets, reverse=True), 2):
-        rankmap_1, mod_terms1, rankmap_2, mod_terms_b = calculate_distribution(key1, key2)
-        selective_print(key1, rankmap_1, key2, rankmap_2)
+def _joint_row(inputs, key1):
+    # one key's row of similarities.
+    term_sets, dimensions, jdistribution_fn, keys = inputs
+    dimension_set = set(dimensions)
+    answermap = data.answermap()
+    row = []
+    for key2 in keys:
+        if key2 == key1:
+            continue
+        for key in (key1, key2):
+            assert set(term_sets[key]).issubset(dimension_set), \
+                   (u'{}: '.format(key) + u','.join(set(term_sets[key]).difference(dimension_set))).encode('utf-8')
+        rankmap_1, mod_terms1, rankmap_2, mod_terms_b = jdistribution_fn(key1, term_sets[key1], key2, term_sets[key2])
+        selective_print(key1, rankmap_1, key2, rankmap_2, answermap)
         vect_1 = rankmap2vect(rankmap_1, dimensions)
         vect_2 = rankmap2vect(rankmap_2, dimensions)
-        sim = cosine_similarity(vect_1, vect_2)
-        sims[(key1, key2)] = sim
+        row.append((key2, cosine_similarity(vect_1, vect_2)))
+    return key1, row
+
+# set in each forked pool worker by _init_joint_worker; never in the parent.
+_worker_inputs = None
+
+def _init_joint_worker(inputs):
+    global _worker_inputs
+    _worker_inputs = inputs
+
+def _captured_joint_row(key1):
+    captured = StringIO.StringIO()
+    stdout, sys.stdout = sys.stdout, captured
+    try:
+        key1, row = _joint_row(_worker_inputs, key1)
+    finally:
+        sys.stdout = stdout
+    return key1, row, captured.getvalue()
+
+def joint_combination_rows(term_sets, dimensions, jdistribution_fn=None, rowkeys=None, jobs=1):
+    """
+    Yield (key_a, [(key_b, sim), ...]) for each key_a of rowkeys in order
+    (every key, descending, if None) as soon as its row is scored.
+    """
+    keys = sorted(term_sets, reverse=True)
+    rowkeys = keys if rowkeys is None else list(rowkeys)
+    if not rowkeys:
+        return
+    inputs = term_sets, dimensions, jdistribution_fn, keys
+    if jobs <= 1:
+        for key1 in rowkeys:
+            yield _joint_row(inputs, key1)
+        return
+    # workers are forked with the inputs, so the mappers are never pickled;
+    # rows come back in key order, with whatever the mappers printed.
+    pool = multiprocessing.Pool(jobs, initializer=_init_joint_worker, initargs=(inputs,))
+    try:
+        for key1, row, printed in pool.imap(_captured_joint_row, rowkeys):
+            if printed:
+                sys.stdout.write(printed.encode(sys.stdout.encoding or 'utf-8'))
+            yield key1, row
+    finally:
+        pool.terminate()
+        pool.join()
+
+def joint_combination_sims(term_sets, dimensions, jdistribution_fn=None, jobs=1):
+    sims = {}
+    for key1, row in joint_combination_rows(term_sets, dimensions, jdistribution_fn, jobs=jobs):
+        for key2, sim in row:
+            sims[(key1, key2)] = sim
     return sims
 
 def cosine_similarity(vect_a, vect_b):
@@ -90,9 +139,15 @@ def dist_similarities(dimensions, term_sets, distribution_fn=None):
         term_sets, dimensions, distribution=distribution_fn,
     )
 
-def joint_dist_similarities(dimensions, term_sets, distribution_fn=None):
+def joint_dist_similarities(dimensions, term_sets, distribution_fn=None, jobs=1):
     return joint_combination_sims(
+        term_sets, dimensions, jdistribution_fn=distribution_fn, jobs=jobs,
+    )
+
+def joint_dist_rows(dimensions, term_sets, distribution_fn=None, rowkeys=None, jobs=1):
+    return joint_combination_rows(
         term_sets, dimensions, jdistribution_fn=distribution_fn,
+        rowkeys=rowkeys, jobs=jobs,
     )
 
 def print_dist_similarities(dimensions, term_sets,
@@ -1,13 +1,159 @@
 # encoding: utf-8
 
-from xmlpumpkin import parse_to_tree as totree
+import weakref
+import collections
+from lxml import etree
+from xmlpumpkin import cabocha
+from . import casemaker
+from . import diskcache
 
 
 AMP_TITLE = 1.4
 AMP_SUBJECT = 1.4
 
+# function words marking a chunk as a topic.
+TOPIC_FUNCS = frozenset([u'は', u'も', u'場合', u'とき', u'ば', u'なら'])
+
+
+class Scores(collections.Mapping):
+    """
+    Read-only {term => score}, shared between the callers of a cache.
+    """
+
+    def __init__(self, scores):
+        self._scores = scores
+
+    def __getitem__(self, term):
+        return self._scores[term]
+
+    def __iter__(self):
+        return iter(self._scores)
+
+    def __len__(self):
+        return len(self._scores)
+
+
+class Chunk(object):
+    """
+    A chunk of a parsed sentence: its surface, the surface of its function
+    word and the chunks depending on it.
+    """
+    __slots__ = ('surface', 'func_surface', 'linked')
+
+    def __init__(self, surface, func_surface):
+        self.surface = surface
+        self.func_surface = func_surface
+        self.linked = []
+
+
+class Tree(object):
+    """
+    Dependency tree of a sentence as CaboCha parses it, reduced to
+    what the scores read.
+    """
+
+    def __init__(self, surfaces=(), func_surfaces=(), links=()):
+        """
+        Args:
+            * surfaces, func_surfaces: of the chunks, in order.
+            * links: position of the chunk each chunk depends on, -1
+                     for none.
+        """
+        self.chunks = tuple(Chunk(surface, func) for surface, func in zip(surfaces, func_surfaces))
+        self.links = tuple(links)
+        self.root = None
+        for chunk, link in zip(self.chunks, self.links):
+            if link == -1:
+                if self.root is None:
+                    self.root = chunk
+            else:
+                self.chunks[link].linked.append(chunk)
+
+    def pack(self):
+        """(surfaces, func_surfaces, links), as Tree(*packed) takes them."""
+        return (
+            tuple(chunk.surface for chunk in self.chunks),
+            tuple(chunk.func_surface for chunk in self.chunks),
+            self.links,
+        )
+
+    @classmethod
+    def from_element(cls, element):
+        """Tree of a <sentence> element of CaboCha's XML output, or of all those under element."""
+        sentences = [element] if element.tag == 'sentence' else element.findall('sentence')
+        surfaces, func_surfaces, links = [], [], []
+        for sentence in sentences:
+            chunks = sentence.findall('.//chunk')
+            position = {int(chunk.attrib['id']): len(surfaces) + i for i, chunk in enumerate(chunks)}
+            for chunk in chunks:
+                tokens = chunk.findall('.//tok')
+                surfaces.append(u''.join(token.text for token in tokens))
+                func_id = int(chunk.attrib['func'])
+                func_surfaces.append(next(
+                    (token.text for token in tokens if int(token.attrib['id']) == func_id), None
+                ))
+                links.append(position.get(int(chunk.attrib['link']), -1))
+        return cls(surfaces, func_surfaces, links)
+
+
+# texts are parsed once: the latest used kept here, and packed on disk across runs.
+parse_cache = diskcache.DiskCache('parsetrees')
+PARSE_FORMAT = u'cabocha-xml/1'
+PARSED_IN_MEMORY = 1024
+
+def parse(text):
+    """Dependency Tree of the sentence text."""
+    return parse_batch([text])[0]
+
+def parse_batch(texts, cache=diskcache.MemoryCache(PARSED_IN_MEMORY)):
+    """
+    Trees of the sentences texts, in order; the ones parsed neither
+    lately in this process nor before go through a single CaboCha run.
+    """
+    trees, missing = {}, []
+    for text in texts:
+        if text in trees:
+            continue
+        tree = cache.get(text)
+        if tree is None:
+            packed = parse_cache.get(u'{}/{}'.format(PARSE_FORMAT, text))
+            if packed is None:
+                missing.append(text)
+            else:
+                tree = Tree(*packed)
+        trees[text] = tree
+    for text, tree in zip(missing, cabocha_parse(missing)):
+        parse_cache.set(u'{}/{}'.format(PARSE_FORMAT, text), tree.pack())
+        trees[text] = tree
+    for text in texts:
+        cache.set(text, trees[text])
+    return [trees[text] for text in texts]
+
+def cabocha_parse(texts):
+    """Trees of texts by one CaboCha run over one text per line."""
+    lines = [text for text in texts if text and u'\n' not in text]
+    sentences = []
+    if lines:
+        try:
+            sentences = wrap_sentences(cabocha.as_xml(u'\n'.join(lines))).findall('sentence')
+        except etree.XMLSyntaxError:
+            pass
+    if len(sentences) != len(lines):
+        # the run did not give one sentence per line: one run per text.
+        return [cabocha_parse_one(text) for text in texts]
+    parsed = dict(zip(lines, (Tree.from_element(sentence) for sentence in sentences)))
+    return [parsed[text] if text in parsed else cabocha_parse_one(text) for text in texts]
+
+def cabocha_parse_one(text):
+    return Tree.from_element(wrap_sentences(cabocha.as_xml(text)))
+
+def wrap_sentences(xml):
+    # CaboCha writes one <sentence> per line of input, with no root around them.
+    return etree.fromstring(u'<sentences>{}</sentences>'.format(xml).encode('utf-8'))
+
+
 def syntaxscore(termset, raw_title, raw_sents, subject=False):
-    trees = [totree(sent) for sent in raw_sents]
+    trees = parse_batch(raw_sents)
     scores = []
     scores.append(amplify_by_title(termset, raw_title))
     if subject:
@@ -17,41 +163,41 @@ def syntaxscore(termset, raw_title, raw_sents, subject=False):
     return {term: sum(score[term] for score in scores) for term in termset}
 
 def amplify_by_title(termset, title):
-    base = dict.fromkeys(termset, 1.0)
-    t = totree(title)
-    surfaces = [c.surface for c in t.chunks]
-    for term in termset:
-        for surface in surfaces:
-            if term in surface:
-                base[term] *= AMP_TITLE
-    return base
+    surfaces = [c.surface for c in parse(title).chunks]
+    return amplify_by_surfaces(termset, surfaces, AMP_TITLE)
+
+def amplify_by_syntax(termset, tree, cache=weakref.WeakKeyDictionary()):
+    """Read-only amplify_by_surfaces over the topic focus of tree, kept while tree lives."""
+    scored = cache.get(tree)
+    if scored is None:
+        scored = cache[tree] = {}
+    key = tuple(termset)
+    if key not in scored:
+        scored[key] = Scores(amplify_by_surfaces(termset, topic_focus(tree), AMP_SUBJECT))
+    return scored[key]
 
-def amplify_by_syntax(termset, tree):
+def amplify_by_surfaces(termset, surfaces, amp):
+    """{term => amp to the power of the number of surfaces holding it}"""
     base = dict.fromkeys(termset, 1.0)
-    if not tree.chunks:
-        return base
-    topicchunks = [
-        chunk for chunk in tree.chunks
-        if chunk.func_surface in (u'は', u'も', u'場合', u'とき', u'ば', u'なら')
-    ] + [tree.root]
-    topicfocus = sum([dep_expand(chunk) for chunk in topicchunks], [])
-    topicfocus = list(set(topicfocus))
-    ts = []
-    for term in termset:
-        for surface in topicfocus:
-            if term in surface:
-                ts.append(term)
-                base[term] *= AMP_SUBJECT
+    # a term listed n times is amplified n times.
+    listed = collections.Counter(termset)
+    matcher = casemaker.compile_matcher(termset)
+    for surface in surfaces:
+        for term in matcher.findall(surface):
+            base[term] *= amp ** listed[term]
     return base
 
+def topic_focus(tree, cache=weakref.WeakKeyDictionary()):
+    """Distinct surfaces of the topic chunks & the root, and of their dependents."""
+    if tree not in cache:
+        topicchunks = [chunk for chunk in tree.chunks if chunk.func_surface in TOPIC_FUNCS]
+        if tree.root is not None:
+            topicchunks.append(tree.root)
+        cache[tree] = frozenset(
+            surface for chunk in topicchunks for surface in dep_expand(chunk)
+        )
+    return cache[tree]
+
 def dep_expand(chunk):
-    def recursive_deps(root, seen):
-        for dep in root.linked:
-            if dep not in seen:
-                seen.add(dep)
-                if dep.linked:
-                    recursive_deps(dep, seen)
-    seen = set([chunk])
-    for c in chunk.linked:
-        seen.add(c)
-    return [c.surface for c in seen]
+    """Surfaces of chunk and of the chunks depending on it directly."""
+    return [chunk.surface] + [c.surface for c in chunk.linked]
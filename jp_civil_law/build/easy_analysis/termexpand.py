@@ -1,9 +1,13 @@
 # encoding: utf-8
 
+import heapq
 import itertools
+import weakref
 import networkx
 from networkx.exception import NetworkXNoPath
 import logbook
+from . import graphindex
+from ... import profiling
 
 
 logger = logbook.Logger('termexpand')
@@ -17,6 +21,7 @@ hyper_props = (u'hyper', u'hyperx')
 frame_props = (u'sbj', u'obj', u'attr_slot')
 slot_props = tuple(list(frame_props) + [u'antecedent_to', u'auth', u'auth_by', u'within'])
 all_props = tuple(list(slot_props) + list(hyper_props))
+attr_props = (u'attr_slot',)
 
 
 scorebase = dict(
@@ -31,40 +36,81 @@ scorebase = dict(
 
 def populate(terms, nx_graph, methods=tuple()):
     logger.debug(u'** start expansion from: [{}]'.format(u','.join(terms)))
-    expand = list(terms)
-    scoremap = dict.fromkeys(expand, 0.5)
+    engine = expansion_engine(nx_graph)
+    frontier = Frontier(terms)
+    scoremap = dict.fromkeys(frontier.terms, 0.5)
+    marks = {}
     exit_margin = 1
     init_margin = exit_margin
     while True:
-        prev_terms = expand[:]
+        profiling.count(u'expansion rounds')
+        prev_size = len(frontier)
         for method in methods:
-            for ex, reasons in method(expand, nx_graph):
-                expand.append(ex)
+            # terms seen before the previous run of this method need no re-check.
+            since = marks.get(method, -1)
+            marks[method] = frontier.clock
+            for ex, reasons in engine.run(method, frontier, since):
+                frontier.add(ex)
                 scoremap[ex] = scorebase[method.__name__]
                 logger.debug(u'expanded: {} from <<{}>> by [{}]'.format(ex, method.__name__, u','.join(reasons)))
-        if set(prev_terms) == set(expand):
+        if prev_size == len(frontier):
             exit_margin -= 1
             if exit_margin == 0:
                 break
         else:
             exit_margin = init_margin
-    return tuple(expand), scoremap
+    return tuple(frontier.terms), scoremap
+
+
+class Frontier(object):
+    """
+    Working term set of populate(): the expanded term list as the methods
+    see it (duplicates included), plus when each term first joined.
+    """
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self._added = dict.fromkeys(self.terms, -1)
+        self._distinct = list(self._added)
+        self.clock = 0
+
+    def add(self, term):
+        self.terms.append(term)
+        if term not in self._added:
+            self._added[term] = self.clock
+            self._distinct.append(term)
+        self.clock += 1
+
+    def seen(self, term, mark):
+        """True if term was already in the set at clock mark."""
+        return self._added.get(term, mark) < mark
+
+    def since(self, mark):
+        """Terms that joined at or after clock mark."""
+        added = []
+        for term in reversed(self._distinct):
+            if self._added[term] < mark:
+                break
+            added.append(term)
+        return added
+
+    def __contains__(self, term):
+        return term in self._added
+
+    def __len__(self):
+        return len(self._added)
 
 
 def hyperframes(terms, nx_graph):
     new = []
     for term in terms:
         current = terms + new
-        iter_hypers = links_from(term, nx_graph, hyper_props)
+        for hyperterm in links_from(term, nx_graph, hyper_props):
+            for frameterm in links_from(hyperterm, nx_graph, slot_props):
 
-        for term_, hyperterm, attrs in iter_hypers:
-            iter_slots = links_from(hyperterm, nx_graph, slot_props)
-
-            for hyperterm_, frameterm, attrs in iter_slots:
-
-                if frameterm in current and hyperterm_ not in current:
-                    new.append(hyperterm_)
-                    yield hyperterm_, [term_, frameterm]
+                if frameterm in current and hyperterm not in current:
+                    new.append(hyperterm)
+                    yield hyperterm, [term, frameterm]
 
 def hypoframes(terms, nx_graph):
     new = []
@@ -73,13 +119,11 @@ def hypoframes(terms, nx_graph):
         if term in current:
             continue
 
-        iter_hypers = links_from(term, nx_graph, hyper_props)
-        hypers = [hyper for src, hyper, attrs in iter_hypers]
+        hypers = links_from(term, nx_graph, hyper_props)
         if not hypers or set(hypers).isdisjoint(set(current)):
             continue
 
-        iter_slots = links_from(term, nx_graph, frame_props)
-        slots = [slot for src, slot, attrs in iter_slots]
+        slots = links_from(term, nx_graph, frame_props)
         if not slots or set(slots).isdisjoint(set(current)):
             continue
 
@@ -90,16 +134,12 @@ def attr_hypers(terms, nx_graph):
     new = []
     for term in terms:
         current = terms + new
-        iter_attrs = links_from(term, nx_graph, [u'attr_slot'])
-
-        for term_, attrterm, attrs in iter_attrs:
-            iter_hypers = links_from(attrterm, nx_graph, hyper_props)
+        for attrterm in links_from(term, nx_graph, attr_props):
+            for hyperterm in links_from(attrterm, nx_graph, hyper_props):
 
-            for attrterm_, hyperterm, attrs in iter_hypers:
-
-                if hyperterm in current and attrterm_ not in current:
-                    new.append(attrterm_)
-                    yield attrterm_, [term_, hyperterm]
+                if hyperterm in current and attrterm not in current:
+                    new.append(attrterm)
+                    yield attrterm, [term, hyperterm]
 
 def prerequisites(terms, nx_graph):
     new = []
@@ -108,29 +148,25 @@ def prerequisites(terms, nx_graph):
         if term in current:
             continue
 
-        iter_slots = links_from(term, nx_graph, all_props)
-        slots = [slot for pre, slot, attrs in iter_slots]
+        slots = links_from(term, nx_graph, all_props)
 
         if not slots or len(set(slots).intersection(set(current))) < 2:
             continue
 
         new.append(term)
-        yield term, slots
+        yield term, list(slots)
 
 def ascending_ways(terms, nx_graph):
-    graph_copy = nx_graph.copy()
-    for src, dest, attrs in graph_copy.edges(data=True):
-        if attrs['label'] not in hyper_props:
-            graph_copy.remove_edge(src, dest)
+    hyper_graph = graphindex.labelindex(nx_graph).subgraph(hyper_props)
 
     new = []
-    for u, v in itertools.permutations(graph_copy.nodes(), 2):
+    for u, v in itertools.permutations(hyper_graph.nodes(), 2):
         current = terms + new
         if u not in current or v not in current:
             continue
 
         try:
-            path_uv = networkx.shortest_path(graph_copy, source=u, target=v)
+            path_uv = networkx.shortest_path(hyper_graph, source=u, target=v)
         except NetworkXNoPath:
             continue
 
@@ -140,24 +176,20 @@ def ascending_ways(terms, nx_graph):
                 yield stop, [u, v]
 
 def ascendedhubs(terms, nx_graph):
-    graph_copy = nx_graph.copy()
-    for src, dest, attrs in graph_copy.edges(data=True):
-        if attrs['label'] not in hyper_props:
-            graph_copy.remove_edge(src, dest)
+    hyper_graph = graphindex.labelindex(nx_graph).subgraph(hyper_props)
 
     new = []
-    for u, v in itertools.permutations(graph_copy.nodes(), 2):
+    for u, v in itertools.permutations(hyper_graph.nodes(), 2):
         current = terms + new
         if u not in current:
             continue
 
         try:
-            path_uv = networkx.shortest_path(graph_copy, source=u, target=v)
+            path_uv = networkx.shortest_path(hyper_graph, source=u, target=v)
         except NetworkXNoPath:
             continue
 
-        iter_slots = links_from(v, nx_graph, all_props)
-        slots = [slot for pre, slot, attrs in iter_slots]
+        slots = links_from(v, nx_graph, all_props)
         if not slots or len(set(slots).intersection(set(current))) < 2:
             continue
 
@@ -170,27 +202,22 @@ def attrs_of_attrs(terms, nx_graph):
     new = []
     for term in terms:
         current = terms + new
-        iter_attrs = links_from(term, nx_graph, [u'attr_slot'])
-
-        for term_, attrterm, attrs in iter_attrs:
+        for attrterm in links_from(term, nx_graph, attr_props):
             if attrterm in current:
                 continue
-            iter_attr_of_attrs = links_from(attrterm, nx_graph, [u'attr_slot'])
 
-            for attrterm_, attr_of_attr, attrs in iter_attr_of_attrs:
+            for attr_of_attr in links_from(attrterm, nx_graph, attr_props):
                 if attr_of_attr not in current:
                     continue
 
-                if attr_of_attr in nx_graph[term_] or term_ in nx_graph[attr_of_attr]:
-                    new.append(attrterm_)
-                    yield attrterm_, [term_, attr_of_attr]
+                if attr_of_attr in nx_graph[term] or term in nx_graph[attr_of_attr]:
+                    new.append(attrterm)
+                    yield attrterm, [term, attr_of_attr]
 
 
 def links_from(node, nx_graph, props):
-    for src, dest, attrs in nx_graph.edges(nbunch=[node], data=True):
-        if attrs['label'] not in props:
-            continue
-        yield src, dest, attrs
+    """Successors of node over edges labelled from props, in edge order; read only."""
+    return graphindex.labelindex(nx_graph).successors(props).get(node, ())
 
 all_methods = (
     hyperframes,
@@ -201,3 +228,203 @@ all_methods = (
     ascendedhubs,
     attrs_of_attrs,
 )
+
+
+class ExpansionEngine(object):
+    """
+    Indexed evaluation of the expansion methods over one graph.
+
+    Per-label adjacency, the hyper-only subgraph and hyper paths are built
+    once; the node-scanning methods only revisit nodes linked to terms
+    that joined the frontier since their previous run.
+
+    nx_graph must not change while the engine is in use.
+    """
+
+    def __init__(self, nx_graph):
+        index = graphindex.labelindex(nx_graph)
+        self._graph = nx_graph
+        self._nodes = index.nodes
+        self._node_position = graphindex.termtable(nx_graph).ids
+        self._links = {}
+        self._backlinks = {}
+        for props in (hyper_props, frame_props, slot_props, all_props, attr_props):
+            self._links[props] = index.successors(props)
+            self._backlinks[props] = index.predecessors(props)
+
+        self._hyper_graph = index.subgraph(hyper_props)
+        self._hyper_nodes = self._hyper_graph.nodes()
+        self._hyper_position = {node: i for i, node in enumerate(self._hyper_nodes)}
+        self._ascents = {}
+        self._paths = {}
+
+        self._methods = {
+            hyperframes: self.hyperframes,
+            hypoframes: self.hypoframes,
+            attr_hypers: self.attr_hypers,
+            prerequisites: self.prerequisites,
+            ascending_ways: self.ascending_ways,
+            ascendedhubs: self.ascendedhubs,
+            attrs_of_attrs: self.attrs_of_attrs,
+        }
+
+    def run(self, method, frontier, since):
+        """
+        Yield (term, reasons) as method(frontier.terms, nx_graph) would;
+        the caller adds each term to the frontier before resuming.
+        """
+        if method in self._methods:
+            return self._methods[method](frontier, since)
+        return method(frontier.terms, self._graph)
+
+    def _linked(self, node, props):
+        return self._links[props].get(node, ())
+
+    def _ascents_from(self, node):
+        # nodes reachable over hyper edges, in hyper subgraph node order.
+        if node not in self._ascents:
+            links = self._links[hyper_props]
+            reached = set()
+            stack = [node]
+            while stack:
+                for dest in links[stack.pop()]:
+                    if dest not in reached:
+                        reached.add(dest)
+                        stack.append(dest)
+            reached.discard(node)
+            self._ascents[node] = sorted(reached, key=self._hyper_position.__getitem__)
+        return self._ascents[node]
+
+    def _path(self, u, v):
+        if (u, v) not in self._paths:
+            self._paths[(u, v)] = networkx.shortest_path(self._hyper_graph, source=u, target=v)
+        return self._paths[(u, v)]
+
+    def hyperframes(self, frontier, since):
+        for term in frontier.terms:
+            mark = frontier.clock
+            for hyperterm in self._linked(term, hyper_props):
+                for frameterm in self._linked(hyperterm, slot_props):
+                    if frontier.seen(frameterm, mark) and not frontier.seen(hyperterm, mark):
+                        yield hyperterm, [term, frameterm]
+
+    def hypoframes(self, frontier, since):
+        backlinks = (self._backlinks[hyper_props], self._backlinks[frame_props])
+        scan = _OrderedScan(self._nodes, self._node_position)
+        for term in frontier.since(since):
+            for index in backlinks:
+                scan.extend(index.get(term, ()))
+        for term in scan:
+            if term in frontier:
+                continue
+            hypers = self._links[hyper_props][term]
+            if not any(hyper in frontier for hyper in hypers):
+                continue
+            slots = self._links[frame_props][term]
+            if not any(slot in frontier for slot in slots):
+                continue
+            yield term, hypers + slots
+            for index in backlinks:
+                scan.extend(index[term])
+
+    def attr_hypers(self, frontier, since):
+        for term in frontier.terms:
+            mark = frontier.clock
+            for attrterm in self._linked(term, attr_props):
+                for hyperterm in self._linked(attrterm, hyper_props):
+                    if frontier.seen(hyperterm, mark) and not frontier.seen(attrterm, mark):
+                        yield attrterm, [term, hyperterm]
+
+    def prerequisites(self, frontier, since):
+        backlinks = self._backlinks[all_props]
+        scan = _OrderedScan(self._nodes, self._node_position)
+        for term in frontier.since(since):
+            scan.extend(backlinks.get(term, ()))
+        for term in scan:
+            if term in frontier:
+                continue
+            slots = self._links[all_props][term]
+            if sum(1 for slot in slots if slot in frontier) < 2:
+                continue
+            yield term, list(slots)
+            scan.extend(backlinks[term])
+
+    def ascending_ways(self, frontier, since):
+        scan = _OrderedScan(self._hyper_nodes, self._hyper_position)
+        scan.extend(term for term in set(frontier.terms) if term in self._hyper_position)
+        for u in scan:
+            renewed = not frontier.seen(u, since)
+            for v in self._ascents_from(u):
+                if v not in frontier:
+                    continue
+                if not renewed and frontier.seen(v, since):
+                    continue
+                for stop in self._path(u, v):
+                    if stop not in frontier:
+                        yield stop, [u, v]
+                        scan.push(stop)
+
+    def ascendedhubs(self, frontier, since):
+        scan = _OrderedScan(self._hyper_nodes, self._hyper_position)
+        scan.extend(term for term in set(frontier.terms) if term in self._hyper_position)
+        for u in scan:
+            renewed = not frontier.seen(u, since)
+            for v in self._ascents_from(u):
+                slots = self._links[all_props][v]
+                joined = [slot for slot in slots if slot in frontier]
+                if len(joined) < 2:
+                    continue
+                if not renewed and all(frontier.seen(slot, since) for slot in joined):
+                    continue
+                for stop in self._path(u, v):
+                    if stop not in frontier:
+                        yield stop, [u, v] + slots
+                        scan.push(stop)
+
+    def attrs_of_attrs(self, frontier, since):
+        nx_graph = self._graph
+        for term in frontier.terms:
+            mark = frontier.clock
+            for attrterm in self._linked(term, attr_props):
+                if frontier.seen(attrterm, mark):
+                    continue
+                for attr_of_attr in self._linked(attrterm, attr_props):
+                    if not frontier.seen(attr_of_attr, mark):
+                        continue
+                    if attr_of_attr in nx_graph[term] or term in nx_graph[attr_of_attr]:
+                        yield attrterm, [term, attr_of_attr]
+
+
+class _OrderedScan(object):
+    # visits nodes once each in a fixed order; nodes pushed while scanning
+    # are still visited if they come after the cursor.
+
+    def __init__(self, nodes, position):
+        self._nodes = nodes
+        self._position = position
+        self._heap = []
+        self._cursor = -1
+
+    def push(self, node):
+        position = self._position[node]
+        if position > self._cursor:
+            heapq.heappush(self._heap, position)
+
+    def extend(self, nodes):
+        for node in nodes:
+            self.push(node)
+
+    def __iter__(self):
+        while self._heap:
+            position = heapq.heappop(self._heap)
+            if position <= self._cursor:
+                continue
+            self._cursor = position
+            yield self._nodes[position]
+
+
+def expansion_engine(nx_graph, cache=weakref.WeakKeyDictionary()):
+    """ExpansionEngine built once per graph; keep nx_graph unchanged."""
+    if nx_graph not in cache:
+        cache[nx_graph] = ExpansionEngine(nx_graph)
+    return cache[nx_graph]
@@ -1,9 +1,13 @@
 # encoding: utf-8
 
+import io
+import os
 import sys
 import math
+import json
 import itertools
 import argparse
+import multiprocessing
 import networkx as nx
 import logbook
 from . import casedata as data
@@ -12,6 +16,10 @@ from . import similarity as sim
 from . import pagerank as pr
 from . import termexpand as tex
 from . import syntaxscore as stx
+from . import graphindex
+from . import rankmetrics
+from . import diskcache
+from ... import profiling
 
 
 def termmap(all_terms, logscale=False):
@@ -86,17 +94,40 @@ def fn_inverse(mapper):
         return invmap, modterms
     return _map
 
+expansion_cache = diskcache.DiskCache('expansion', max_bytes=256 * 1024 * 1024)
+
+def expansion_key(termset, methods, nx_graph, cache={}):
+    if 'source' not in cache:
+        cache['source'] = diskcache.file_digest(
+            diskcache.module_source(tex), diskcache.module_source(graphindex),
+        )
+    return diskcache.digest(
+        cache['source'],
+        graphindex.content_digest(nx_graph),
+        u','.join(method.__name__ for method in methods),
+        u','.join(u'{}={!r}'.format(name, weight) for name, weight in sorted(tex.scorebase.items())),
+        *termset
+    )
+
+def expand_termset(nx_graph, termset, key=None):
+    """(expanded terms, scoremap) of termset, read from / written to expansion_cache."""
+    termset = tuple(sorted(set(termset)))
+    cache_key = expansion_key(termset, tex.all_methods, nx_graph)
+    expanded = expansion_cache.get(cache_key)
+    if expanded is None:
+        print(u'term expanding: {}...'.format(key))
+        expanded = expansion_cache.set(cache_key, tex.populate(
+            termset, nx_graph,
+            methods=tex.all_methods,
+        ))
+    return expanded
+
 def fn_expand(nx_graph, allterms, amplify=False, lower_expands=False):
     cache = {}
     def _expand(termset, key):
         termset = tuple(sorted(set(termset)))
         if termset not in cache:
-            print(u'term expanding: {}...'.format(key))
-            expand, scoremap = tex.populate(
-                termset, nx_graph,
-                methods=tex.all_methods,
-            )
-            cache[termset] = expand, scoremap
+            cache[termset] = expand_termset(nx_graph, termset, key=key)
         expand, scoremap = cache[termset]
         return expand, scoremap
 
@@ -114,8 +145,53 @@ def fn_expand(nx_graph, allterms, amplify=False, lower_expands=False):
         return distmap, expand
     return _map
 
+_preexpand_graph = None
+
+def _preexpand_one(termset):
+    # forked workers inherit the graph and its indices, nothing is pickled in.
+    return termset, tex.populate(termset, _preexpand_graph, methods=tex.all_methods)
+
+def preexpand(nx_graph, term_sets, jobs=1, cache=expansion_cache):
+    """
+    Expand every term set missing from the expansion cache, over jobs processes,
+    so that fn_expand mappers only read results back.
+    """
+    global _preexpand_graph
+    pending = {}
+    for key in sorted(term_sets):
+        termset = tuple(sorted(set(term_sets[key])))
+        cache_key = expansion_key(termset, tex.all_methods, nx_graph)
+        if cache_key not in cache:
+            pending[cache_key] = termset
+    if not pending:
+        return 0
+    print(u'term expanding: {} sets with {} jobs...'.format(len(pending), jobs))
+
+    _preexpand_graph = nx_graph
+    tex.expansion_engine(nx_graph)
+    pool = None
+    try:
+        if jobs > 1:
+            pool = multiprocessing.Pool(jobs)
+            results = pool.imap_unordered(_preexpand_one, sorted(pending.values()))
+        else:
+            results = itertools.imap(_preexpand_one, sorted(pending.values()))
+        for termset, expanded in results:
+            cache.set(expansion_key(termset, tex.all_methods, nx_graph), expanded)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _preexpand_graph = None
+    return len(pending)
+
 def fn_syntax(allterms, raw_titles, raw_sents):
+    parsed = []
     def _map(termset, label=None):
+        if not parsed:
+            # every title & sentence through one parser run, on first use.
+            stx.parse_batch(raw_titles.values() + sum(raw_sents.values(), []))
+            parsed.append(True)
         if label.startswith(u'q'):
             subject=True
         else:
@@ -193,7 +269,7 @@ def fn_joint_multiply(mapper_x, mapper_y):
     return _jmap
 
 def fn_joint_cutoff_art(jmapper, by_multiplication=True, reverse=False, termsets=None):
-    answermap = data.answermap
+    answermap = data.answermap()
 
     def _filter(map_filtered, terms_filtered, map_base, terms_base):
         map_filtered = map_filtered.copy()
@@ -315,18 +391,17 @@ def linkrater(nx_graph, allterms):
     return factor_maker
 
 def fn_joint_bridgehierarchy(nx_graph, allterms, bridge='q', expandother=False):
-    answermap = data.answermap
+    answermap = data.answermap()
 
     if bridge not in ('q', 'a', 'qa'):
         raise ValueError('pick from {q, a, qa}')
     bridge_from_art = 'a' in bridge
     bridge_from_q = 'q' in bridge
 
-    hierarchy_graph = nx_graph.copy()
-    if not expandother:
-        for src, dest, edgedata in nx_graph.edges(data=True):
-            if edgedata['label'] not in (u'hyper', u'hyperx'):
-                hierarchy_graph.remove_edge(src, dest)
+    if expandother:
+        hierarchy = graphindex.reachability(nx_graph)
+    else:
+        hierarchy = graphindex.reachability(nx_graph, labels=tex.hyper_props)
     cache = {}
     def _bridge(fromterms, toterms):
         fromterms = list(fromterms)
@@ -339,9 +414,9 @@ def fn_joint_bridgehierarchy(nx_graph, allterms, bridge='q', expandother=False):
             appends = []
             for fromterm in ordered_fromterms:
                 for toterm in toterms:
-                    if fromterm not in hierarchy_graph or toterm not in hierarchy_graph:
+                    if fromterm not in hierarchy or toterm not in hierarchy:
                         continue
-                    if nx.has_path(hierarchy_graph, fromterm, toterm):
+                    if hierarchy.reachable(fromterm, toterm):
                         appends.append(toterm)
             cache[(from_as_tuple, to_as_tuple)] = tuple(appends)
         fromterms.extend(appends)
@@ -391,18 +466,11 @@ def fn_joint_bridgehierarchy(nx_graph, allterms, bridge='q', expandother=False):
     return _jmap
 
 def fn_joint_hierarchyreduce(nx_graph, allterms, termsets):
-    answermap = data.answermap
+    answermap = data.answermap()
 
-    hierarchy_graph = nx_graph.copy()
-    for src, dest, edgedata in nx_graph.edges(data=True):
-        if edgedata['label'] not in (u'hyper', u'hyperx'):#, u'antecedent_to'):
-            hierarchy_graph.remove_edge(src, dest)
-    cache = {}
+    hierarchy = graphindex.reachability(nx_graph, labels=tex.hyper_props)
     def _upper(hyper, hypo):
-        key = (hyper, hypo)
-        if key not in cache:
-            cache[key] = nx.has_path(hierarchy_graph, hypo, hyper)
-        return cache[key]
+        return hierarchy.reachable(hypo, hyper)
 
     def _hierarchy_reduce(termset, excepts=tuple()):
         reduced_terms = list(termset)
@@ -412,7 +480,7 @@ def fn_joint_hierarchyreduce(nx_graph, allterms, termsets):
                 continue
             if hyper == hypo:
                 continue
-            if hyper not in hierarchy_graph or hypo not in hierarchy_graph:
+            if hyper not in hierarchy or hypo not in hierarchy:
                 continue
             if _upper(hyper, hypo) and hyper in reduced_terms:
                 reduced_terms.remove(hyper)
@@ -446,7 +514,7 @@ def fn_joint_hierarchyreduce(nx_graph, allterms, termsets):
 
 def fn_joint_expandonly(nx_graph, allterms, single_expander, expand='q', with_cutoff_art=False,
                         ratelinks=False):
-    answermap = data.answermap
+    answermap = data.answermap()
     idfmap = casemaker.idfmap_with_interpolation(nx_graph)
     _linkrater = linkrater(nx_graph, allterms)
 
@@ -630,8 +698,8 @@ def create_joint_mapper(nx_graph=None, allterms=None, raw_titles=None, raw_sents
     return mapper
 
 def print_similarity(nx_graph):
-    term_sets = data.allart_term_sets
-    term_sets.update(data.allq_term_sets)
+    term_sets = data.allart_term_sets()
+    term_sets.update(data.allq_term_sets())
 
     mapper = create_mapper(nx_graph=nx_graph)
     sim.print_dist_similarities(
@@ -640,189 +708,206 @@ def print_similarity(nx_graph):
         grep=u'q18/15/',
     )
 
-def batch_similarity(nx_graph, noorder=True, mode='network'):
+def batch_similarity(nx_graph, noorder=True, mode='network', jobs=1, report=None, resume=False):
     if mode not in (u'network', u'nonetwork', u'baseline', None):
         raise ValueError('no mode named "{}"'.format(mode))
 
-    elif mode == u'network':
-        term_sets = data.all_mixedterm_sets
-        allterms = data.mixed_allterms
+    with profiling.span(u'term_sets'):
+        if mode == u'network':
+            term_sets = data.all_mixedterm_sets()
+            allterms = data.mixed_allterms()
 
-    elif mode == 'nonetwork':
-        term_sets = data.uniq_all_idfterm_sets
-        allterms = data.idf_allterms
+        elif mode == 'nonetwork':
+            term_sets = data.uniq_all_idfterm_sets()
+            allterms = data.idf_allterms()
 
-    elif mode == 'baseline':
-        term_sets = data.all_idfterm_sets
-        allterms = data.idf_allterms
+        elif mode == 'baseline':
+            term_sets = data.all_idfterm_sets()
+            allterms = data.idf_allterms()
 
-    raw_titles = data.all_raw_titles
-    raw_sents = data.all_raw_sents
+        raw_titles = data.all_raw_titles()
+        raw_sents = data.all_raw_sents()
 
     F_threshold = 3.0
 
-    answers = data.answermap
-    mapper = create_joint_mapper(
-        nx_graph=nx_graph, allterms=allterms,
-        raw_titles=raw_titles, raw_sents=raw_sents,
-        termsets=term_sets,
-        mode=mode,
-    )
+    answers = data.answermap()
+    if mode == u'network':
+        with profiling.span(u'preexpand'):
+            preexpand(nx_graph, term_sets, jobs=jobs)
+    with profiling.span(u'joint_mapper'):
+        mapper = create_joint_mapper(
+            nx_graph=nx_graph, allterms=allterms,
+            raw_titles=raw_titles, raw_sents=raw_sents,
+            termsets=term_sets,
+            mode=mode,
+        )
 
-    sims = sim.joint_dist_similarities(
-        allterms, term_sets,
-        distribution_fn=mapper,
-    )
-    rankstack = []
-    logrankstack = []
-    # outstandings = []
-    # closer_outstandings = []
-    f_vals = []
-    for qkey in sorted(answers):
-        qsims = [
-            (sims[(k1, k2)], (k1, k2))
-            for (k1, k2) in sims
-            if k1 == qkey
-        ]
-        for val, pair in qsims[:]:
-            key_a, key_b = pair
-            if key_a == qkey and key_b.startswith(u'q') or \
-               key_b == qkey and key_a.startswith(u'q'):
-                qsims.remove((val, pair))
-        qsims.sort(reverse=True)
-        order = [(ks, score) for score, ks in qsims]
-
-        print(u'For {}'.format(qkey))
-        print(u'==============')
-        print(u'ans: {}'.format(u','.join(answers[qkey])))
-        print(u'seen:')
-        for pair, score in order[:10]:
-            print(u'  {} <--> {} ({})'.format(*(list(pair) + [round(score, 4)])))
-        rank_, logrank = keymap_avr_rank(order, answers[qkey], qkey, noorder=noorder)
-        # outstanding_, closer_outst = outstanding_rate(qsims, answers[qkey], qkey)
-        f_ = f_measure(F_threshold, order, answers[qkey], qkey)
-        rankstack.append(rank_)
-        logrankstack.append(logrank)
-        # if outstanding_ != 0.0:
-        #     outstandings.append(outstanding_)
-        #     closer_outstandings.append(closer_outst)
-        f_vals.append(f_)
-        print(u'RANK: {}'.format(rank_))
-        print(u'LOG(RANK): {}'.format(logrank))
-        # print(u'INV OUTSTANDING RATE(AVR): {}'.format(outstanding_))
-        # print(u'INV OUTSTANDING RATE(AVR/NEAREST): {}'.format(closer_outst))
-        print(u'F: {}'.format(f_))
-        print(u'==============\n')
-
-    average = sum(rankstack) / float(len(rankstack))
-    print(u'AVR RANK: {}'.format(average))
-
-    sq_errs = []
-    for rank_ in rankstack:
-        sq_errs.append(pow(average - rank_, 2.0))
-    variant = sum(sq_errs) / float(len(sq_errs))
-    sd = math.sqrt(variant)
-    print(u'SD: {}'.format(sd))
-
-    average_logrank = sum(logrankstack) / float(len(logrankstack))
-    print(u'AVR LOG(RANK): {}'.format(average_logrank))
-
-    logrank_sq_errs = []
-    for rank_ in logrankstack:
-        logrank_sq_errs.append(pow(average_logrank - rank_, 2.0))
-    variant = sum(logrank_sq_errs) / float(len(logrank_sq_errs))
-    sd = math.sqrt(variant)
-    print(u'SD LOGRANK: {}'.format(sd))
-
-    # avr_outstanding = sum(outstandings) / float(len(outstandings))
-    # avr_closest_outstanding = sum(closer_outstandings) / float(len(closer_outstandings))
-    # print(u'OUTSTANDING RATE(GLOBAL AVR): {}'.format(1.0 / avr_outstanding))
-    # print(u'OUTSTANDING RATE(GLOBAL AVR/NEAREST): {}'.format(1.0 / avr_closest_outstanding))
-    # outst_sq_errs = []
-    # for outst_ in outstandings:
-    #     outst_sq_errs.append(pow(avr_outstanding - outst_, 2.0))
-    # outst_variant = sum(outst_sq_errs) / float(len(outst_sq_errs))
-    # outst_sd = math.sqrt(outst_variant)
-    # cls_outst_sq_errs = []
-    # for outst_ in closer_outstandings:
-    #     cls_outst_sq_errs.append(pow(avr_closest_outstanding - outst_, 2.0))
-    # cls_outst_variant = sum(cls_outst_sq_errs) / float(len(cls_outst_sq_errs))
-    # cls_outst_sd = math.sqrt(cls_outst_variant)
-    # print(u'SD INVOUTST RATE: {}'.format(outst_sd))
-    # print(u'SD INVOUTST RATE/NEAREST: {}'.format(cls_outst_sd))
-
-    f_avr = sum(f_vals) / float(len(f_vals))
-    print(u'AVR-F: {}'.format(f_avr))
-
-def keypair_MAP(order, correct_order, qkey, noorder=True):
-    rankstack = keymap_ranks(order, correct_order, qkey, noorder=noorder)
-    ratiostack = []
-    for correct_rank, rank in enumerate(rankstack, start=1):
-        map_ = float(correct_rank) / float(rank)
-        ratiostack.append(map_)
-    return sum(ratiostack) / float(len(ratiostack))
-
-def keymap_avr_rank(order, correct_order, qkey, noorder=True):
-    rankstack = keymap_ranks(order, correct_order, qkey, noorder=noorder)
-    ratiostack = []
-    for correct_rank, rank in enumerate(rankstack, start=1):
-        rank_ = float(rank) / float(correct_rank)
-        ratiostack.append(rank_)
-    rank = sum(ratiostack) / float(len(ratiostack))
-    logrank = sum(2.0 * math.log(r) for r in ratiostack) / float(len(ratiostack))
-    return rank, logrank
-
-def f_measure(F_threshold, order, correct_order, qkey):
-    num_answers = len(correct_order)
-    rankstack = keymap_ranks(order, correct_order, qkey)
-    num_recall = 0
-    for rank_ in rankstack:
-        if rank_ <= F_threshold:
-            num_recall += 1
-    f = float(num_recall) / (0.5 * (F_threshold + float(num_answers)))
-    return f
-
-def keymap_ranks(order, correct_order, qkey, noorder=True):
-    rankstack = []
-    for artkey in correct_order:
-        rank = 1
-        prev_score = order[0][1]
-        for keypair, score in order:
-            if score < prev_score:  # it's descending!
-                rank += 1
-            prev_score = score
-            if artkey in keypair:
-                break
-        else:
-            raise ValueError('?')
-        same_ranked = len([
-            score for ks, score in order
-            if score == prev_score
-        ]) - 1  # subtract self
-        rank += (float(same_ranked) / 2.0)
-        rankstack.append(rank)
-    if noorder:
-        rankstack.sort()
-    return rankstack
-
-def keymap_ranks(order, correct_order, qkey, noorder=True):
-    rankstack = []
-    for artkey in correct_order:
-        rank = 0.0
-        for score, grouped in itertools.groupby(order, lambda kp_score: kp_score[1]):
-            equivs = set(sum((list(keypair) for keypair, score in grouped), []))
-            equivs.remove(qkey)
-            if artkey in equivs:
-                rank += (1.0 + float(len(equivs) - 1) / 2.0)
-                break
+    maps = RunningStats()
+    ranks = RunningStats()
+    logranks = RunningStats()
+    f_vals = RunningStats()
+    fingerprint = evaluation_fingerprint(nx_graph, mode, noorder)
+    with profiling.span(u'score'), EvaluationReport(report, fingerprint, resume=resume) as reporter:
+        if reporter.completed:
+            print(u'resuming: {} questions scored already'.format(len(reporter.completed)))
+        rows = sim.joint_dist_rows(
+            allterms, term_sets,
+            distribution_fn=mapper, jobs=jobs,
+            rowkeys=[qkey for qkey in sorted(answers) if qkey not in reporter.completed],
+        )
+        for qkey in sorted(answers):
+            checkpoint = reporter.completed.get(qkey)
+            if checkpoint is not None:
+                order = [((qkey, key2), score) for key2, score in checkpoint[u'seen']]
             else:
-                rank += float(len(equivs))
+                rowkey, row = next(rows)
+                assert rowkey == qkey
+                qsims = [
+                    (score, (qkey, key2))
+                    for key2, score in row
+                    if not key2.startswith(u'q')
+                ]
+                qsims.sort(reverse=True)
+                order = [(ks, score) for score, ks in qsims]
+
+            print(u'For {}'.format(qkey))
+            print(u'==============')
+            print(u'ans: {}'.format(u','.join(answers[qkey])))
+            print(u'seen:')
+            for pair, score in order[:10]:
+                print(u'  {} <--> {} ({})'.format(*(list(pair) + [round(score, 4)])))
+            if checkpoint is not None:
+                metrics = checkpoint
+            else:
+                metrics = rankmetrics.question_metrics(
+                    order, answers[qkey], qkey, F_threshold, noorder=noorder,
+                )
+            rank_, logrank, f_ = metrics[u'rank'], metrics[u'logrank'], metrics[u'f']
+            maps.push(metrics[u'map'])
+            ranks.push(rank_)
+            logranks.push(logrank)
+            f_vals.push(f_)
+            print(u'RANK: {}'.format(rank_))
+            print(u'LOG(RANK): {}'.format(logrank))
+            print(u'F: {}'.format(f_))
+            print(u'==============\n')
+            if checkpoint is not None:
+                continue
+            reporter.write(
+                qkey=qkey, mode=mode,
+                answers=list(answers[qkey]),
+                seen=[[key2, score] for (_, key2), score in order[:10]],
+                map=metrics[u'map'], rank=rank_, logrank=logrank, f=f_,
+            )
+
+        print(u'AVR RANK: {}'.format(ranks.mean))
+        print(u'SD: {}'.format(ranks.sd))
+        print(u'AVR LOG(RANK): {}'.format(logranks.mean))
+        print(u'SD LOGRANK: {}'.format(logranks.sd))
+        print(u'AVR-F: {}'.format(f_vals.mean))
+        reporter.write(
+            summary=True, mode=mode, questions=ranks.count,
+            map=maps.mean, rank=ranks.mean, rank_sd=ranks.sd,
+            logrank=logranks.mean, logrank_sd=logranks.sd,
+            f=f_vals.mean,
+        )
+
+
+class RunningStats(object):
+    """
+    Running mean and (population) variance, by Welford's method.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._sq_sum = 0.0
+
+    def push(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._sq_sum += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self._sq_sum / self.count
+
+    @property
+    def sd(self):
+        return math.sqrt(self.variance)
+
+
+def evaluation_fingerprint(nx_graph, mode, noorder):
+    """Identifies the inputs and code an evaluation report was scored with."""
+    sources = [diskcache.module_source(module) for module in (data, casemaker, sim, tex, stx)]
+    sources.extend([os.path.splitext(__file__)[0] + '.py', data.cases.path])
+    return diskcache.digest(
+        graphindex.content_digest(nx_graph),
+        u'{}'.format(mode), u'{}'.format(noorder),
+        diskcache.file_digest(*sources),
+    )
+
+
+class EvaluationReport(object):
+    """
+    JSON Lines evaluation log, one flushed line per record;
+    writes nothing if path is None.
+    """
+
+    def __init__(self, path=None, fingerprint=None, resume=False):
+        """
+        Options:
+            * fingerprint: stamped on every record.
+            * resume: keep the question records of an existing log with
+                      the same fingerprint, as completed ({qkey => record}),
+                      and append after them.
+        """
+        self._path = path
+        self._fingerprint = fingerprint
+        self._resume = resume
+        self._out = None
+        self.completed = {}
+
+    def __enter__(self):
+        if self._path is None:
+            return self
+        kept = []
+        if self._resume and os.path.exists(self._path):
+            with io.open(self._path, encoding='utf-8') as previous:
+                for line in previous:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # cut off mid-line
+                    if record.get(u'fingerprint') != self._fingerprint:
+                        continue
+                    if u'qkey' in record:
+                        kept.append(line.rstrip(u'\n'))
+                        self.completed[record[u'qkey']] = record
+            # the kept records replace the log atomically, never truncated first.
+            tmp_path = '{}.{}.tmp'.format(self._path, os.getpid())
+            with io.open(tmp_path, 'w', encoding='utf-8') as rewritten:
+                for line in kept:
+                    rewritten.write(line + u'\n')
+            os.rename(tmp_path, self._path)
+            self._out = io.open(self._path, 'a', encoding='utf-8')
         else:
-            raise ValueError('?')
-        rankstack.append(rank)
-    if noorder:
-        rankstack.sort()
-    return rankstack
+            self._out = io.open(self._path, 'w', encoding='utf-8')
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def write(self, **record):
+        if self._out is None:
+            return
+        record[u'fingerprint'] = self._fingerprint
+        self._out.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + u'\n')
+        self._out.flush()
+
 
 def outstanding_rate(qsim_pairs, correct_order, qkey):
     simmap = {
@@ -940,10 +1025,10 @@ def check_expansion(nx_graph):
     assert term_set_adds != term_set_expanded
 
 
-def run(nx_graph, mode='network'):
+def run(nx_graph, mode='network', jobs=1, report=None, resume=False):
     copy_graph = nx_graph.copy()
     # for src, dest, edgedata in nx_graph.edges(data=True):
     #     if edgedata['label'] in (u'antecedent_to',):
     #         copy_graph.remove_edge(src, dest)
     # print(len(copy_graph.edges()))
-    batch_similarity(copy_graph, noorder=True, mode=mode)
+    batch_similarity(copy_graph, noorder=True, mode=mode, jobs=jobs, report=report, resume=resume)
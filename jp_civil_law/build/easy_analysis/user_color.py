@@ -13,10 +13,10 @@ from . import termexpand as tex
 class terms:
     # label = u'375'
     ## MUST SET ##
-    t = getattr(data, 't' + ''.join(data.answermap[u'q19/7/3']))
-    # a = data.t375_add
-    q = data.tq19_7_3
-    # qa = data.tq18_15_2_add
+    t = data.term_set(u''.join(data.answermap()[u'q19/7/3']))
+    # a = data.term_set(u'375', add=True)
+    q = data.term_set(u'q19/7/3')
+    # qa = data.term_set(u'q18/15/2', add=True)
     bridge = [
         u'所有', u'占有',
         u'財産', u'動産',
@@ -48,7 +48,7 @@ class terms:
     ]
 
 
-def run(nx_graph, agraph):
+def run(nx_graph):
 
     t = terms.t
     # a = terms.a
@@ -59,7 +59,7 @@ def run(nx_graph, agraph):
     # Pagerank method for following calcs.
     prmeth = nondistribution(nx_graph)
 
-    featured = non_color(nx_graph, agraph, prmeth)
+    featured = non_color(nx_graph, prmeth)
     assert featured is not None
 
     if onlyterms:
@@ -68,48 +68,48 @@ def run(nx_graph, agraph):
     return featured
 
 
-def non_color(nx_graph, agraph, prmeth):
-    color.set_graphcolor(agraph)
+def non_color(nx_graph, prmeth):
+    color.set_graphcolor(nx_graph)
     return []
 
-def fancy_color(nx_graph, agraph, prmeth):
+def fancy_color(nx_graph, prmeth):
     from .user_calc import create_mapper
     mapper = create_mapper(nx_graph)
     rankmap, ex = mapper(terms.t, label=terms.label)
-    colormap = color.pwrvariation_with_ranks(agraph, rankmap, fullrange=True)
-    color.color_graph(agraph, colormap, blueback=True)
-    color.color_nodeborders(agraph, terms.a)
-    color.color_nodeborders(agraph, ex, preset_with_fill='b')
-    color.color_nodeborders(agraph, terms.t, preset_with_fill='ab')
+    colormap = color.pwrvariation_with_ranks(nx_graph, rankmap, fullrange=True)
+    color.color_graph(nx_graph, colormap, blueback=True)
+    color.color_nodeborders(nx_graph, terms.a)
+    color.color_nodeborders(nx_graph, ex, preset_with_fill='b')
+    color.color_nodeborders(nx_graph, terms.t, preset_with_fill='ab')
     print(u'diffs: ' + u','.join(set(ex).difference(set(terms.t))))
     return terms.t + ex + terms.a
 
-def tq_compare(nx_graph, agraph, prmeth):
-    color.set_graphcolor(agraph)
-    color.color_nodeborders(agraph, terms.q, preset_with_fill='a')
-    color.color_nodeborders(agraph, terms.t, preset_with_fill='b')
-    color.color_nodeborders(agraph, set(terms.t).intersection(set(terms.q)), preset_with_fill='ab')
+def tq_compare(nx_graph, prmeth):
+    color.set_graphcolor(nx_graph)
+    color.color_nodeborders(nx_graph, terms.q, preset_with_fill='a')
+    color.color_nodeborders(nx_graph, terms.t, preset_with_fill='b')
+    color.color_nodeborders(nx_graph, set(terms.t).intersection(set(terms.q)), preset_with_fill='ab')
     return terms.t + terms.q
 
-def tq_bridge(nx_graph, agraph, prmeth):
-    color.color_nodeborders(agraph, terms.bridge, color=colors.w3c.lightsalmon)
-    color.color_nodeborders(agraph, terms.q, preset_with_fill='a')
-    color.color_nodeborders(agraph, terms.t, preset_with_fill='b')
-    color.color_nodeborders(agraph, set(terms.t).intersection(set(terms.q)), preset_with_fill='ab')
+def tq_bridge(nx_graph, prmeth):
+    color.color_nodeborders(nx_graph, terms.bridge, color=colors.w3c.lightsalmon)
+    color.color_nodeborders(nx_graph, terms.q, preset_with_fill='a')
+    color.color_nodeborders(nx_graph, terms.t, preset_with_fill='b')
+    color.color_nodeborders(nx_graph, set(terms.t).intersection(set(terms.q)), preset_with_fill='ab')
     return terms.t + terms.q + terms.bridge
 
-def t_raw_a_compare(nx_graph, agraph, prmeth):
+def t_raw_a_compare(nx_graph, prmeth):
     map_higher, _ = prmeth(terms.t, label=terms.label)
     avr = sum(map_higher.values()) / float(len(map_higher))
     fillvalue = 0.1 / float(len(terms.a))
-    map_lower = data.as_dist_map(terms.a, agraph.nodes(), fill=fillvalue)
-    color.set_mixed_graphcolor(agraph, map_higher, map_lower, fullrange=True)
-    color.color_nodeborders(agraph, terms.a, preset_with_fill='a')
-    color.color_nodeborders(agraph, terms.t, preset_with_fill='b')
-    color.color_nodeborders(agraph, set(terms.a).intersection(set(terms.t)), preset_with_fill='ab')
+    map_lower = data.as_dist_map(terms.a, nx_graph.nodes(), fill=fillvalue)
+    color.set_mixed_graphcolor(nx_graph, map_higher, map_lower, fullrange=True)
+    color.color_nodeborders(nx_graph, terms.a, preset_with_fill='a')
+    color.color_nodeborders(nx_graph, terms.t, preset_with_fill='b')
+    color.color_nodeborders(nx_graph, set(terms.a).intersection(set(terms.t)), preset_with_fill='ab')
     return terms.t + terms.a
 
-def shortest_path(nx_graph, agraph, prmeth):
+def shortest_path(nx_graph, prmeth):
     undir_graph = nx_graph.to_undirected()
     len_from_root = networkx.shortest_path_length(undir_graph, source=u'root')
     maxdepth = max(len_from_root.values())
@@ -146,29 +146,29 @@ def shortest_path(nx_graph, agraph, prmeth):
             except KeyError:
                 pass
     tspread = sum(paths, [])
-    map_lower = data.as_dist_map(terms.a, agraph.nodes(), fill=0.5)
-    map_higher = data.as_dist_map(tspread, agraph.nodes(), fill=0.5)
-    color.set_mixed_graphcolor(agraph, map_higher, map_lower, fullrange=True)
-    color.color_nodeborders(agraph, terms.a, preset_with_fill='a')
-    color.color_nodeborders(agraph, tspread, preset_with_fill='b')
-    color.color_nodeborders(agraph, set(terms.a).intersection(set(tspread)), preset_with_fill='ab')
+    map_lower = data.as_dist_map(terms.a, nx_graph.nodes(), fill=0.5)
+    map_higher = data.as_dist_map(tspread, nx_graph.nodes(), fill=0.5)
+    color.set_mixed_graphcolor(nx_graph, map_higher, map_lower, fullrange=True)
+    color.color_nodeborders(nx_graph, terms.a, preset_with_fill='a')
+    color.color_nodeborders(nx_graph, tspread, preset_with_fill='b')
+    color.color_nodeborders(nx_graph, set(terms.a).intersection(set(tspread)), preset_with_fill='ab')
     return terms.a + tspread
 
-def term_expansion(nx_graph, agraph, prmeth):
+def term_expansion(nx_graph, prmeth):
     ex, scoremap = tex.populate(
         terms.t, nx_graph,
         methods=tex.all_methods,
     )
     map_higher, _ = prmeth(ex, label=terms.label)
     map_lower, _ = prmeth(terms.t, label=terms.label)
-    color.set_mixed_graphcolor(agraph, map_higher, map_lower, fullrange=True)
-    color.color_nodeborders(agraph, terms.a)
-    color.color_nodeborders(agraph, ex, preset_with_fill='b')
-    color.color_nodeborders(agraph, terms.t, preset_with_fill='ab')
+    color.set_mixed_graphcolor(nx_graph, map_higher, map_lower, fullrange=True)
+    color.color_nodeborders(nx_graph, terms.a)
+    color.color_nodeborders(nx_graph, ex, preset_with_fill='b')
+    color.color_nodeborders(nx_graph, terms.t, preset_with_fill='ab')
     print(u'diffs: ' + u','.join(set(ex).difference(set(terms.t))))
     return terms.t + ex + terms.a
 
-def pagerank_method(nx_graph, agraph):
+def pagerank_method(nx_graph):
     return pr.pr_distribution_fn(
         nx_graph,
         preproc=lambda g: g.to_undirected(),
@@ -0,0 +1,147 @@
+# encoding: utf-8
+
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+
+# Writers take a networkx DiGraph and a binary file handle, and write
+# utf-8 text element by element: nothing of the size of the graph is
+# built besides the graph itself.
+
+def write_dot(nx_graph, f, name=u'G'):
+    """
+    Write nx_graph as a dot digraph, with the graphviz attributes of
+    nx_graph.graph['graph' / 'node' / 'edge'] and of node & edge data.
+
+    No layout is computed; the dot tools do that.
+    """
+    write = lambda text: f.write(text.encode('utf-8'))
+    write(u'digraph {} {{\n'.format(dot_id(name)))
+    for kind in (u'graph', u'node', u'edge'):
+        attrs = nx_graph.graph.get(kind)
+        if attrs:
+            write(u'\t{} {};\n'.format(kind, dot_attrs(attrs)))
+    for node, data in nx_graph.nodes_iter(data=True):
+        if data:
+            write(u'\t{} {};\n'.format(dot_id(node), dot_attrs(data)))
+        else:
+            write(u'\t{};\n'.format(dot_id(node)))
+    for src, dest, data in nx_graph.edges_iter(data=True):
+        if data:
+            write(u'\t{} -> {} {};\n'.format(dot_id(src), dot_id(dest), dot_attrs(data)))
+        else:
+            write(u'\t{} -> {};\n'.format(dot_id(src), dot_id(dest)))
+    write(u'}\n')
+
+def dot_id(value):
+    # quoted as graphviz writes it: double quotes are escaped, and so is
+    # a trailing backslash, which would escape the closing quote.
+    text = unicode(value).replace(u'"', u'\\"')
+    if text.endswith(u'\\'):
+        text += u'\\'
+    return u'"{}"'.format(text)
+
+def dot_attrs(attrs):
+    return u'[{}]'.format(u', '.join(
+        u'{}={}'.format(dot_id(key), dot_id(attrs[key])) for key in sorted(attrs)
+    ))
+
+
+GRAPHML_TYPES = ((bool, u'boolean'), (int, u'long'), (long, u'long'), (float, u'double'))
+
+def write_graphml(nx_graph, f):
+    """
+    Write nx_graph as GraphML, with node & edge data as keys.
+
+    Keys are declared before the elements using them, which takes one
+    pass over the data before the elements are written.
+    """
+    write = lambda text: f.write(text.encode('utf-8'))
+    node_keys = graphml_keys(data for _, data in nx_graph.nodes_iter(data=True))
+    edge_keys = graphml_keys(data for _, _, data in nx_graph.edges_iter(data=True))
+    key_ids = {}
+    write(u'<?xml version="1.0" encoding="utf-8"?>\n')
+    write(u'<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+    for domain, keys in ((u'node', node_keys), (u'edge', edge_keys)):
+        for name in sorted(keys):
+            key_id = u'd{}'.format(len(key_ids))
+            key_ids[domain, name] = key_id
+            write(u'  <key id="{}" for="{}" attr.name={} attr.type="{}" />\n'.format(
+                key_id, domain, quoteattr(name), keys[name],
+            ))
+    write(u'  <graph edgedefault="directed">\n')
+    for node, data in nx_graph.nodes_iter(data=True):
+        write(u'    <node id={}>{}</node>\n'.format(
+            quoteattr(unicode(node)), graphml_data(u'node', data, key_ids),
+        ))
+    for src, dest, data in nx_graph.edges_iter(data=True):
+        write(u'    <edge source={} target={}>{}</edge>\n'.format(
+            quoteattr(unicode(src)), quoteattr(unicode(dest)),
+            graphml_data(u'edge', data, key_ids),
+        ))
+    write(u'  </graph>\n')
+    write(u'</graphml>\n')
+
+def graphml_keys(datas):
+    """{attribute name => GraphML type}, typed by the first value met."""
+    keys = {}
+    for data in datas:
+        for name, value in data.iteritems():
+            if name not in keys:
+                keys[name] = graphml_type(value)
+    return keys
+
+def graphml_type(value):
+    for pytype, name in GRAPHML_TYPES:
+        if isinstance(value, pytype):
+            return name
+    return u'string'
+
+def graphml_data(domain, data, key_ids):
+    return u''.join(
+        u'<data key="{}">{}</data>'.format(key_ids[domain, name], escape(graphml_value(data[name])))
+        for name in sorted(data)
+    )
+
+def graphml_value(value):
+    if isinstance(value, bool):
+        return u'true' if value else u'false'
+    return unicode(value)
+
+
+def write_json(nx_graph, f):
+    """
+    Write nx_graph as JSON node-link data, in the layout of
+    networkx.readwrite.json_graph.node_link_data: links refer to
+    nodes by their position in the node list.
+    """
+    write = lambda text: f.write(text.encode('utf-8'))
+    dumps = lambda data: json.dumps(data, ensure_ascii=False, sort_keys=True)
+    write(u'{{"directed": true, "multigraph": false, "graph": {},\n'.format(
+        dumps(nx_graph.graph.items()),
+    ))
+    index = {}
+    write(u' "nodes": [')
+    for i, (node, data) in enumerate(nx_graph.nodes_iter(data=True)):
+        index[node] = i
+        item = dict(data, id=node)
+        write(u'{}\n  {}'.format(u',' if i else u'', dumps(item)))
+    write(u'\n ],\n "links": [')
+    for i, (src, dest, data) in enumerate(nx_graph.edges_iter(data=True)):
+        item = dict(data, source=index[src], target=index[dest])
+        write(u'{}\n  {}'.format(u',' if i else u'', dumps(item)))
+    write(u'\n ]}\n')
+
+
+EXPORTERS = {
+    'dot': write_dot,
+    'graphml': write_graphml,
+    'json': write_json,
+}
+
+def export_graph(nx_graph, tofile, format='dot'):
+    """Write nx_graph to the path tofile with the exporter of format."""
+    if format not in EXPORTERS:
+        raise ValueError('no exporter for "{}"'.format(format))
+    with open(tofile, 'wb') as f:
+        EXPORTERS[format](nx_graph, f)
@@ -2,6 +2,7 @@
 
 import os
 import difflib
+import hashlib
 import logbook
 from lkbutils import (
     rdflib_load_terms,
@@ -16,6 +17,7 @@ from lkbutils.relationprovider import (
     noconflict_providers,
 )
 from lkbutils.declarative import leaves_from_struct
+from . import profiling
 
 
 def path_from_me(path):
@@ -71,6 +73,7 @@ def get_node_provider(src_dir, whitelist=None):
     for yml, white in yaml_texts_in(src_dir, whitelist=whitelist):
         provider = rdflib_load_terms(yml).nodeprovider
         node_providers.append(provider)
+        profiling.count(u'terms loaded', len(provider.nameprovider.origin_names))
         if white:
             white_nodes.extend(provider.nameprovider.origin_names)
     return merge_nodeproviders(*node_providers), white_nodes
@@ -98,12 +101,14 @@ def get_relation_loaders(src_dir, nodeprovider=None, whitelist=None):
         ],
         [],
     )
-    check_relation_conflicts(relation_loaders, nodeprovider)
+    with profiling.span(u'conflict_check'):
+        check_relation_conflicts(relation_loaders, nodeprovider)
     return relation_loaders, white_rels
 
 def check_relation_conflicts(relation_loaders, nodeprovider):
     providers = [rl._relation_provider for rl in relation_loaders]
-    noconflict_providers(providers, nodeprovider=nodeprovider)
+    pairs = noconflict_providers(providers, nodeprovider=nodeprovider)
+    profiling.count(u'pairs checked', len(pairs))
 
 
 universal_cache = {}
@@ -117,19 +122,35 @@ def get_graph(terms_dir=TERMS_DIR, relations_dir=RELATIONS_DIR,
         whitelist = load_whitelist()
     else:
         whitelist = None
-    nodeprovider, white_nodes = get_node_provider(terms_dir, whitelist=whitelist)
-    relation_loaders, white_rels = get_relation_loaders(relations_dir, nodeprovider=nodeprovider, whitelist=whitelist)
-    showdiff(log, nodeprovider, [rl.relationprovider for rl in relation_loaders])
-    graph = sum(
-        [rl.graph for rl in relation_loaders],
-        nodeprovider.graph
-    )
+    with profiling.span(u'term_load'):
+        nodeprovider, white_nodes = get_node_provider(terms_dir, whitelist=whitelist)
+    with profiling.span(u'relation_load'):
+        relation_loaders, white_rels = get_relation_loaders(relations_dir, nodeprovider=nodeprovider, whitelist=whitelist)
+    with profiling.span(u'showdiff'):
+        showdiff(log, nodeprovider, [rl.relationprovider for rl in relation_loaders])
+    with profiling.span(u'rdflib_merge'):
+        graph = sum(
+            [rl.graph for rl in relation_loaders],
+            nodeprovider.graph
+        )
     if as_nx:
-        graph = rdflib_to_networkx(graph)
+        with profiling.span(u'to_networkx'):
+            graph = rdflib_to_networkx(graph)
 
     universal_cache[key] = graph, white_nodes, white_rels
     return universal_cache[key]
 
+def source_digest(terms_dir=TERMS_DIR, relations_dir=RELATIONS_DIR):
+    sha = hashlib.sha1()
+    for directory in (terms_dir, relations_dir):
+        for root, dirs, files in sorted(os.walk(directory)):
+            for f in sorted(files):
+                if f.endswith('.yml'):
+                    path = os.path.sep.join([root, f])
+                    sha.update(os.path.relpath(path, directory))
+                    sha.update(open(path, 'rb').read())
+    return sha.hexdigest()
+
 def load_whitelist(src=WHITELIST):
     try:
         yaml = read_unicode(src)
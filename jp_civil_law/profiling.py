@@ -0,0 +1,133 @@
+# encoding: utf-8
+
+import os
+import sys
+import time
+import cProfile
+import resource
+import contextlib
+
+
+class Span(object):
+    """
+    A timed stage of a run, with the stages and counters inside it.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rss_growth = 0
+        self.peak_rss = 0
+        self.calls = 0
+        self.children = []
+        self.counters = {}
+
+    def child(self, name):
+        """Child span named name, reused across calls."""
+        for child in self.children:
+            if child.name == name:
+                return child
+        child = Span(name)
+        self.children.append(child)
+        return child
+
+
+class Profiler(object):
+    """
+    Nested wall/CPU time, RSS growth and event counters of the stages of a run.
+
+    Spans and counters cost next to nothing until enable() is called.
+    Work done in forked worker processes is timed by the span around it,
+    but neither their counters nor their memory is seen.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.root = Span(u'run')
+        self._stack = [self.root]
+        self._cprofile_stage = None
+        self._cprofile_dest = None
+
+    def enable(self, cprofile_stage=None, cprofile_dest=None):
+        """
+        Start recording.
+
+        Options:
+            * cprofile_stage: name of a span to run under cProfile.
+            * cprofile_dest: file the stats of that span are dumped to.
+        """
+        self.enabled = True
+        self._cprofile_stage = cprofile_stage
+        self._cprofile_dest = cprofile_dest
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Time the with block as a stage named name, nested in the current one."""
+        if not self.enabled:
+            yield
+            return
+        span = self._stack[-1].child(name)
+        self._stack.append(span)
+        cprofile = None
+        if name == self._cprofile_stage:
+            cprofile = cProfile.Profile()
+            cprofile.enable()
+        started, cpu_started, rss_started = time.time(), time.clock(), current_rss()
+        try:
+            yield
+        finally:
+            span.wall += time.time() - started
+            span.cpu += time.clock() - cpu_started
+            span.calls += 1
+            span.rss_growth = max(span.rss_growth, current_rss() - rss_started)
+            span.peak_rss = max(span.peak_rss, peak_rss())
+            if cprofile is not None:
+                cprofile.disable()
+                cprofile.dump_stats(self._cprofile_dest)
+            self._stack.pop()
+
+    def count(self, name, n=1):
+        """Add n to the counter name of the current stage."""
+        if not self.enabled:
+            return
+        counters = self._stack[-1].counters
+        counters[name] = counters.get(name, 0) + n
+
+    def report(self, out=sys.stderr):
+        """
+        Write the span tree with times, RSS growth over a call (largest
+        of the calls), the process peak RSS at exit, and counters.
+        """
+        for span in self.root.children:
+            self._report(span, 0, out)
+
+    def _report(self, span, depth, out):
+        indent = u'  ' * depth
+        calls = u' x{}'.format(span.calls) if span.calls > 1 else u''
+        out.write(u'{}{}{}: wall {:.3f}s, cpu {:.3f}s, rss {:+.1f}MB, process peak rss {:.1f}MB\n'.format(
+            indent, span.name, calls, span.wall, span.cpu,
+            span.rss_growth / 1024.0, span.peak_rss / 1024.0,
+        ).encode('utf-8'))
+        for name in sorted(span.counters):
+            out.write(u'{}  - {}: {}\n'.format(indent, name, span.counters[name]).encode('utf-8'))
+        for child in span.children:
+            self._report(child, depth + 1, out)
+
+
+def peak_rss():
+    """Peak resident set size of this process so far, in kB (Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def current_rss(page_kb=os.sysconf('SC_PAGE_SIZE') // 1024):
+    """Resident set size of this process now, in kB; 0 without /proc."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * page_kb
+    except (IOError, IndexError, ValueError):
+        return 0
+
+
+profiler = Profiler()
+span = profiler.span
+count = profiler.count
@@ -3,10 +3,11 @@
 import os
 import argparse
 import logbook
-import networkx
 from build.easy_analysis import colouring
 from build.easy_analysis import user_color, user_calc
 from . import graph
+from . import export
+from . import profiling
 
 
 logger = logbook.Logger('run-build')
@@ -20,53 +21,75 @@ def path_from_me(path):
     return os.path.sep.join([i_am_in, path])
 
 BUILD_DESTINATION = path_from_me('./build/graph.dot')
+REPORT_DESTINATION = path_from_me('./build/evaluation.jsonl')
 
 
 def save_graph(nx_graph, tofile, cut_solos=False, rankcolor=False,
-               white_nodes=None, white_rels=None, mode=None):
-
-    # complete graphs
-    agraph = networkx.to_agraph(nx_graph)
-    nx_orig_graph = nx_graph.copy()
+               white_nodes=None, white_rels=None, mode=None, jobs=1, report=None,
+               resume=False, analyze=True, format='dot'):
+    """
+    Colour & write nx_graph to tofile in format (see export), and run
+    hook_calc on it.
+
+    Nothing is written if tofile is None; hook_calc is skipped unless analyze.
+    """
+    render = tofile is not None
+    if render and analyze:
+        nx_orig_graph = nx_graph.copy()
+    else:
+        nx_orig_graph = nx_graph
 
-    # color or process
-    featured = hook_color(nx_graph, agraph, rankcolor=rankcolor)
-    hook_calc(nx_orig_graph, mode=mode)
+    # color: graphviz attributes are set on nx_graph itself
+    if render:
+        with profiling.span(u'hook_color'):
+            featured = hook_color(nx_graph, rankcolor=rankcolor)
 
-    # filter
-    filter_target(nx_graph, (white_nodes + featured), white_rels)
-    if cut_solos:
-        remove_solos(nx_graph, without=featured)
-    reduced_agraph = networkx.to_agraph(nx_graph)
-    copy_agraph_attrs(agraph, reduced_agraph)
+    # process
+    if analyze:
+        with profiling.span(u'hook_calc'):
+            hook_calc(nx_orig_graph, mode=mode, jobs=jobs, report=report, resume=resume)
 
-    reduced_agraph.graph_attr['rankdir'] = 'BT'
-    reduced_agraph.graph_attr['remincross'] = 'true'
-    reduced_agraph.layout('twopi')
+    if render:
+        write_graph(nx_graph, featured, tofile, cut_solos=cut_solos,
+                    white_nodes=white_nodes, white_rels=white_rels, format=format)
 
-    reduced_agraph.write(tofile)
-
-def hook_color(nx_graph, agraph, rankcolor=False):
+def write_graph(nx_graph, featured, tofile, cut_solos=False,
+                white_nodes=None, white_rels=None, format='dot'):
+    # filter
+    with profiling.span(u'filter'):
+        filter_target(nx_graph, (white_nodes + featured), white_rels)
+        if cut_solos:
+            remove_solos(nx_graph, without=featured)
+    # streamed out as is, colours included; layout is left to graphviz
+    colouring.graph_attrs(nx_graph).update(rankdir='BT', remincross='true')
+    with profiling.span(u'write'):
+        export.export_graph(nx_graph, tofile, format=format)
+
+def hook_color(nx_graph, rankcolor=False):
     if rankcolor:
-        rankmap = user_color.pagerank_method(nx_graph, agraph)(user_color.terms.t)
-        colouring.set_graphcolor(agraph, rankcolor=True, rankmap=rankmap, fullrange=True)
-        colouring.color_nodeborders(agraph, user_color.terms.a, preset_with_fill='a')
-        colouring.color_nodeborders(agraph, user_color.terms.t, preset_with_fill='ab')
+        rankmap = user_color.pagerank_method(nx_graph)(user_color.terms.t)
+        colouring.set_graphcolor(nx_graph, rankcolor=True, rankmap=rankmap, fullrange=True)
+        colouring.color_nodeborders(nx_graph, user_color.terms.a, preset_with_fill='a')
+        colouring.color_nodeborders(nx_graph, user_color.terms.t, preset_with_fill='ab')
         featured = user_color.terms.a
     else:
-        featured = user_color.run(nx_graph, agraph)
+        featured = user_color.run(nx_graph)
     return featured
 
-def hook_calc(nx_graph, mode=None):
-    user_calc.run(nx_graph, mode=mode)
+def hook_calc(nx_graph, mode=None, jobs=1, report=None, resume=False):
+    user_calc.run(nx_graph, mode=mode, jobs=jobs, report=report, resume=resume)
 
 def filter_target(nx_graph, target_nodes=None, target_rels=None):
     if target_nodes is not None:
-        to_remove = set(nx_graph.nodes()).difference(target_nodes)
-        nx_graph.remove_nodes_from(to_remove)
+        target_nodes = set(target_nodes)
+        nx_graph.remove_nodes_from([
+            node for node in nx_graph.nodes_iter() if node not in target_nodes
+        ])
     if target_rels is not None:
-        to_remove = set(nx_graph.edges()).difference(target_rels)
-        nx_graph.remove_edges_from(to_remove)
+        target_rels = set(target_rels)
+        nx_graph.remove_edges_from([
+            edge for edge in nx_graph.edges_iter() if edge not in target_rels
+        ])
 
 def remove_solos(nx_graph, without=tuple()):
     degs = nx_graph.degree()
@@ -74,36 +97,40 @@ def remove_solos(nx_graph, without=tuple()):
         if degs[node] == 0 and node not in without:
             nx_graph.remove_node(node)
 
-def copy_agraph_attrs(srcg, destg):
-    destg.graph_attr.update(srcg.graph_attr)
-    destg.node_attr.update(srcg.node_attr)
-    destg.edge_attr.update(srcg.edge_attr)
-    for node in destg.nodes():
-        node = destg.get_node(node)
-        node.attr.update(srcg.get_node(node).attr)
-    for edge in destg.edges():
-        edge = destg.get_edge(*edge)
-        edge.attr.update(srcg.get_edge(*edge).attr)
-
-
 def run(args):
 
     logger.level_name = args.loglevel
     graph.logger.level_name = args.loglevel
     graph.difflogger.level_name = args.loglevel
 
+    if args.profile or args.cprofile_stage:
+        profiling.profiler.enable(
+            cprofile_stage=args.cprofile_stage,
+            cprofile_dest=args.cprofile_dest or path_from_me('./build/{}.prof'.format(args.cprofile_stage)),
+        )
+
     logger.notice('start build from {{"{}", "{}"}}'.format(args.terms_dir, args.relations_dir))
-    nx_graph, white_nodes, white_rels = graph.get_graph(
-        args.terms_dir, args.relations_dir, log=args.tracking_log,
-        use_whitelist=args.use_whitelist, as_nx=True
-    )
-    save_graph(
-        nx_graph, args.build_destination, cut_solos=args.cut_solos,
-        rankcolor=args.rankcolor,
-        white_nodes=white_nodes, white_rels=white_rels,
-        mode=args.mode,
-    )
-    logger.notice('done. saved to "{}"'.format(args.build_destination))
+    with profiling.span(u'get_graph'):
+        nx_graph, white_nodes, white_rels = graph.get_graph(
+            args.terms_dir, args.relations_dir, log=args.tracking_log,
+            use_whitelist=args.use_whitelist, as_nx=True
+        )
+    tofile = None if args.only == 'analysis' else args.build_destination
+    with profiling.span(u'save_graph'):
+        save_graph(
+            nx_graph, tofile, cut_solos=args.cut_solos,
+            rankcolor=args.rankcolor,
+            white_nodes=white_nodes, white_rels=white_rels,
+            mode=args.mode, jobs=args.jobs, report=args.report,
+            resume=args.resume, analyze=args.only != 'render',
+            format=args.format,
+        )
+    if args.only == 'analysis':
+        logger.notice('done.')
+    else:
+        logger.notice('done. saved to "{}"'.format(args.build_destination))
+    if args.profile:
+        profiling.profiler.report()
 
 
 if __name__ == '__main__':
@@ -111,11 +138,21 @@ if __name__ == '__main__':
     argparser.add_argument('-t', '--terms_dir', default=graph.TERMS_DIR)
     argparser.add_argument('-r', '--relations_dir', default=graph.RELATIONS_DIR)
     argparser.add_argument('-o', '--build_destination', default=BUILD_DESTINATION)
+    argparser.add_argument('-f', '--format', choices=sorted(export.EXPORTERS), default='dot',
+                           help='format of the graph written to build_destination')
     argparser.add_argument('-l', '--tracking_log', default=graph.TRACKING_LOG)
     argparser.add_argument('-w', '--use_whitelist', action='store_true', default=False)
     argparser.add_argument('--cut_solos', action='store_true', default=False)
     argparser.add_argument('--rankcolor', action='store_true', default=False)
     argparser.add_argument('--loglevel', default='INFO')
     argparser.add_argument('-m', '--mode', default='network')
+    argparser.add_argument('-j', '--jobs', type=int, default=1)
+    argparser.add_argument('--report', default=REPORT_DESTINATION)
+    argparser.add_argument('--resume', action='store_true', default=False)
+    argparser.add_argument('--only', choices=['analysis', 'render'], default=None,
+                           help='only run hook_calc (no dot output) or only write the dot file')
+    argparser.add_argument('--profile', action='store_true', default=False)
+    argparser.add_argument('--cprofile_stage', default=None)
+    argparser.add_argument('--cprofile_dest', default=None)
     args = argparser.parse_args()
     run(args)
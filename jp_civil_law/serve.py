@@ -0,0 +1,253 @@
+# encoding: utf-8
+
+import sys
+import json
+import time
+import urlparse
+import argparse
+import threading
+import collections
+import SocketServer
+import BaseHTTPServer
+import multiprocessing.pool
+import logbook
+from build.easy_analysis import retrieval
+from . import graph
+
+
+logger = logbook.Logger('query-server')
+logger_handler = logbook.StderrHandler()
+logger_handler.format_string = '({record.channel}:{record.level_name}) {record.message}'
+logger.handlers.append(logger_handler)
+
+
+class LatencyStats(object):
+    """
+    Request counts and latency percentiles over the latest requests.
+    """
+
+    def __init__(self, window=10000):
+        self.started = time.time()
+        self.count = 0
+        self.errors = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def push(self, seconds, error=False):
+        with self._lock:
+            self.count += 1
+            if error:
+                self.errors += 1
+            self._latencies.append(seconds)
+
+    def snapshot(self, percents=(50, 90, 95, 99)):
+        """Counts, and latency percentiles / mean / max in ms of the window."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            snapshot = {
+                u'requests': self.count,
+                u'errors': self.errors,
+                u'uptime': round(time.time() - self.started, 3),
+                u'window': len(latencies),
+            }
+        if latencies:
+            for percent in percents:
+                snapshot[u'p{}'.format(percent)] = round(percentile(latencies, percent) * 1000.0, 3)
+            snapshot[u'mean'] = round(sum(latencies) / len(latencies) * 1000.0, 3)
+            snapshot[u'max'] = round(latencies[-1] * 1000.0, 3)
+        return snapshot
+
+def percentile(ordered, percent):
+    """Nearest-rank percentile of the ascending values ordered."""
+    rank = int(-(-percent * len(ordered) // 100))
+    return ordered[max(rank, 1) - 1]
+
+
+class QueryService(object):
+    """
+    JSON requests to a QueryEngine, timed into LatencyStats.
+
+    Requests:
+        {"text": question text, "limit": articles to return (10)}
+            => {"terms": [...], "articles": [[key, score], ...]}
+        {"metrics": true}
+            => LatencyStats.snapshot() of the queries so far
+    An "id" of the request is copied into the response; a failed
+    request gets {"error": message}.
+    """
+
+    def __init__(self, engine, limit=10):
+        self.engine = engine
+        self.limit = limit
+        self.stats = LatencyStats()
+
+    def handle(self, request):
+        if request.get(u'metrics'):
+            response = self.metrics()
+        else:
+            started = time.time()
+            try:
+                response = self.query(request)
+            except Exception as err:
+                logger.error(u'query failed: {}: {}'.format(type(err).__name__, err))
+                response = {u'error': u'{}: {}'.format(type(err).__name__, err)}
+            self.stats.push(time.time() - started, error=u'error' in response)
+        if u'id' in request:
+            response[u'id'] = request[u'id']
+        return response
+
+    def query(self, request):
+        text = request.get(u'text')
+        if not isinstance(text, unicode):
+            return {u'error': u'"text" must be a string'}
+        limit = request.get(u'limit', self.limit)
+        if limit is not None and not isinstance(limit, int):
+            return {u'error': u'"limit" must be an integer'}
+        return self.engine.rank(text, limit=limit)
+
+    def metrics(self):
+        snapshot = self.stats.snapshot()
+        snapshot[u'mode'] = self.engine.mode
+        snapshot[u'articles'] = len(self.engine.articles)
+        return snapshot
+
+
+class ThreadedHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class QueryHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    POST /query (JSON request body), GET /query?text=...&limit=...,
+    GET /metrics; see QueryService.
+    """
+    service = None
+
+    def do_GET(self):
+        url = urlparse.urlparse(self.path)
+        if url.path == '/metrics':
+            return self._reply(200, self.service.handle({u'metrics': True}))
+        if url.path != '/query':
+            return self._reply(404, {u'error': u'no such path'})
+        params = urlparse.parse_qs(url.query)
+        request = {u'text': params.get('text', [''])[0].decode('utf-8')}
+        if 'limit' in params:
+            try:
+                request[u'limit'] = int(params['limit'][0])
+            except ValueError:
+                return self._reply(400, {u'error': u'"limit" must be an integer'})
+        self._respond(request)
+
+    def do_POST(self):
+        if urlparse.urlparse(self.path).path != '/query':
+            return self._reply(404, {u'error': u'no such path'})
+        try:
+            body = self.rfile.read(int(self.headers.getheader('content-length', 0)))
+            request = json.loads(body.decode('utf-8'))
+        except ValueError:
+            return self._reply(400, {u'error': u'request body is not JSON'})
+        if not isinstance(request, dict):
+            return self._reply(400, {u'error': u'request must be a JSON object'})
+        self._respond(request)
+
+    def _respond(self, request):
+        response = self.service.handle(request)
+        self._reply(400 if u'error' in response else 200, response)
+
+    def _reply(self, status, response):
+        body = json.dumps(response, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve_http(service, host, port):
+    class BoundQueryHandler(QueryHandler):
+        pass
+    BoundQueryHandler.service = service
+    server = ThreadedHTTPServer((host, port), BoundQueryHandler)
+    logger.notice('serving on http://{}:{}/'.format(host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def serve_stdio(service, jobs=4, instream=sys.stdin, outstream=sys.stdout):
+    """
+    One JSON request per input line, one JSON response per output line,
+    written as each completes: pass an "id" to pair them up.
+    """
+    write_lock = threading.Lock()
+
+    def _respond(line):
+        try:
+            request = json.loads(line.decode('utf-8'))
+            if not isinstance(request, dict):
+                raise ValueError('not an object')
+        except ValueError:
+            response = {u'error': u'request must be a JSON object'}
+        else:
+            response = service.handle(request)
+        with write_lock:
+            outstream.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + '\n')
+            outstream.flush()
+
+    pool = multiprocessing.pool.ThreadPool(jobs)
+    try:
+        for line in iter(instream.readline, ''):
+            if line.strip():
+                pool.apply_async(_respond, (line,))
+    finally:
+        pool.close()
+        pool.join()
+
+def run(args):
+
+    logger.level_name = args.loglevel
+    graph.logger.level_name = args.loglevel
+    graph.difflogger.level_name = args.loglevel
+
+    if args.stdio:
+        # mappers print progress; keep stdout for responses.
+        outstream, sys.stdout = sys.stdout, sys.stderr
+    logger.notice('loading from {{"{}", "{}"}}'.format(args.terms_dir, args.relations_dir))
+    nx_graph, _, _ = graph.get_graph(
+        args.terms_dir, args.relations_dir, log=args.tracking_log,
+        use_whitelist=args.use_whitelist, as_nx=True
+    )
+    started = time.time()
+    engine = retrieval.QueryEngine(nx_graph, mode=args.mode).warm()
+    logger.notice('warmed up in {}s: {} articles'.format(round(time.time() - started, 3), len(engine.articles)))
+    service = QueryService(engine, limit=args.limit)
+    if args.stdio:
+        serve_stdio(service, jobs=args.jobs, outstream=outstream)
+    else:
+        serve_http(service, args.host, args.port)
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('-t', '--terms_dir', default=graph.TERMS_DIR)
+    argparser.add_argument('-r', '--relations_dir', default=graph.RELATIONS_DIR)
+    argparser.add_argument('-l', '--tracking_log', default=graph.TRACKING_LOG)
+    argparser.add_argument('-w', '--use_whitelist', action='store_true', default=False)
+    argparser.add_argument('--loglevel', default='INFO')
+    argparser.add_argument('-m', '--mode', default='network')
+    argparser.add_argument('--limit', type=int, default=10,
+                           help='articles per response unless the request sets "limit"')
+    argparser.add_argument('--host', default='127.0.0.1')
+    argparser.add_argument('-p', '--port', type=int, default=8314)
+    argparser.add_argument('--stdio', action='store_true', default=False,
+                           help='JSON lines on stdin/stdout instead of HTTP')
+    argparser.add_argument('-j', '--jobs', type=int, default=4,
+                           help='requests handled at once in --stdio mode')
+    args = argparser.parse_args()
+    run(args)
@@ -0,0 +1,54 @@
+# encoding: utf-8
+
+import sys
+import argparse
+from benchmarks import benchmarks
+from benchmarks.runner import write_results, read_results, compare_results
+from benchmarks.sources import RealSource, ScaledSource
+from benchmarks.synthetic import SyntheticSource
+
+
+def sources_for(scales, synthetic_sizes, **synthetic_options):
+    for scale in scales:
+        if scale == 1:
+            yield RealSource()
+        else:
+            yield ScaledSource(scale)
+    for size in synthetic_sizes:
+        yield SyntheticSource(size, **synthetic_options)
+
+def int_list(text):
+    return [int(n) for n in text.split(',') if n]
+
+
+if __name__ == '__main__':
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('-s', '--scales', type=int_list, default='1,10,100',
+                           help='comma separated clone counts of the real sources')
+    argparser.add_argument('--synthetic', type=int_list, default='',
+                           help='comma separated term counts of generated sources')
+    argparser.add_argument('--distribution', default='poisson', choices=['poisson', 'powerlaw'])
+    argparser.add_argument('--conflicts', type=int, default=0)
+    argparser.add_argument('--cycles', type=int, default=0)
+    argparser.add_argument('--seed', type=int, default=0)
+    argparser.add_argument('-n', '--repeat', type=int, default=1)
+    argparser.add_argument('--stages', default=None,
+                           help='comma separated stage name prefixes to run')
+    argparser.add_argument('-o', '--output', default='benchmark.json')
+    argparser.add_argument('--compare', default=None, metavar='OLD_JSON',
+                           help='results of a previous run to compare with')
+    argparser.add_argument('--threshold', type=float, default=0.1)
+    args = argparser.parse_args()
+
+    select = args.stages.split(',') if args.stages else None
+    sources = sources_for(
+        args.scales, args.synthetic,
+        distribution=args.distribution, conflicts=args.conflicts,
+        cycles=args.cycles, seed=args.seed,
+    )
+    results = benchmarks.run(sources, repeat=args.repeat, select=select)
+    write_results(args.output, results, args.repeat)
+    if args.compare is not None:
+        regressions = compare_results(read_results(args.compare), read_results(args.output),
+                                      threshold=args.threshold)
+        sys.exit(1 if regressions else 0)
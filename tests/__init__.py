@@ -17,6 +17,34 @@ from .declarative import (
     termloader_unit,
     relationloader_unit,
 )
+from .diskcache import (
+    diskcache_unit, memorycache_unit,
+)
+from .casemaker import (
+    idf_unit, termmatcher_unit,
+)
+from .syntaxscore import (
+    parsetree_unit, amplify_unit,
+)
+from .graphindex import (
+    labelindex_unit, termtable_unit,
+    reachability_unit,
+)
+from .termexpand import (
+    expansion_unit,
+)
+from .similarity import (
+    jointrows_unit,
+)
+from .rankmetrics import (
+    rankmetrics_unit,
+)
+from .user_calc import (
+    report_unit,
+)
+from .articleindex import (
+    articleindex_unit,
+)
 
 
 tests = Tests(
@@ -30,5 +58,19 @@ tests = Tests(
         relationprovider_unit,
         termloader_unit,
         relationloader_unit,
+        diskcache_unit,
+        memorycache_unit,
+        idf_unit,
+        termmatcher_unit,
+        parsetree_unit,
+        amplify_unit,
+        labelindex_unit,
+        termtable_unit,
+        reachability_unit,
+        expansion_unit,
+        jointrows_unit,
+        rankmetrics_unit,
+        report_unit,
+        articleindex_unit,
     ]
 )
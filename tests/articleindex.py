@@ -0,0 +1,107 @@
+# encoding: utf-8
+
+import shutil
+import tempfile
+from attest import (
+    Tests, assert_hook,
+    contextmanager,
+)
+import networkx as nx
+from jp_civil_law.build.easy_analysis import (
+    articleindex, diskcache, similarity, user_calc,
+)
+
+
+articleindex_unit = Tests()
+
+
+@contextmanager
+def temporary_expansion_cache():
+    directory = tempfile.mkdtemp()
+    default_cache = user_calc.expansion_cache
+    user_calc.expansion_cache = diskcache.DiskCache('expansion', directory=directory)
+    try:
+        yield user_calc.expansion_cache
+    finally:
+        user_calc.expansion_cache = default_cache
+        shutil.rmtree(directory)
+
+
+class Fixtures:
+
+    # terms with idf values, so that every dimension weighs something.
+    class network:
+        terms = [
+            u'資力', u'先取特権', u'質権', u'事務', u'井戸',
+            u'遺棄', u'錯誤', u'限度', u'防衛',
+        ]
+        edges = [
+            (u'錯誤', u'限度', u'within'),
+            (u'錯誤', u'資力', u'hyper'),
+            (u'錯誤', u'防衛', u'hyper'),
+            (u'資力', u'井戸', u'sbj'),
+            (u'防衛', u'遺棄', u'within'),
+            (u'防衛', u'質権', u'sbj'),
+            (u'先取特権', u'防衛', u'sbj'),
+            (u'質権', u'錯誤', u'hyper'),
+            (u'事務', u'井戸', u'sbj'),
+        ]
+        term_sets = {
+            u'q/1': (u'遺棄', u'質権', u'限度'),
+            u'q/2': (u'錯誤', u'井戸'),
+            u'q/3': (u'先取特権', u'事務', u'防衛'),
+            u'a/1': (u'資力', u'質権', u'限度'),
+            u'a/2': (u'防衛', u'井戸'),
+            u'a/3': (u'錯誤', u'遺棄', u'事務'),
+            u'a/4': (u'質権',),
+        }
+
+    class chain:
+        # c -> b -> a in the hyper hierarchy.
+        lowers = {
+            u'a': frozenset([u'b', u'c']),
+            u'b': frozenset([u'c']),
+        }
+
+
+def network_graph():
+    nx_graph = nx.DiGraph()
+    nx_graph.add_nodes_from(Fixtures.network.terms)
+    for src, dest, label in Fixtures.network.edges:
+        nx_graph.add_edge(src, dest, label=label)
+    return nx_graph
+
+
+@articleindex_unit.test
+def reduce_in_pipeline_order():
+    """Reduce hierarchies in the order fn_joint_hierarchyreduce does."""
+    lowers = Fixtures.chain.lowers
+    for ordered in [(u'a', u'b', u'c'), (u'b', u'a', u'c'), (u'b', u'c', u'a')]:
+        assert articleindex.reduce_hierarchy(ordered, lowers, ()) == frozenset([u'b', u'c'])
+    assert articleindex.reduce_hierarchy((u'c', u'b', u'a'), lowers, ()) == frozenset([u'c'])
+    assert articleindex.reduce_hierarchy((u'a', u'c'), lowers, (u'a',)) == frozenset([u'a', u'c'])
+
+@articleindex_unit.test
+def network_scores_as_pipeline():
+    """Score questions as create_joint_mapper(mode='network') does."""
+    nx_graph = network_graph()
+    allterms = Fixtures.network.terms
+    term_sets = Fixtures.network.term_sets
+    articles = sorted(key for key in term_sets if not key.startswith(u'q'))
+    questions = sorted(key for key in term_sets if key.startswith(u'q'))
+    with temporary_expansion_cache():
+        mapper = user_calc.create_joint_mapper(
+            nx_graph=nx_graph, allterms=allterms,
+            raw_titles={}, raw_sents={}, termsets=term_sets,
+            mode=u'network',
+        )
+        index = articleindex.ArticleIndex(nx_graph, u'network', term_sets, articles, allterms)
+        for qkey in questions:
+            scores = dict(index.score(qkey, term_sets[qkey]))
+            for akey in articles:
+                map_q, _, map_a, _ = mapper(qkey, term_sets[qkey], akey, term_sets[akey])
+                expected = similarity.cosine_similarity(
+                    similarity.rankmap2vect(map_q, allterms),
+                    similarity.rankmap2vect(map_a, allterms),
+                )
+                assert abs(scores.get(akey, 0.0) - expected) < 1.0e-9
@@ -0,0 +1,227 @@
+# encoding: utf-8
+
+import random
+import itertools
+import collections
+from attest import (
+    Tests, assert_hook,
+)
+import networkx as nx
+from jp_civil_law.build.easy_analysis import casemaker
+
+
+idf_unit = Tests()
+termmatcher_unit = Tests()
+
+
+def interpolate_in_order(idfs, nx_graph, order):
+    # the dict-order loop idfmap_with_interpolation ran before the operator,
+    # visiting terms in the given order.
+    idfs = dict(idfs)
+    while True:
+        pre_comp = sum(idfs.values())
+        for term in order:
+            if idfs[term] != 0.0 or term not in nx_graph:
+                continue
+            nei_scores = [idfs[node] for node in nx.all_neighbors(nx_graph, term)]
+            if nei_scores:
+                idfs[term] = float(sum(nei_scores)) / float(len(nei_scores))
+        if sum(idfs.values()) - pre_comp == 0.0:
+            break
+    return idfs
+
+def interpolate(idfs, nx_graph, terms=None):
+    terms = sorted(idfs) if terms is None else terms
+    values = [idfs[term] for term in terms]
+    unknown = [i for i, term in enumerate(terms) if values[i] == 0.0 and term in nx_graph]
+    values, _ = casemaker.propagate_unknowns(
+        values, casemaker.neighbour_operator(nx_graph, terms), unknown,
+    )
+    return dict(itertools.izip(terms, values))
+
+def split_by_buckets(sequence, terms, stopwords, prefer_from=tuple()):
+    # matchterms before the trie: candidates bucketed by first character,
+    # longest first, preferred terms moved ahead.
+    termdict = collections.defaultdict(list)
+    for t in set(terms):
+        termdict[t[0]].append(t)
+    for index in termdict:
+        termdict[index].sort(reverse=True, key=lambda wd: len(wd))
+    for index in termdict:
+        for preference in reversed(prefer_from):
+            preferred = [term for term in termdict[index] if term in preference]
+            termdict[index] = preferred + [
+                term for term in termdict[index] if term not in preference
+            ]
+    splits = []
+    while sequence:
+        for match in termdict[sequence[0]]:
+            if sequence.startswith(match):
+                break
+        else:
+            sequence = sequence[1:]
+            continue
+        if match not in stopwords:
+            splits.append(match)
+        sequence = sequence[len(match):]
+    return splits
+
+
+class Fixtures:
+
+    class idf:
+        known = {u'Ueno': 2.0, u'Tokyo': 4.0, u'Shinagawa': 1.0}
+
+        # every unknown is filled before any unknown neighbour of it:
+        # the old loop gave the same values in any order.
+        class orderfree:
+            edges = [
+                (u'Ueno', u'Okachimachi'),
+                (u'Okachimachi', u'Tokyo'),
+                (u'Tokyo', u'Kanda'),
+                (u'Kanda', u'Akihabara'),
+                (u'Akihabara', u'Ochanomizu'),
+                (u'Shinagawa', u'Tamachi'),
+                (u'Mejiro', u'Ikebukuro'),
+            ]
+            expected = {
+                u'Okachimachi': 3.0,
+                u'Kanda': 2.0, u'Akihabara': 1.0, u'Ochanomizu': 1.0,
+                u'Tamachi': 1.0,
+                u'Mejiro': 0.0, u'Ikebukuro': 0.0,
+            }
+
+        # Kanda is averaged with Akihabara either still empty or filled,
+        # depending on which one the old loop visited first.
+        class ordered:
+            edges = [
+                (u'Ueno', u'Kanda'),
+                (u'Kanda', u'Tokyo'),
+                (u'Akihabara', u'Shinagawa'),
+                (u'Akihabara', u'Kanda'),
+            ]
+
+    class matcher:
+        terms = ['agoo', 'uboo', 'boo', 'goo', 'oo', 'aboo', 'ugoo', 'abebe']
+        stopwords = ['abebe', 'obebe']
+        sequence = 'agooooboouboogooobebeagooooabebebooobebeuboogooabebeooooagooaboougooabebeagoo'
+        splits = 'agoo,oo,boo,uboo,goo,agoo,oo,boo,uboo,goo,oo,oo,agoo,aboo,ugoo,agoo'.split(',')
+
+        class preferred:
+            terms_a = ['a', 'b', 'c', 'd', 'cd', 'e', 'f', 'ef', 'ghi']
+            terms_b = ['a', 'b', 'ab', 'c', 'd', 'e', 'f', 'ef', 'g', 'h', 'i', 'gh']
+            sequence = 'axbxabcdxcxdxefeefaxabaxcdcxghi'
+            splits = 'a,b,a,b,c,d,c,d,ef,e,ef,a,a,b,a,c,d,c,gh,i'.split(',')
+
+        alphabet = 'abgou'
+
+
+def idf_graph(edges):
+    nx_graph = nx.DiGraph()
+    nx_graph.add_nodes_from(Fixtures.idf.known)
+    nx_graph.add_edges_from(edges)
+    return nx_graph
+
+def idf_values(nx_graph):
+    idfs = dict.fromkeys(nx_graph.nodes(), 0.0)
+    idfs.update(Fixtures.idf.known)
+    idfs[u'Yokohama'] = 3.0
+    return idfs
+
+
+# idf interpolation
+
+@idf_unit.test
+def interpolate_as_loop():
+    """Fill unknown idfs as the dict-order loop did, where its order did not matter."""
+    nx_graph = idf_graph(Fixtures.idf.orderfree.edges)
+    idfs = idf_values(nx_graph)
+    interpolated = interpolate(idfs, nx_graph)
+    for order in [sorted(idfs), sorted(idfs, reverse=True), idfs.keys()]:
+        assert interpolate_in_order(idfs, nx_graph, order) == interpolated
+    for term, idf in Fixtures.idf.orderfree.expected.iteritems():
+        assert interpolated[term] == idf
+    assert interpolated[u'Yokohama'] == 3.0
+
+@idf_unit.test
+def interpolate_in_any_order():
+    """Give the same idfs for every term order, where the loop did not."""
+    nx_graph = idf_graph(Fixtures.idf.ordered.edges)
+    idfs = idf_values(nx_graph)
+    by_loop = set(
+        interpolate_in_order(idfs, nx_graph, order)[u'Kanda']
+        for order in itertools.permutations(sorted(idfs))
+    )
+    assert len(by_loop) > 1
+    by_sweeps = set(
+        interpolate(idfs, nx_graph, terms=list(order))[u'Kanda']
+        for order in itertools.permutations(sorted(idfs))
+    )
+    assert by_sweeps == set([(2.0 + 4.0 + 0.0) / 3.0])
+
+@idf_unit.test
+def interpolate_idfmap():
+    """Keep the known idfs and give graph-only terms their neighbours' average."""
+    known = casemaker.idfmap()
+    src, dest = sorted(term for term in known if known[term] != 0.0)[:2]
+    nx_graph = nx.DiGraph()
+    nx_graph.add_edges_from([(src, u'@unknown'), (u'@unknown', dest)])
+    idfs = casemaker.idfmap_with_interpolation(nx_graph, cache={})
+    assert set(idfs) == set(known) | set([u'@unknown'])
+    assert idfs[src] == known[src] and idfs[dest] == known[dest]
+    assert idfs[u'@unknown'] == (known[src] + known[dest]) / 2.0
+
+
+# term matching
+
+@termmatcher_unit.test
+def split_longest():
+    """Split on the longest term at each position, dropping stopwords."""
+    matcher = casemaker.TermMatcher(Fixtures.matcher.terms)
+    splits = matcher.split(Fixtures.matcher.sequence, frozenset(Fixtures.matcher.stopwords))
+    assert splits == Fixtures.matcher.splits
+    assert casemaker.matchterms(
+        Fixtures.matcher.sequence, Fixtures.matcher.terms, Fixtures.matcher.stopwords,
+    ) == Fixtures.matcher.splits
+
+@termmatcher_unit.test
+def split_preferred():
+    """Rank the terms of each preference first, in order, before length."""
+    preferred = Fixtures.matcher.preferred
+    terms = preferred.terms_a + preferred.terms_b
+    prefer = list(set(preferred.terms_a).intersection(preferred.terms_b))
+    prefer_from = [prefer, preferred.terms_b]
+    matcher = casemaker.TermMatcher(terms, prefer_from=prefer_from)
+    assert matcher.split(preferred.sequence) == preferred.splits
+    assert split_by_buckets(preferred.sequence, terms, [], prefer_from) == preferred.splits
+
+@termmatcher_unit.test
+def split_as_buckets():
+    """Split random sequences as the first-character buckets did."""
+    rand = random.Random(27)
+    alphabet = Fixtures.matcher.alphabet
+    def word(length):
+        return ''.join(rand.choice(alphabet) for _ in xrange(length))
+    for _ in xrange(200):
+        terms = [word(rand.randint(1, 4)) for _ in xrange(rand.randint(1, 8))]
+        stopwords = frozenset(rand.sample(terms, rand.randint(0, min(2, len(terms)))))
+        prefer_from = [rand.sample(terms, rand.randint(0, len(terms))) for _ in xrange(rand.randint(0, 2))]
+        sequence = word(rand.randint(0, 40))
+        matcher = casemaker.TermMatcher(terms, prefer_from=prefer_from)
+        assert matcher.split(sequence, stopwords) == split_by_buckets(
+            sequence, terms, stopwords, prefer_from,
+        )
+
+@termmatcher_unit.test
+def findall_as_substrings():
+    """Find every term held in a sequence, as testing each term against it does."""
+    rand = random.Random(49)
+    alphabet = Fixtures.matcher.alphabet
+    def word(length):
+        return ''.join(rand.choice(alphabet) for _ in xrange(length))
+    for _ in xrange(200):
+        terms = [word(rand.randint(1, 4)) for _ in xrange(rand.randint(1, 8))]
+        sequence = word(rand.randint(0, 20))
+        held = set(term for term in terms if term in sequence)
+        assert casemaker.TermMatcher(terms).findall(sequence) == held
+    assert casemaker.TermMatcher(['goo', 'oo', '']).findall('agooo') == set(['goo', 'oo'])
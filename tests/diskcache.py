@@ -0,0 +1,125 @@
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+from attest import (
+    Tests, assert_hook,
+    contextmanager,
+)
+from jp_civil_law.build.easy_analysis import diskcache
+
+
+diskcache_unit = Tests()
+memorycache_unit = Tests()
+
+
+@contextmanager
+def temporary_diskcache(**options):
+    directory = tempfile.mkdtemp()
+    try:
+        yield diskcache.DiskCache('test', directory=directory, **options)
+    finally:
+        shutil.rmtree(directory)
+
+
+class Fixtures:
+
+    # values of one pickled size each.
+    class entries:
+        keys = [u'Ueno', u'Kanda', u'Tokyo', u'Shinagawa', u'Osaki', u'Ebisu']
+        value = u'x' * 1000
+
+
+def entry_size(cache):
+    cache.set(u'@probe', Fixtures.entries.value)
+    size = os.path.getsize(cache._path(u'@probe'))
+    os.remove(cache._path(u'@probe'))
+    return size
+
+def stored_bytes(cache):
+    return sum(
+        os.path.getsize(os.path.join(cache._directory, name))
+        for name in os.listdir(cache._directory)
+    )
+
+def age(cache, key, mtime):
+    os.utime(cache._path(key), (mtime, mtime))
+
+
+# disk cache
+
+@diskcache_unit.test
+def store_and_load():
+    """Load what was stored, and the default for keys never stored."""
+    with temporary_diskcache() as cache:
+        assert cache.get(u'Ueno') is None
+        assert cache.get(u'Ueno', default=0) == 0
+        assert u'Ueno' not in cache
+        assert cache.set(u'Ueno', [1, 2]) == [1, 2]
+        assert cache.get(u'Ueno') == [1, 2]
+        assert u'Ueno' in cache
+        cache.set(u'Ueno', {u'line': u'山手'})
+        assert cache.get(u'Ueno') == {u'line': u'山手'}
+        assert not [name for name in os.listdir(cache._directory) if name.endswith('.tmp')]
+
+@diskcache_unit.test
+def evict_least_recent():
+    """Evict the least recently used entries of an overfull store, down to EVICT_TO."""
+    with temporary_diskcache() as sizing:
+        size = entry_size(sizing)
+    keys = Fixtures.entries.keys
+    with temporary_diskcache(max_bytes=5 * size) as cache:
+        for mtime, key in enumerate(keys[:5], start=1):
+            cache.set(key, Fixtures.entries.value)
+            age(cache, key, mtime)
+        # read lately: Ueno is now the most recent.
+        assert cache.get(keys[0]) == Fixtures.entries.value
+        cache.set(keys[5], Fixtures.entries.value)
+        kept = [key for key in keys if key in cache]
+        assert kept == [keys[0], keys[4], keys[5]]
+        assert stored_bytes(cache) <= 5 * size * diskcache.EVICT_TO
+        assert cache._total == stored_bytes(cache)
+
+@diskcache_unit.test
+def keep_written_entry():
+    """Keep the entry just written, even beyond max_bytes."""
+    with temporary_diskcache(max_bytes=1) as cache:
+        cache.set(u'Ueno', Fixtures.entries.value)
+        cache.set(u'Kanda', Fixtures.entries.value)
+        assert u'Ueno' not in cache
+        assert cache.get(u'Kanda') == Fixtures.entries.value
+
+@diskcache_unit.test
+def count_stored_bytes():
+    """Keep the running total at the size of the store, replacements included."""
+    with temporary_diskcache(max_bytes=10 ** 6) as cache:
+        cache.set(u'Ueno', u'x')
+        assert cache._total == stored_bytes(cache)
+        for key, value in [
+            (u'Kanda', Fixtures.entries.value),
+            (u'Ueno', Fixtures.entries.value * 2),
+            (u'Kanda', u'x'),
+        ]:
+            cache.set(key, value)
+            assert cache._total == stored_bytes(cache)
+
+
+# memory cache
+
+@memorycache_unit.test
+def keep_last_used():
+    """Keep the max_entries last stored or read, dropping the least recent."""
+    cache = diskcache.MemoryCache(2)
+    assert cache.get(u'Ueno') is None and cache.get(u'Ueno', default=0) == 0
+    assert cache.set(u'Ueno', 1) == 1
+    cache.set(u'Kanda', 2)
+    assert cache.get(u'Ueno') == 1
+    cache.set(u'Tokyo', 3)
+    assert u'Kanda' not in cache
+    assert (cache.get(u'Ueno'), cache.get(u'Tokyo')) == (1, 3)
+    cache.set(u'Ueno', 4)
+    cache.set(u'Shinagawa', 5)
+    assert u'Tokyo' not in cache
+    assert cache.get(u'Ueno') == 4
+    assert len(cache) == 2
@@ -0,0 +1,189 @@
+# encoding: utf-8
+
+import random
+import itertools
+from attest import (
+    Tests, assert_hook,
+)
+import networkx as nx
+from jp_civil_law.build.easy_analysis import graphindex
+
+
+labelindex_unit = Tests()
+termtable_unit = Tests()
+reachability_unit = Tests()
+
+
+class Fixtures:
+
+    class stations:
+        edges = [
+            (u'Ueno', u'Akihabara', u'next_to'),
+            (u'Akihabara', u'Kanda', u'next_to'),
+            (u'Kanda', u'Tokyo', u'next_to'),
+            (u'Tokyo', u'Kanda', u'next_to'),
+            (u'Ueno', u'Tokyo', u'express'),
+        ]
+        isolated = [u'Shinagawa']
+
+
+def station_graph():
+    nx_graph = nx.DiGraph()
+    nx_graph.add_nodes_from(Fixtures.stations.isolated)
+    for src, dest, label in Fixtures.stations.edges:
+        nx_graph.add_edge(src, dest, label=label)
+    return nx_graph
+
+def random_graph(rand, size, labels):
+    nx_graph = nx.DiGraph()
+    nx_graph.add_nodes_from(u'n{}'.format(i) for i in xrange(size))
+    for _ in xrange(rand.randint(0, 2 * size)):
+        src, dest = rand.randint(0, size - 1), rand.randint(0, size - 1)
+        nx_graph.add_edge(u'n{}'.format(src), u'n{}'.format(dest), label=rand.choice(labels))
+    return nx_graph
+
+def labelled_subgraph(nx_graph, labels):
+    subgraph = nx.DiGraph()
+    subgraph.add_nodes_from(nx_graph)
+    subgraph.add_edges_from(
+        (src, dest) for src, dest, attrs in nx_graph.edges_iter(data=True)
+        if labels is None or attrs['label'] in labels
+    )
+    return subgraph
+
+
+# label views
+
+@labelindex_unit.test
+def successors_by_label():
+    """List the successors over the given labels, in edge order."""
+    index = graphindex.labelindex(station_graph())
+    assert index.successors([u'next_to'])[u'Ueno'] == [u'Akihabara']
+    assert index.successors([u'express'])[u'Ueno'] == [u'Tokyo']
+    assert index.successors([u'express'])[u'Kanda'] == []
+    assert index.successors([u'missing'])[u'Shinagawa'] == []
+    nx_graph = station_graph()
+    everything = graphindex.labelindex(nx_graph).successors()
+    for node in nx_graph:
+        assert everything[node] == nx_graph.successors(node)
+
+@labelindex_unit.test
+def predecessors_by_label():
+    """List the predecessors over the given labels, in edge order."""
+    index = graphindex.labelindex(station_graph())
+    assert index.predecessors([u'next_to'])[u'Tokyo'] == [u'Kanda']
+    assert sorted(index.predecessors()[u'Tokyo']) == [u'Kanda', u'Ueno']
+    assert index.predecessors([u'next_to', u'express'])[u'Ueno'] == []
+
+@labelindex_unit.test
+def subgraph_by_label():
+    """Keep every node and the labelled edges, in the graph's adjacency order."""
+    nx_graph = station_graph()
+    subgraph = graphindex.labelindex(nx_graph).subgraph([u'next_to'])
+    assert subgraph.nodes() == nx_graph.nodes()
+    assert sorted(subgraph.edges()) == sorted(
+        (src, dest) for src, dest, label in Fixtures.stations.edges if label == u'next_to'
+    )
+    for node in subgraph:
+        assert subgraph.successors(node) == [
+            dest for dest in nx_graph.successors(node)
+            if nx_graph[node][dest]['label'] == u'next_to'
+        ]
+    assert nx_graph.number_of_edges() == len(Fixtures.stations.edges)
+
+@labelindex_unit.test
+def views_once():
+    """Build one index per graph and one view per label set."""
+    nx_graph = station_graph()
+    index = graphindex.labelindex(nx_graph)
+    assert graphindex.labelindex(nx_graph) is index
+    assert index.successors([u'next_to', u'express']) is index.successors((u'express', u'next_to'))
+    assert index.subgraph([u'next_to']) is index.subgraph(set([u'next_to']))
+    assert index.successors() is not index.predecessors()
+    assert graphindex.labelindex(station_graph()) is not index
+
+
+# term ids
+
+@termtable_unit.test
+def node_ids_first():
+    """Give the nodes the first ids, in LabelIndex order."""
+    nx_graph = station_graph()
+    table = graphindex.termtable(nx_graph)
+    nodes = graphindex.labelindex(nx_graph).nodes
+    assert table.labels == nodes
+    assert [table.ids[node] for node in nodes] == range(len(nodes))
+    assert table.node_count == len(nodes)
+    assert graphindex.termtable(nx_graph) is table
+
+@termtable_unit.test
+def intern_terms():
+    """Keep ids of interned terms after the nodes', once each."""
+    table = graphindex.TermTable([u'Ueno', u'Tokyo'])
+    assert table.intern(u'Kanda') == 2
+    assert table.intern(u'Kanda') == 2
+    assert table.intern_all([u'Tokyo', u'Osaki']) == [1, 3]
+    assert table.labels[3] == u'Osaki'
+    assert table.is_node(1) and not table.is_node(2)
+    assert len(table) == 4
+    assert u'Osaki' in table and u'Mejiro' not in table
+
+@termtable_unit.test
+def known_ids():
+    """Look up ids without interning, leaving unknown terms out."""
+    table = graphindex.TermTable([u'Ueno', u'Tokyo'])
+    assert table.known([u'Tokyo', u'Mejiro', u'Ueno']) == [1, 0]
+    assert u'Mejiro' not in table
+
+
+# reachability
+
+@reachability_unit.test
+def reach_as_has_path():
+    """Reach the nodes nx.has_path finds over the labelled edges, through cycles."""
+    nx_graph = station_graph()
+    for labels in [None, [u'next_to'], [u'express'], []]:
+        index = graphindex.Reachability(nx_graph, labels=labels)
+        subgraph = labelled_subgraph(nx_graph, labels)
+        for src, dest in itertools.product(nx_graph, repeat=2):
+            assert index.reachable(src, dest) == nx.has_path(subgraph, src, dest)
+    index = graphindex.Reachability(nx_graph, labels=[u'next_to'])
+    assert index.reachable(u'Tokyo', u'Kanda') and index.reachable(u'Kanda', u'Tokyo')
+    assert not index.reachable(u'Tokyo', u'Ueno')
+
+@reachability_unit.test
+def reach_random_graphs():
+    """Reach as nx.has_path on random labelled graphs."""
+    rand = random.Random(30)
+    labels = [u'hyper', u'sbj', u'within']
+    for _ in xrange(50):
+        nx_graph = random_graph(rand, rand.randint(1, 12), labels)
+        chosen = rand.sample(labels, rand.randint(1, 3))
+        index = graphindex.Reachability(nx_graph, labels=chosen)
+        subgraph = labelled_subgraph(nx_graph, chosen)
+        for src, dest in itertools.product(nx_graph, repeat=2):
+            assert index.reachable(src, dest) == nx.has_path(subgraph, src, dest)
+
+@reachability_unit.test
+def reach_bits():
+    """Set the bit of every reached node id, the nodes' own included."""
+    nx_graph = station_graph()
+    index = graphindex.reachability(nx_graph, labels=[u'next_to'])
+    table = graphindex.termtable(nx_graph)
+    reached = index.reach_bits(table.ids[u'Akihabara'])
+    assert [
+        table.labels[i] for i in xrange(table.node_count) if reached >> i & 1
+    ] == [node for node in table.labels if node in (u'Akihabara', u'Kanda', u'Tokyo')]
+    assert u'Shinagawa' in index
+    assert u'Osaki' not in index
+    table.intern(u'Osaki')
+    assert u'Osaki' not in index
+
+@reachability_unit.test
+def reachability_once():
+    """Build one index per graph and label set."""
+    nx_graph = station_graph()
+    index = graphindex.reachability(nx_graph, labels=[u'next_to', u'express'])
+    assert graphindex.reachability(nx_graph, labels=(u'express', u'next_to')) is index
+    assert graphindex.reachability(nx_graph) is not index
+    assert graphindex.reachability(station_graph(), labels=[u'next_to', u'express']) is not index
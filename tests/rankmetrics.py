@@ -0,0 +1,114 @@
+# encoding: utf-8
+
+import math
+import random
+import itertools
+from attest import (
+    Tests, assert_hook,
+    raises,
+)
+from jp_civil_law.build.easy_analysis import rankmetrics
+
+
+rankmetrics_unit = Tests()
+
+
+# the per-metric functions of user_calc that rankmetrics replaced;
+# each walked the order again for every answer.
+
+def keymap_ranks(order, correct_order, qkey, noorder=True):
+    rankstack = []
+    for artkey in correct_order:
+        rank = 0.0
+        for score, grouped in itertools.groupby(order, lambda kp_score: kp_score[1]):
+            equivs = set(sum((list(keypair) for keypair, score in grouped), []))
+            equivs.remove(qkey)
+            if artkey in equivs:
+                rank += (1.0 + float(len(equivs) - 1) / 2.0)
+                break
+            else:
+                rank += float(len(equivs))
+        else:
+            raise ValueError('?')
+        rankstack.append(rank)
+    if noorder:
+        rankstack.sort()
+    return rankstack
+
+def keypair_MAP(order, correct_order, qkey, noorder=True):
+    rankstack = keymap_ranks(order, correct_order, qkey, noorder=noorder)
+    ratiostack = []
+    for correct_rank, rank in enumerate(rankstack, start=1):
+        ratiostack.append(float(correct_rank) / float(rank))
+    return sum(ratiostack) / float(len(ratiostack))
+
+def keymap_avr_rank(order, correct_order, qkey, noorder=True):
+    rankstack = keymap_ranks(order, correct_order, qkey, noorder=noorder)
+    ratiostack = []
+    for correct_rank, rank in enumerate(rankstack, start=1):
+        ratiostack.append(float(rank) / float(correct_rank))
+    rank = sum(ratiostack) / float(len(ratiostack))
+    logrank = sum(2.0 * math.log(r) for r in ratiostack) / float(len(ratiostack))
+    return rank, logrank
+
+def f_measure(F_threshold, order, correct_order, qkey):
+    rankstack = keymap_ranks(order, correct_order, qkey)
+    num_recall = len([rank_ for rank_ in rankstack if rank_ <= F_threshold])
+    return float(num_recall) / (0.5 * (F_threshold + float(len(correct_order))))
+
+
+class Fixtures:
+
+    class question:
+        qkey = u'q/1'
+        order = [
+            ((u'q/1', u'a/1'), 0.9),
+            ((u'q/1', u'a/2'), 0.5),
+            ((u'q/1', u'a/3'), 0.5),
+            ((u'q/1', u'a/4'), 0.5),
+            ((u'q/1', u'a/5'), 0.1),
+        ]
+        ranks = {u'a/1': 1.0, u'a/2': 3.0, u'a/3': 3.0, u'a/4': 3.0, u'a/5': 5.0}
+
+    F_threshold = 3.0
+
+
+def random_order(rand, qkey, size):
+    scores = [rand.choice([0.0, 0.25, 0.5, 0.75, 1.0]) for _ in xrange(size)]
+    scored = [((qkey, u'a/{}'.format(i)), score) for i, score in enumerate(scores)]
+    scored.sort(key=lambda kp_score: kp_score[1], reverse=True)
+    return scored
+
+
+# rank metrics
+
+@rankmetrics_unit.test
+def rank_ties():
+    """Give keys of the same score the middle rank of their group."""
+    question = Fixtures.question
+    assert rankmetrics.tie_ranks(question.order, question.qkey) == question.ranks
+    assert rankmetrics.answer_ranks(question.order, [u'a/5', u'a/1'], question.qkey) == [1.0, 5.0]
+    assert rankmetrics.answer_ranks(
+        question.order, [u'a/5', u'a/1'], question.qkey, noorder=False,
+    ) == [5.0, 1.0]
+    with raises(ValueError):
+        rankmetrics.answer_ranks(question.order, [u'a/9'], question.qkey)
+
+@rankmetrics_unit.test
+def metrics_as_keymaps():
+    """Give the MAP, ranks and F the per-metric keymap functions gave."""
+    rand = random.Random(38)
+    qkey = Fixtures.question.qkey
+    for _ in xrange(300):
+        order = random_order(rand, qkey, rand.randint(1, 12))
+        keys = [key2 for (_, key2), score in order]
+        answers = rand.sample(keys, rand.randint(1, min(4, len(keys))))
+        for noorder in (True, False):
+            metrics = rankmetrics.question_metrics(
+                order, answers, qkey, Fixtures.F_threshold, noorder=noorder,
+            )
+            rank, logrank = keymap_avr_rank(order, answers, qkey, noorder=noorder)
+            assert metrics['map'] == keypair_MAP(order, answers, qkey, noorder=noorder)
+            assert metrics['rank'] == rank
+            assert metrics['logrank'] == logrank
+            assert metrics['f'] == f_measure(Fixtures.F_threshold, order, answers, qkey)
@@ -0,0 +1,104 @@
+# encoding: utf-8
+
+from attest import (
+    Tests, assert_hook,
+)
+from jp_civil_law.build.easy_analysis import similarity
+
+
+jointrows_unit = Tests()
+
+
+class Fixtures:
+
+    class stations:
+        dimensions = [u'Ueno', u'Kanda', u'Tokyo', u'Shinagawa']
+        term_sets = {
+            u'line/yamanote': (u'Ueno', u'Kanda', u'Tokyo', u'Shinagawa'),
+            u'line/chuo': (u'Kanda', u'Tokyo'),
+            u'line/keihin': (u'Ueno', u'Tokyo', u'Shinagawa', u'Shinagawa'),
+            u'line/ginza': (u'Ueno', u'Kanda'),
+        }
+
+
+def joint_counts(key1, terms1, key2, terms2):
+    # each side weighs its terms by how often the other lists them.
+    def counts(terms, other):
+        rankmap = dict.fromkeys(Fixtures.stations.dimensions, 0.0)
+        for term in terms:
+            rankmap[term] += 1.0 + other.count(term)
+        return rankmap
+    return counts(terms1, terms2), terms1, counts(terms2, terms1), terms2
+
+def expected_sims(term_sets, dimensions):
+    sims = {}
+    for key1 in term_sets:
+        for key2 in term_sets:
+            if key1 != key2:
+                map_1, _, map_2, _ = joint_counts(key1, term_sets[key1], key2, term_sets[key2])
+                sims[(key1, key2)] = similarity.cosine_similarity(
+                    similarity.rankmap2vect(map_1, dimensions),
+                    similarity.rankmap2vect(map_2, dimensions),
+                )
+    return sims
+
+
+# similarity rows
+
+@jointrows_unit.test
+def rows_in_order():
+    """Yield a row per key, descending, of the other keys' similarities."""
+    term_sets, dimensions = Fixtures.stations.term_sets, Fixtures.stations.dimensions
+    expected = expected_sims(term_sets, dimensions)
+    keys = sorted(term_sets, reverse=True)
+    rows = list(similarity.joint_combination_rows(term_sets, dimensions, joint_counts))
+    assert [key1 for key1, row in rows] == keys
+    for key1, row in rows:
+        assert [key2 for key2, sim in row] == [key for key in keys if key != key1]
+        for key2, sim in row:
+            assert sim == expected[(key1, key2)]
+    assert similarity.joint_combination_sims(term_sets, dimensions, joint_counts) == expected
+
+@jointrows_unit.test
+def rows_of_rowkeys():
+    """Yield the rows of rowkeys only, in their order, and none for no keys."""
+    term_sets, dimensions = Fixtures.stations.term_sets, Fixtures.stations.dimensions
+    rowkeys = [u'line/chuo', u'line/yamanote']
+    rows = list(similarity.joint_combination_rows(term_sets, dimensions, joint_counts, rowkeys=rowkeys))
+    assert [key1 for key1, row in rows] == rowkeys
+    for jobs in (1, 2):
+        assert list(similarity.joint_combination_rows(
+            term_sets, dimensions, joint_counts, rowkeys=[], jobs=jobs,
+        )) == []
+
+@jointrows_unit.test
+def rows_in_workers():
+    """Score the same rows in pool workers, with an unpicklable mapper."""
+    term_sets, dimensions = Fixtures.stations.term_sets, Fixtures.stations.dimensions
+    mapper = lambda *args: joint_counts(*args)
+    serial = list(similarity.joint_combination_rows(term_sets, dimensions, mapper))
+    pooled = list(similarity.joint_combination_rows(term_sets, dimensions, mapper, jobs=2))
+    assert pooled == serial
+
+@jointrows_unit.test
+def rows_side_by_side():
+    """Keep each generator on its own inputs while another is running."""
+    term_sets, dimensions = Fixtures.stations.term_sets, Fixtures.stations.dimensions
+    fewer = dict((key, terms) for key, terms in term_sets.iteritems() if key != u'line/ginza')
+    expected_all = expected_sims(term_sets, dimensions)
+    expected_fewer = expected_sims(fewer, dimensions)
+    for jobs in (1, 2):
+        rows_all = similarity.joint_combination_rows(term_sets, dimensions, joint_counts, jobs=jobs)
+        rows_fewer = similarity.joint_combination_rows(fewer, dimensions, joint_counts, jobs=jobs)
+        rows = []
+        for key_fewer, row_fewer in rows_fewer:
+            rows.append((key_fewer, row_fewer, expected_fewer))
+            key_all, row_all = next(rows_all)
+            rows.append((key_all, row_all, expected_all))
+        rows.extend((key_all, row_all, expected_all) for key_all, row_all in rows_all)
+        assert len(rows) == len(fewer) + len(term_sets)
+        for key1, row, expected in rows:
+            expected_row = dict(
+                (key2, sim) for (key, key2), sim in expected.iteritems() if key == key1
+            )
+            assert dict(row) == expected_row
@@ -0,0 +1,178 @@
+# encoding: utf-8
+
+import random
+import shutil
+import tempfile
+from attest import (
+    Tests, assert_hook,
+    contextmanager, raises,
+)
+from lxml import etree
+from jp_civil_law.build.easy_analysis import diskcache, syntaxscore
+
+
+parsetree_unit = Tests()
+amplify_unit = Tests()
+
+
+@contextmanager
+def temporary_parse_cache():
+    directory = tempfile.mkdtemp()
+    default_cache = syntaxscore.parse_cache
+    syntaxscore.parse_cache = diskcache.DiskCache('parsetrees', directory=directory)
+    try:
+        yield syntaxscore.parse_cache
+    finally:
+        syntaxscore.parse_cache = default_cache
+        shutil.rmtree(directory)
+
+
+def amplify_by_loops(termset, tree):
+    # amplify_by_syntax before the topic focus and matcher: every term
+    # tested against every surface.
+    base = dict.fromkeys(termset, 1.0)
+    if not tree.chunks:
+        return base
+    topicchunks = [
+        chunk for chunk in tree.chunks
+        if chunk.func_surface in (u'は', u'も', u'場合', u'とき', u'ば', u'なら')
+    ] + [tree.root]
+    topicfocus = set()
+    for chunk in topicchunks:
+        topicfocus.update(c.surface for c in [chunk] + chunk.linked)
+    for term in termset:
+        for surface in topicfocus:
+            if term in surface:
+                base[term] *= syntaxscore.AMP_SUBJECT
+    return base
+
+
+class Fixtures:
+
+    class tree:
+        # 売主は / 買主に / 目的物を / 引き渡す
+        surfaces = [u'売主は', u'買主に', u'目的物を', u'引き渡す']
+        func_surfaces = [u'は', u'に', u'を', u'渡す']
+        links = [3, 3, 3, -1]
+        text = u''.join(surfaces)
+
+    # CaboCha's XML of two sentences, the second one chunk long.
+    class cabocha:
+        xml = u'''
+            <sentence>
+              <chunk id="0" link="2" rel="D" score="0.0" head="0" func="1">
+                <tok id="0" feature="名詞">売主</tok><tok id="1" feature="助詞">は</tok>
+              </chunk>
+              <chunk id="1" link="2" rel="D" score="0.0" head="2" func="3">
+                <tok id="2" feature="名詞">目的物</tok><tok id="3" feature="助詞">を</tok>
+              </chunk>
+              <chunk id="2" link="-1" rel="D" score="0.0" head="4" func="4">
+                <tok id="4" feature="動詞">引き渡す</tok>
+              </chunk>
+            </sentence>
+            <sentence>
+              <chunk id="0" link="-1" rel="D" score="0.0" head="0" func="0">
+                <tok id="0" feature="名詞">代金</tok>
+              </chunk>
+            </sentence>
+        '''
+        surfaces = (u'売主は', u'目的物を', u'引き渡す', u'代金')
+        func_surfaces = (u'は', u'を', u'引き渡す', u'代金')
+        links = (2, 2, -1, -1)
+
+    class random:
+        alphabet = u'売買主目的物'
+        funcs = [u'は', u'も', u'に', u'を', u'場合']
+
+
+def random_tree(rand):
+    alphabet = Fixtures.random.alphabet
+    size = rand.randint(1, 6)
+    surfaces = [
+        u''.join(rand.choice(alphabet) for _ in xrange(rand.randint(1, 4)))
+        for _ in xrange(size)
+    ]
+    funcs = [rand.choice(Fixtures.random.funcs) for _ in xrange(size)]
+    links = [rand.randint(i + 1, size - 1) for i in xrange(size - 1)] + [-1]
+    return syntaxscore.Tree(surfaces, funcs, links)
+
+
+# parse trees
+
+@parsetree_unit.test
+def tree_from_cabocha():
+    """Read chunks, function words and links from CaboCha's XML."""
+    cabocha = Fixtures.cabocha
+    sentences = syntaxscore.wrap_sentences(cabocha.xml)
+    tree = syntaxscore.Tree.from_element(sentences)
+    assert tree.pack() == (cabocha.surfaces, cabocha.func_surfaces, cabocha.links)
+    assert tree.root.surface == u'引き渡す'
+    assert [chunk.surface for chunk in tree.root.linked] == [u'売主は', u'目的物を']
+    first = syntaxscore.Tree.from_element(sentences.findall('sentence')[0])
+    assert first.pack() == (cabocha.surfaces[:3], cabocha.func_surfaces[:3], cabocha.links[:3])
+    assert syntaxscore.Tree(*tree.pack()).pack() == tree.pack()
+
+@parsetree_unit.test
+def parse_from_caches():
+    """Take trees parsed before from disk, then from memory, once per text."""
+    tree = Fixtures.tree
+    packed = (tuple(tree.surfaces), tuple(tree.func_surfaces), tuple(tree.links))
+    texts = [tree.text, u'代金', tree.text]
+    with temporary_parse_cache() as parse_cache:
+        for text in set(texts):
+            parse_cache.set(u'{}/{}'.format(syntaxscore.PARSE_FORMAT, text), packed)
+        in_memory = diskcache.MemoryCache(2)
+        trees = syntaxscore.parse_batch(texts, cache=in_memory)
+        assert [parsed.pack() for parsed in trees] == [packed] * 3
+        assert trees[0] is trees[2]
+        assert tree.text in in_memory and len(in_memory) == 2
+        # gone from disk, still in memory.
+        shutil.rmtree(parse_cache._directory)
+        assert syntaxscore.parse_batch([tree.text], cache=in_memory)[0] is trees[0]
+
+
+# syntax amplification
+
+@amplify_unit.test
+def amplify_as_loops():
+    """Amplify terms as testing every term against every topic surface did."""
+    rand = random.Random(49)
+    alphabet = Fixtures.random.alphabet
+    for _ in xrange(200):
+        tree = random_tree(rand)
+        # duplicates included: a term listed twice is amplified twice.
+        termset = [
+            u''.join(rand.choice(alphabet) for _ in xrange(rand.randint(1, 2)))
+            for _ in xrange(rand.randint(1, 6))
+        ]
+        scores = syntaxscore.amplify_by_syntax(termset, tree, cache={})
+        expected = amplify_by_loops(termset, tree)
+        assert set(scores) == set(expected)
+        for term in expected:
+            assert abs(scores[term] - expected[term]) < 1.0e-12
+
+@amplify_unit.test
+def amplify_topic_focus():
+    """Amplify the terms held by topic chunks, the root and their dependents."""
+    tree = syntaxscore.Tree(
+        Fixtures.tree.surfaces, Fixtures.tree.func_surfaces, Fixtures.tree.links,
+    )
+    assert tree.root.surface == u'引き渡す'
+    scores = syntaxscore.amplify_by_syntax([u'売主', u'目的物', u'代金'], tree, cache={})
+    assert scores[u'売主'] == syntaxscore.AMP_SUBJECT
+    assert scores[u'目的物'] == syntaxscore.AMP_SUBJECT
+    assert scores[u'代金'] == 1.0
+
+@amplify_unit.test
+def amplify_once_per_tree():
+    """Share one read-only mapping per (termset, tree)."""
+    tree = syntaxscore.Tree(
+        Fixtures.tree.surfaces, Fixtures.tree.func_surfaces, Fixtures.tree.links,
+    )
+    cache = {}
+    scores = syntaxscore.amplify_by_syntax((u'売主',), tree, cache=cache)
+    assert syntaxscore.amplify_by_syntax((u'売主',), tree, cache=cache) is scores
+    assert syntaxscore.amplify_by_syntax((u'買主',), tree, cache=cache) is not scores
+    with raises(TypeError):
+        scores[u'売主'] = 1.0
+    assert dict(scores) == {u'売主': syntaxscore.AMP_SUBJECT}
@@ -0,0 +1,105 @@
+# encoding: utf-8
+
+import random
+from attest import (
+    Tests, assert_hook,
+)
+import networkx as nx
+from jp_civil_law.build.easy_analysis import termexpand
+
+
+expansion_unit = Tests()
+
+
+def populate_by_methods(terms, nx_graph, methods=tuple()):
+    # populate before the engine: every method rescans the whole list
+    # and graph on every round.
+    expand = list(terms)
+    scoremap = dict.fromkeys(expand, 0.5)
+    exit_margin = 1
+    init_margin = exit_margin
+    while True:
+        prev_terms = expand[:]
+        for method in methods:
+            for ex, reasons in method(expand, nx_graph):
+                expand.append(ex)
+                scoremap[ex] = termexpand.scorebase[method.__name__]
+        if set(prev_terms) == set(expand):
+            exit_margin -= 1
+            if exit_margin == 0:
+                break
+        else:
+            exit_margin = init_margin
+    return tuple(expand), scoremap
+
+
+class Fixtures:
+
+    # hyperframes: 売買 is a 契約 holding 売主 in a slot.
+    class contract:
+        edges = [
+            (u'売買', u'契約', u'hyper'),
+            (u'契約', u'当事者', u'sbj'),
+            (u'売買', u'売主', u'sbj'),
+            (u'売主', u'当事者', u'hyper'),
+            (u'贈与', u'契約', u'hyper'),
+            (u'贈与', u'贈与者', u'sbj'),
+            (u'贈与者', u'当事者', u'hyper'),
+        ]
+
+    labels = list(termexpand.all_props)
+
+
+def labelled_graph(edges):
+    nx_graph = nx.DiGraph()
+    for src, dest, label in edges:
+        nx_graph.add_edge(src, dest, label=label)
+    return nx_graph
+
+def random_graph(rand, size):
+    nx_graph = nx.DiGraph()
+    nodes = [u'n{}'.format(i) for i in xrange(size)]
+    nx_graph.add_nodes_from(nodes)
+    for _ in xrange(rand.randint(2 * size, 4 * size)):
+        src, dest = rand.sample(nodes, 2)
+        nx_graph.add_edge(src, dest, label=rand.choice(Fixtures.labels))
+    return nx_graph
+
+
+# term expansion
+
+@expansion_unit.test
+def populate_contract():
+    """Expand over frames and hypernyms, scoring each term by its method."""
+    nx_graph = labelled_graph(Fixtures.contract.edges)
+    terms = (u'売買', u'当事者')
+    expanded, scoremap = termexpand.populate(terms, nx_graph, methods=termexpand.all_methods)
+    assert (expanded, scoremap) == populate_by_methods(terms, nx_graph, termexpand.all_methods)
+    assert expanded[:2] == terms
+    assert u'契約' in expanded
+    assert scoremap[u'売買'] == 0.5
+    assert scoremap[u'契約'] == termexpand.scorebase['hyperframes']
+
+@expansion_unit.test
+def populate_as_methods():
+    """Expand random graphs as rescanning with every method did, in order."""
+    rand = random.Random(31)
+    for _ in xrange(60):
+        nx_graph = random_graph(rand, rand.randint(2, 12))
+        terms = rand.sample(nx_graph.nodes(), rand.randint(1, min(4, len(nx_graph))))
+        methods = rand.sample(termexpand.all_methods, rand.randint(1, len(termexpand.all_methods)))
+        assert termexpand.populate(terms, nx_graph, methods=methods) == populate_by_methods(
+            terms, nx_graph, methods,
+        )
+
+@expansion_unit.test
+def populate_one_method():
+    """Expand as each method alone did."""
+    rand = random.Random(131)
+    for method in termexpand.all_methods:
+        for _ in xrange(15):
+            nx_graph = random_graph(rand, rand.randint(2, 10))
+            terms = rand.sample(nx_graph.nodes(), rand.randint(2, min(4, len(nx_graph))))
+            assert termexpand.populate(terms, nx_graph, methods=[method]) == populate_by_methods(
+                terms, nx_graph, [method],
+            )
@@ -0,0 +1,105 @@
+# encoding: utf-8
+
+import io
+import os
+import json
+import shutil
+import tempfile
+from attest import (
+    Tests, assert_hook,
+    contextmanager,
+)
+from jp_civil_law.build.easy_analysis import user_calc
+
+
+report_unit = Tests()
+
+
+@contextmanager
+def temporary_report_path():
+    directory = tempfile.mkdtemp()
+    try:
+        yield os.path.join(directory, 'report.jsonl')
+    finally:
+        shutil.rmtree(directory)
+
+
+class Fixtures:
+
+    class records:
+        scored = [
+            {u'qkey': u'q/1', u'map': 1.0, u'seen': [[u'a/1', 0.5]]},
+            {u'qkey': u'q/2', u'map': 0.5, u'seen': [[u'a/2', 0.25]]},
+        ]
+        summary = {u'summary': True, u'map': 0.75}
+        later = {u'qkey': u'q/3', u'map': 0.25, u'seen': []}
+
+
+def write_records(path, fingerprint, records, resume=False):
+    with user_calc.EvaluationReport(path, fingerprint, resume=resume) as reporter:
+        for record in records:
+            reporter.write(**record)
+    return reporter
+
+def read_records(path):
+    with io.open(path, encoding='utf-8') as written:
+        return [json.loads(line) for line in written]
+
+def stamped(record, fingerprint):
+    record = dict(record)
+    record[u'fingerprint'] = fingerprint
+    return record
+
+
+# evaluation report
+
+@report_unit.test
+def write_lines():
+    """Write one stamped line per record, over any previous log."""
+    with temporary_report_path() as path:
+        write_records(path, u'fp', Fixtures.records.scored)
+        write_records(path, u'fp', Fixtures.records.scored)
+        assert read_records(path) == [
+            stamped(record, u'fp') for record in Fixtures.records.scored
+        ]
+        reporter = write_records(None, u'fp', Fixtures.records.scored)
+        assert reporter.completed == {}
+
+@report_unit.test
+def resume_records():
+    """Keep the question records of the same fingerprint and append after them."""
+    with temporary_report_path() as path:
+        write_records(path, u'fp', Fixtures.records.scored + [Fixtures.records.summary])
+        reporter = write_records(path, u'fp', [Fixtures.records.later], resume=True)
+        assert sorted(reporter.completed) == [u'q/1', u'q/2']
+        assert reporter.completed[u'q/1'] == stamped(Fixtures.records.scored[0], u'fp')
+        assert read_records(path) == [
+            stamped(record, u'fp')
+            for record in Fixtures.records.scored + [Fixtures.records.later]
+        ]
+        assert os.listdir(os.path.dirname(path)) == ['report.jsonl']
+
+@report_unit.test
+def resume_cut_off():
+    """Drop a line cut off by an interrupted run, and what follows it."""
+    with temporary_report_path() as path:
+        write_records(path, u'fp', Fixtures.records.scored)
+        with io.open(path, encoding='utf-8') as written:
+            lines = written.readlines()
+        with io.open(path, 'w', encoding='utf-8') as cut:
+            cut.write(lines[0] + lines[1][:10])
+        reporter = write_records(path, u'fp', [], resume=True)
+        assert sorted(reporter.completed) == [u'q/1']
+        assert read_records(path) == [stamped(Fixtures.records.scored[0], u'fp')]
+
+@report_unit.test
+def resume_other_fingerprint():
+    """Score again the questions scored with another fingerprint."""
+    with temporary_report_path() as path:
+        write_records(path, u'old', Fixtures.records.scored)
+        reporter = write_records(path, u'new', [Fixtures.records.later], resume=True)
+        assert reporter.completed == {}
+        assert read_records(path) == [stamped(Fixtures.records.later, u'new')]
+        missing = os.path.join(os.path.dirname(path), 'missing.jsonl')
+        reporter = write_records(missing, u'new', [], resume=True)
+        assert reporter.completed == {}